@@ -1,5 +1,8 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# One-folder build: a one-file build unpacks the whole bundle into a temp folder
+# on every launch, which dominates startup time. UPX is disabled for the same
+# reason (packed binaries are decompressed on each load).
 
 a = Analysis(
     ['rimworld_gui.py'],
@@ -19,16 +22,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='RimConvert',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +36,13 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='RimConvert',
+)
@@ -68,6 +68,16 @@ if errorlevel 1 (
     )
 )
 
+REM Check for NumPy (optional, decodes DDS files for output verification)
+python -c "import numpy" 2>nul
+if errorlevel 1 (
+    echo Installing NumPy...
+    pip install numpy
+    if errorlevel 1 (
+        echo NumPy could not be installed; DDS verification will only check file structure
+    )
+)
+
 REM Check for PyInstaller (needed for building executables)
 python -c "import PyInstaller" 2>nul
 if errorlevel 1 (
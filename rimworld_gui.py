@@ -22,22 +22,18 @@ import sys
 import json
 import time
 import threading
-import subprocess
-import shutil # Added import
+import importlib.util
 from pathlib import Path
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from tkinter import StringVar, BooleanVar, IntVar, Tk, END, NORMAL, DISABLED, LEFT, RIGHT, TOP, BOTTOM, N, S, E, W, FLAT
-import concurrent.futures # Added for ThreadPoolExecutor
-import os # ensure os is imported if not already explicitly at top level for some reason
 
-try:
-    from PIL import Image as PILImage # Use PILImage alias
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILImage = None
-    PILLOW_AVAILABLE = False
+import rimworld_texture_optimizer as optimizer # Shared probing, upscaling policy and manifest
+
+# Pillow, subprocess, shutil and concurrent.futures are imported on first use to keep startup fast
+PILImage = None # Loaded on first use by _load_pillow()
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
 
 # Configuration
 CONFIG_FILE = "rimworld_optimizer_config.json"
@@ -45,6 +41,17 @@ CONFIG_FILE = "rimworld_optimizer_config.json"
 script_dir = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_TEXCONV_PATH = os.path.join(script_dir, "compressors", "texconv.exe")
 
+def _load_pillow():
+    """Import Pillow on first use and return PIL.Image (None if unavailable)."""
+    global PILImage, PILLOW_AVAILABLE
+    if PILImage is None and PILLOW_AVAILABLE:
+        try:
+            from PIL import Image
+            PILImage = Image
+        except ImportError:
+            PILLOW_AVAILABLE = False
+    return PILImage
+
 def get_texconv_path():
     """Determine the path to texconv.exe, assuming it's in a 'compressors' subdirectory
     relative to the executable or script."""
@@ -60,159 +67,985 @@ def get_texconv_path():
         return str(expected_texconv_path)
     return "" # Not found in the expected location
 
-class RimWorldOptimizerGUI:
-    def __init__(self, root):
-        self.root = root
-        self.config = self.load_config() # Load config first to get geometry
-
-        # Set window geometry
-        saved_geometry = self.config.get('window_geometry')
-        if saved_geometry:
-            try:
-                # Validate geometry string format (e.g., "800x600+100+100")
-                if isinstance(saved_geometry, str) and 'x' in saved_geometry and '+' in saved_geometry:
-                    self.root.geometry(saved_geometry)
-                else:
-                    self.root.geometry("800x650") # Default if format is invalid
-                    self.log_message(f"Invalid window geometry format in config: {saved_geometry}. Using default.", "warning") # Log if possible, or print
-            except tk.TclError: # Catch errors if Tkinter can't parse the geometry
-                self.root.geometry("800x650") # Default on error
-                self.log_message(f"Error applying window geometry: {saved_geometry}. Using default.", "warning")
-        else:
-            self.root.geometry("800x650") # Default if not found
+# ============================================================================
+# BACKGROUND WORKER (RUNS IN A CHILD PROCESS)
+# ============================================================================
+
+# Config keys without a widget (edited by hand in the config file); kept on save and passed to the worker
+HIDDEN_CONFIG_KEYS = ('preset_target_minutes', 'preset_min_psnr', 'profile', 'profile_every', 'path_rules',
+                      'min_load_benefit_ms', 'verify_output', 'encoder_backend', 'encoder_backends', 'gpu_adapters',
+                      'prefetch_mb', 'use_daemon', 'daemon_port', 'vram_budget_mb', 'background_cpu_share',
+                      'background_gpu_lanes', 'background_processes', 'background_game_workers')
+
+WORKER_EVENT_BATCH = 200  # Events per message sent from the worker process to the GUI
+WORKER_FLUSH_INTERVAL = 0.1  # Seconds before a partial batch is sent anyway
+WORKER_POLL_MS = 100  # How often the GUI drains the event queue
+WORKER_CANCEL_GRACE_MS = 15000  # After Cancel, the worker process is terminated if still running
+LOG_MAX_LINES = 5000  # Older lines are dropped from the log widget
+MOD_LIST_COLUMNS = ("textures", "mpx", "converted", "time")
+
+class EventBatcher:
+    """
+    Collects log and progress events in the worker process and sends them to the GUI in
+    batches, so Tk handles a few messages per second instead of one callback per event.
+    Only the latest progress event of a batch is kept.
+    """
+    
+    def __init__(self, event_queue):
+        self.event_queue = event_queue
+        self.events = []
+        self.progress = None
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flusher.start()
+    
+    def log(self, message, level):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        with self.lock:
+            self.events.append(('log', f"[{timestamp}] {message}\n", level))
+            if len(self.events) >= WORKER_EVENT_BATCH:
+                self._flush_locked()
+    
+    def post(self, *event):
+        """Queue any other event for the GUI (e.g. a 'mod' row of the mod list)."""
+        with self.lock:
+            self.events.append(event)
+    
+    def set_progress(self, value, status, eta):
+        with self.lock:
+            self.progress = ('progress', value, status, eta)
+    
+    def _flush_locked(self):
+        batch = self.events
+        if self.progress:
+            batch.append(self.progress)
+        if batch:
+            self.event_queue.put(batch)
+        self.events = []
+        self.progress = None
+    
+    def _flush_periodically(self):
+        while not self.closed.wait(WORKER_FLUSH_INTERVAL):
+            with self.lock:
+                self._flush_locked()
+    
+    def close(self):
+        """Send what is left, followed by the 'done' event."""
+        self.closed.set()
+        self.flusher.join()
+        with self.lock:
+            self.events.append(('done',))
+            self._flush_locked()
+
+class ConversionWorker:
+    """
+    Conversion, planning, watch and restore jobs without any Tk dependency.
+    
+    The GUI runs one job per child process (see run_worker_process) so the encoder pool,
+    Pillow work and logging never compete with Tk's main loop for the GIL. Log and progress
+    updates go through an EventBatcher; cancellation is a multiprocessing event.
+    """
+    
+    def __init__(self, settings, events, cancel_event):
+        self.settings = settings
+        self.events = events
+        self.cancel_event = cancel_event
+        self.encoder_preset = "balanced" # Concrete preset of the running job ('auto' resolved)
+        self.backend_choice = None # Encoders tried per texture (optimizer.BackendChoice), set when a job starts
+        self.vram_budget_mb = settings.get('vram_budget_mb') # Hidden setting; a resumed run keeps its own
+        self.last_progress_percent = 0
+        self.path_rules = optimizer.PathRules(settings.get('path_rules'), log=self.log_message)
+        if settings.get('texconv_path'):
+            optimizer.TEXCONV_PATH = settings['texconv_path'] # Used by the texconv backends
+        optimizer.register_config_backends(settings.get('encoder_backends'), log=self.log_message)
+        optimizer.GPU_ADAPTERS = settings.get('gpu_adapters')
+        optimizer.PREFETCH_MB = settings.get('prefetch_mb', optimizer.PREFETCH_MB)
+        optimizer.BACKGROUND_CPU_SHARE = settings.get('background_cpu_share', optimizer.BACKGROUND_CPU_SHARE)
+        optimizer.BACKGROUND_GPU_LANES = settings.get('background_gpu_lanes', optimizer.BACKGROUND_GPU_LANES)
+        optimizer.BACKGROUND_PROCESSES = settings.get('background_processes', optimizer.BACKGROUND_PROCESSES)
+        optimizer.BACKGROUND_GAME_WORKERS = settings.get('background_game_workers', optimizer.BACKGROUND_GAME_WORKERS)
+    
+    @property
+    def cancel_requested(self):
+        return self.cancel_event.is_set()
+    
+    def log_message(self, message, level="info"):
+        self.events.log(message, level)
+    
+    def update_progress(self, value, status="", eta=""):
+        self.events.set_progress(value, status, eta)
+    
+    def _get_image_info_gui(self, image_path):
+        """GUI version of get_image_info, logs errors via self.log_message."""
+        if _load_pillow() is None:
+            self.log_message(f"Pillow not available, cannot get image info for {os.path.basename(image_path)}", "error")
+            return None
+        try:
+            with PILImage.open(image_path) as img:
+                return {
+                    'width': img.width,
+                    'height': img.height,
+                    'mode': img.mode,
+                    'has_alpha': img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+                }
+        except Exception as e:
+            self.log_message(f"Could not read image info for {os.path.basename(image_path)}: {e}", "warning")
+            return None
 
-        self.root.title("RimConvert") # UPDATED default window title
-        # self.root.geometry("800x650") # Moved up
-        self.root.resizable(True, True)
-        
-        # Configuration
-        # self.config = self.load_config() # Moved up
-        self.processing = False
-        self.cancel_requested = False
-        
-        # Thread-safe variables
-        self.progress_var = IntVar()
-        self.status_var = StringVar(value="Initializing...") # Initial status
-        self.eta_var = StringVar(value="")
-        self.mods_path_var = StringVar() # Moved initialization here
-        self.texconv_path_var = StringVar() # Moved initialization here
-        
-        # Setup GUI
-        self.setup_style()
-        self.create_widgets()
-        self.load_settings() 
-        self._reset_ui_state() 
-        
-        # Protocol handler for window close
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+    def _convert_png_to_dds_gui(self, png_path_to_convert, dds_output_path, has_alpha, backend, compression_format, generate_mipmaps,
+                                mip_levels=None, texture=None):
+        """
+        GUI version of convert_png_to_dds, logs messages via self.log_message.
         
-    def on_closing(self):
-        """Handle window closing: save config (including geometry) and destroy window."""
-        # Save current geometry
-        self.config['window_geometry'] = self.root.geometry()
-        self.save_config()
-        self.root.destroy()
+        Key parameters based on RimPy's successful approach:
+        - BC7_UNORM for best quality with alpha support
+        - Generate mipmaps for performance
+        - Proper handling of alpha channels
+        - FLIPPED INPUT: the texture (optimizer.EncoderInput) is already pre-flipped for the in-game orientation;
+          without one the PNG is encoded as it is
+        - Encoding by the given backend (see optimizer.EncoderBackend).
+        """
+        try:
+            if texture is None:
+                input_path, pixels = png_path_to_convert, None
+            elif backend.takes_pixels:
+                input_path, pixels = None, texture.image # The decoded pixels, no file needed
+            else:
+                input_path, pixels = texture.path(), None
+
+            # mip_levels comes from a path rule (1 = no mipmaps)
+            mipmaps = mip_levels if mip_levels is not None else (0 if generate_mipmaps else 1)
+            if texture is not None and texture.source is not None:
+                # Upscaled 2x: the original pixels are mip 1 instead of the upscale sampled back down
+                error = optimizer.encode_with_source_mip(backend, texture, dds_output_path, has_alpha, self.encoder_preset,
+                                                         compression_format, mipmaps)
+            else:
+                error = backend.encode(input_path, dds_output_path, has_alpha, self.encoder_preset, compression_format,
+                                       mipmaps, pixels=pixels)
+            if error:
+                self.log_message(f"{backend.name} failed for {os.path.basename(png_path_to_convert)}: {error}", "error")
+                return False
+            return True
+        except Exception as e:
+            self.log_message(f"Conversion failed for {os.path.basename(png_path_to_convert)}: {e}", "error")
+            return False
 
-    def setup_style(self):
-        """Setup dark theme styling to mimic Windows Dark Mode."""
-        self.style = ttk.Style()
+    def _process_single_file_gui_task(self, png_path, compression_format, 
+                                    enable_upscaling, generate_mipmaps, enable_gpu_preference, 
+                                    texture_info=None, # Manifest entry with precomputed upscale decision
+                                    rule=None): # Path-rule settings (looked up here when None)
+        task_stats = {'status': 'unknown', 'upscaled': False, 'original_path': png_path,
+                      'seconds': 0.0, 'stage_seconds': {}}
+        texture = None # Decoded, upscaled and flipped pixels shared by the encoders
+        source_read = False
+        task_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            dds_path = Path(png_path).with_suffix('.dds')
 
-        # Windows Dark Mode-inspired colors
-        self.win_bg_color = "#202020"      # Overall window/frame background (dark gray)
-        self.win_fg_color = "#FFFFFF"      # General text (pure white for better contrast)
-        
-        self.ctrl_bg_color = "#2D2D2D"     # Background for buttons, entries (medium dark gray)
-        self.ctrl_fg_color = "#FFFFFF"     # Text on controls (pure white)
-        
-        self.ctrl_hover_bg_color = "#3E3E3E" # Button hover (slightly lighter gray)
-        self.ctrl_active_bg_color = "#4A4A4A" # Button pressed (even lighter)
-        
-        self.entry_field_bg_color = "#252525" # Background of text input area (very dark gray)
-        
-        self.accent_color = "#0078D4"      # Accent for progress bar, selections (Windows blue)
-        self.accent_fg_color = "#FFFFFF"   # Text on accent background (white)
+            if self.cancel_requested:
+                task_stats['status'] = 'cancelled'
+                return task_stats
 
-        self.disabled_fg_color = "#6B6B6B" # Disabled text color (medium gray)
-        self.log_bg_color = "#1E1E1E"      # Log area background (very dark, like VS Code terminal)
-        self.border_color = "#3C3C3C"      # Subtle border color for controls
-        self.labelframe_bg_color = "#202020"  # Explicit background for label frames
+            # DDS Skipping Logic
+            if dds_path.exists():
+                try:
+                    png_mtime = os.path.getmtime(png_path)
+                    dds_mtime = os.path.getmtime(dds_path)
+                    resized = self.vram_budget_mb and texture_info and optimizer.dds_outdated_by_budget(
+                        str(dds_path), texture_info, enable_upscaling, rule)
+                    if dds_mtime > png_mtime and not resized:
+                        self.log_message(f"Skipping (DDS newer): {os.path.basename(png_path)}", "info")
+                        task_stats['status'] = 'skipped_newer'
+                        return task_stats
+                except FileNotFoundError:
+                    self.log_message(f"File not found during mtime check for {os.path.basename(png_path)}. Processing.", "warning")
+                except Exception as e_mtime:
+                    self.log_message(f"Error checking mtime for {os.path.basename(png_path)}: {e_mtime}. Processing.", "warning")
+            
+            img_info = texture_info or optimizer.probe_png_header(png_path) or self._get_image_info_gui(png_path)
+            if not img_info:
+                task_stats['status'] = 'error_img_info'
+                return task_stats
 
-        self.root.configure(bg=self.win_bg_color)
-        
-        self.style.theme_use('clam') 
+            if 'upscale_to' in img_info:
+                upscale_to = img_info['upscale_to']
+            else:
+                upscale_to = optimizer.choose_upscale_target(img_info['width'], img_info['height'])
+            if rule is None:
+                rule = optimizer.rule_for_path(png_path, self.settings['mods_path'], self.path_rules)
+            compression_format = rule.get('format', compression_format)
+
+            budget_size = img_info.get('budget_size')
+            upscale = not budget_size and enable_upscaling and upscale_to and rule.get('upscale') is not False
+            resize_to = tuple(budget_size or upscale_to) if budget_size or upscale else None
+            if resize_to == (img_info['width'], img_info['height']):
+                resize_to = None # The VRAM budget only dropped the upscale
+            if upscale:
+                self.log_message(f"Upscaling {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to {upscale_to[0]}x{upscale_to[1]}", "info")
+            elif resize_to:
+                self.log_message(f"Reducing {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to {resize_to[0]}x{resize_to[1]} for the VRAM budget", "info")
+            
+            # Decode once; the upscale and the pre-flip happen in memory and every encoder gets these pixels
+            if _load_pillow() is not None:
+                stage_start = time.perf_counter()
+                try:
+                    data = optimizer.read_source(png_path) # From the read-ahead when it got there first
+                    source_read = True
+                    task_stats['stage_seconds']['read wait'] = time.perf_counter() - stage_start
+                    stage_start = time.perf_counter()
+                    texture = optimizer.prepare_encoder_input(png_path, resize_to, data)
+                    del data
+                except Exception as e:
+                    self.log_message(f"Failed to {'resize' if resize_to else 'read'} image {os.path.basename(png_path)}: {e}", "error")
+                    task_stats['status'] = 'error_upscale' if resize_to else 'error_img_info'
+                    return task_stats
+                task_stats['stage_seconds']['prepare'] = time.perf_counter() - stage_start
+                task_stats['upscaled'] = bool(upscale)
+            elif resize_to:
+                self.log_message(f"Pillow not available, cannot resize {os.path.basename(png_path)}", "error")
+                task_stats['status'] = 'error_upscale'
+                return task_stats
+            else:
+                self.log_message("Pillow (PIL) module not loaded. Cannot pre-flip. Textures might appear upside down.", "warning")
+            
+            if self.cancel_requested: return {**task_stats, 'status': 'cancelled'}
 
-        # Configure the theme to use our dark colors as defaults
-        self.style.configure('.', 
-                             background=self.win_bg_color,
-                             foreground=self.win_fg_color,
-                             bordercolor=self.border_color,
-                             focuscolor=self.accent_color)
+            conversion_successful = False
+            stage_start = time.perf_counter()
+            # Try the job's encoders in order (GPU/CPU texconv by default) until one succeeds
+            width, height = resize_to or (img_info['width'], img_info['height'])
+            backend_choice = self.backend_choice or optimizer.BackendChoice(enable_gpu_preference)
+            candidates = backend_choice.candidates(width * height, compression_format)
+            for index, backend in enumerate(candidates):
+                if self.cancel_requested: return {**task_stats, 'status': 'cancelled'}
+                self.log_message(f"Converting ({backend.name}): {os.path.basename(png_path)} -> {dds_path.name}", "info")
+                if self._convert_png_to_dds_gui(png_path, str(dds_path), img_info['has_alpha'], backend, compression_format, generate_mipmaps, rule.get('mipmaps'),
+                                                texture):
+                    conversion_successful = True
+                    task_stats['status'] = f"{backend.lane}_converted"
+                    break
+                if index + 1 < len(candidates):
+                    self.log_message(f"{backend.name} failed for {os.path.basename(png_path)}. Trying {candidates[index + 1].name}.", "warning")
+            if not conversion_successful:
+                # Error already logged by _convert_png_to_dds_gui
+                task_stats['status'] = 'error_conversion'
+            
+            task_stats['stage_seconds']['encode'] = time.perf_counter() - stage_start
+            if conversion_successful and self.settings.get('verify_output'): # Hidden setting: post-encode check
+                stage_start = time.perf_counter()
+                if not optimizer.verify_converted_texture(png_path, str(dds_path), {**img_info, 'upscale_to': upscale_to},
+                                                          enable_upscaling, rule, compression_format, log=self.log_message):
+                    conversion_successful = False
+                    task_stats['status'] = 'error_verify'
+                task_stats['stage_seconds']['verify'] = time.perf_counter() - stage_start
+            if conversion_successful and task_stats['status'] not in ['gpu_converted', 'cpu_converted']:
+                 # Should not happen if logic is correct, but as a fallback
+                 task_stats['status'] = 'error_unknown_conversion_state'
+            elif not conversion_successful and task_stats['status'] == 'unknown':
+                 task_stats['status'] = 'error_conversion_failed_completely'
 
-        # General Frame and Label
-        self.style.configure('TFrame', 
-                             background=self.win_bg_color,
-                             borderwidth=0,
-                             relief='flat')
-        
-        self.style.configure('TLabel', 
-                             background=self.win_bg_color, 
-                             foreground=self.win_fg_color, 
-                             padding=2,
-                             font=('Segoe UI Variable Text', 9))
-        
-        self.style.configure('Header.TLabel', 
-                             background=self.win_bg_color,
-                             foreground=self.win_fg_color,
-                             font=('Segoe UI Variable Text', 16, 'bold')) 
-        
-        self.style.configure('Subtitle.TLabel', 
-                             background=self.win_bg_color,
-                             foreground=self.win_fg_color,
-                             font=('Segoe UI Variable Text', 10))
+            return task_stats
 
-        # Button
-        self.style.configure('TButton', 
-                             background=self.ctrl_bg_color, 
-                             foreground=self.ctrl_fg_color,
-                             bordercolor=self.border_color, 
-                             lightcolor=self.ctrl_bg_color,
-                             darkcolor=self.ctrl_bg_color,
-                             font=('Segoe UI Variable Text', 9),
-                             padding=(8, 5),
-                             relief='flat',
-                             borderwidth=1)
-        self.style.map('TButton',
-                       background=[('active', self.ctrl_active_bg_color), 
-                                   ('hover', self.ctrl_hover_bg_color),
-                                   ('disabled', self.ctrl_bg_color)],
-                       foreground=[('disabled', self.disabled_fg_color),
-                                   ('active', self.ctrl_fg_color),
-                                   ('hover', self.ctrl_fg_color)],
-                       bordercolor=[('disabled', self.disabled_fg_color)])
+        except Exception as e_task:
+            self.log_message(f"Unexpected error processing {os.path.basename(png_path)} in task: {e_task}", "error")
+            task_stats['status'] = 'error_unexpected'
+            return task_stats
+        finally:
+            if texture is not None:
+                try:
+                    texture.close()
+                except Exception as e_remove_temp:
+                    self.log_message(f"Could not remove temp file of {os.path.basename(png_path)}: {e_remove_temp}", "warning")
+            if optimizer.READ_AHEAD is not None and not source_read and task_stats['status'] != 'skipped_newer':
+                optimizer.READ_AHEAD.release(png_path) # Skipped files are not read ahead in the first place
+            task_stats['stage_seconds']['cpu'] = time.thread_time() - cpu_start
+            task_stats['seconds'] = time.perf_counter() - task_start
+
+    def _discover_png_files_gui(self, mods_path_str, mods=None):
+        """PNG files to convert according to the discovery settings (only in the mod folders in mods when given)."""
+        if self.settings['loaded_textures_only']:
+            # Find the PNG files in the Textures folders the selected game version loads
+            png_files, _ = optimizer.discover_png_files(mods_path_str, 'loadfolders', self.settings['game_version'],
+                                                        log=self.log_message, rules=self.path_rules, mods=mods)
+            return png_files
+        
+        # Find all PNG files
+        png_files = []
+        tops = [mods_path_str] if mods is None else [os.path.join(mods_path_str, mod) for mod in mods]
+        for root, _, files in (walked for top in tops for walked in os.walk(top)):
+            for file in files:
+                if file.lower().endswith('.png') and not optimizer.is_temp_file(file):
+                    png_path = os.path.join(root, file)
+                    if not (self.path_rules and self.path_rules.excluded(optimizer.mod_relative_path(png_path, mods_path_str))):
+                        png_files.append(png_path)
+        return png_files
+
+    def scan_worker(self, mods=None):
+        """Background worker for the mod list: per-mod texture counts, converted share and predicted time."""
+        try:
+            enable_gpu_preference_bool = self.settings['enable_gpu']
+            quiet = lambda message, level="info": None if level == "info" else self.log_message(message, level)
+            preset = optimizer.resolve_preset(self.settings['encoder_preset'], texconv_path=self.settings['texconv_path'],
+                                              use_gpu=enable_gpu_preference_bool, log=quiet)
+            lane_cost = optimizer.planned_lane_cost(enable_gpu_preference_bool, preset, self.settings['texconv_path'])
+            num_workers = min(8, os.cpu_count() + 4 if os.cpu_count() else 8)
+            
+            def on_mod(folder, name, row, done, count):
+                self.events.post('mod', folder, name, row)
+                self.update_progress(int(done / count * 100), f"Scanning mods {done}/{count}: {name}", "")
+            
+            self.update_progress(0, "Scanning mods...", "")
+            mode = 'loadfolders' if self.settings['loaded_textures_only'] else 'all'
+            rows = optimizer.scan_mods(self.settings['mods_path'], mode, self.settings['game_version'],
+                                       self.settings['enable_upscaling'], lane_cost, num_workers, self.path_rules,
+                                       mods, on_mod, should_stop=lambda: self.cancel_requested, log=self.log_message)
+            if self.cancel_requested:
+                self.update_progress(0, "Scan cancelled", "")
+                return
+            textures = sum(row['files'] for row in rows.values())
+            pending = sum(row['convert'] for row in rows.values())
+            self.log_message(f"Scanned {len(rows)} mods: {textures} textures, {pending} not converted yet.")
+            self.update_progress(100, f"{len(rows)} mods, {pending} textures to convert", "")
+        except Exception as e:
+            self.log_message(f"Mod scan failed: {e}", "error")
 
-        # Entry
-        self.style.configure('TEntry', 
-                             fieldbackground=self.entry_field_bg_color, 
-                             foreground=self.ctrl_fg_color, 
-                             insertcolor=self.ctrl_fg_color, 
-                             bordercolor=self.border_color, 
-                             lightcolor=self.entry_field_bg_color,
-                             darkcolor=self.entry_field_bg_color,
-                             padding=5,
-                             relief='flat',
-                             borderwidth=1)
-        self.style.map('TEntry',
-                       foreground=[('disabled', self.disabled_fg_color)],
-                       fieldbackground=[('disabled', self.ctrl_bg_color)],
-                       bordercolor=[('focus', self.accent_color), ('disabled', self.disabled_fg_color)])
+    def plan_worker(self):
+        """Background worker for the dry-run plan (nothing is converted)."""
+        try:
+            self.log_message("📋 Planning conversion (dry run, nothing is converted)...")
+            mods_path_str = self.settings['mods_path']
+            texconv_path_str = self.settings['texconv_path']
+            enable_upscaling_bool = self.settings['enable_upscaling']
+            enable_gpu_preference_bool = self.settings['enable_gpu']
+            
+            self.update_progress(0, "Scanning mods...", "")
+            png_files = self._discover_png_files_gui(mods_path_str)
+            if not png_files:
+                self.log_message("No PNG files found in the specified mods folder.", "info")
+                return
+            
+            self.update_progress(0, f"Probing {len(png_files)} texture headers...", "")
+            manifest = optimizer.build_manifest(mods_path_str, png_files, log=self.log_message)
+            optimizer.save_manifest(manifest, log=self.log_message)
+            if self.vram_budget_mb:
+                manifest['budget_sizes'] = optimizer.fit_vram_budget(manifest, self.vram_budget_mb * 1024 * 1024,
+                                                                     enable_upscaling_bool, self.path_rules, log=self.log_message)
+            
+            preset = optimizer.resolve_preset(self.settings['encoder_preset'], texconv_path=texconv_path_str,
+                                              use_gpu=enable_gpu_preference_bool, log=self.log_message)
+            num_workers = min(8, os.cpu_count() + 4 if os.cpu_count() else 8)
+            lane_cost = optimizer.planned_lane_cost(enable_gpu_preference_bool, preset, texconv_path_str)
+            min_benefit_ms = self.settings.get('min_load_benefit_ms')
+            if min_benefit_ms is not None:
+                png_files, low_benefit = optimizer.filter_by_benefit(png_files, manifest, min_benefit_ms,
+                                                                     enable_upscaling_bool, lane_cost, self.path_rules)
+                if low_benefit:
+                    self.log_message(f"{len(low_benefit)} textures below {min_benefit_ms} ms load-time benefit "
+                                     f"would stay PNG (not counted below).")
+            plan = optimizer.plan_conversion(png_files, manifest, enable_upscaling_bool, num_workers, lane_cost,
+                                             rules=self.path_rules)
+            
+            self.log_message(f"Plan for {len(png_files)} textures ({'GPU' if enable_gpu_preference_bool else 'CPU'}, "
+                             f"preset {preset}, {num_workers} workers):", "success")
+            for line in optimizer.format_plan(plan):
+                self.log_message(line)
+            total = plan['total']
+            eta = optimizer.format_duration(total['seconds']) if total['seconds'] is not None else "unknown"
+            self.update_progress(100, f"Plan: {total['convert']} to convert, {total['skip']} up to date, "
+                                      f"DDS {optimizer.format_bytes(total['dds_bytes'])}", f"Predicted: {eta}")
+        except Exception as e:
+            self.log_message(f"Planning failed: {e}", "error")
 
-        # Progressbar
-        self.style.configure('TProgressbar', 
-                             background=self.accent_color, 
-                             troughcolor=self.ctrl_bg_color,
-                             bordercolor=self.border_color,
-                             lightcolor=self.ctrl_bg_color,
-                             darkcolor=self.ctrl_bg_color,
+    def conversion_worker(self, resume=False, mods=None, files=None):
+        """Background worker for texture conversion, now using ThreadPoolExecutor.
+        With resume=True, continues the interrupted run recorded in the run journal.
+        mods limits a new run to these mod folders (the others are not walked), files to these PNGs."""
+        progress_percent = 0 # Initialize progress_percent
+        final_stats = {'success': 0, 'fail': 0, 'skipped': 0, 'upscaled': 0, 'total_processed_in_loop': 0} # Initialize final_stats
+        self.last_progress_percent = 0 # Track last progress percent for final update
+        worker_start_time = time.time() # Track overall worker start time
+        journal = None
+        written = None
+        profiler = None
+        try:
+            self.log_message("🚀 Starting texture conversion (GUI Parallel)...")
+            mods_path_str = self.settings['mods_path']
+            texconv_path_str = self.settings['texconv_path']
+            
+            # Force compression format and mipmap generation for GUI operations
+            compression_format_str = "BC7_UNORM" 
+            generate_mipmaps_bool = True
+            
+            enable_upscaling_bool = self.settings['enable_upscaling']
+            enable_gpu_preference_bool = self.settings['enable_gpu']
+
+            if not PILLOW_AVAILABLE:
+                # This check should ideally be before starting the worker or disable button
+                # but for now, ensure it logs and exits gracefully if worker somehow starts.
+                self.log_message("Pillow library not available. Conversion cannot proceed.", "error")
+                # Since this is a worker thread, messagebox might not be ideal here.
+                # Consider disabling button if Pillow not found at startup.
+                return
+            
+            journal = optimizer.RunJournal()
+            written = optimizer.WrittenDds(mods_path_str)
+            if self.settings.get('profile'): # Hidden setting: profile the run (reports in optimizer.PROFILE_DIR)
+                profiler = optimizer.RunProfiler(self.settings.get('profile_every', optimizer.PROFILE_SNAPSHOT_EVERY))
+                profiler.start(log=self.log_message)
+            resumed = optimizer.prepare_resume(mods_path_str, log=self.log_message) if resume else None
+            if resumed:
+                # Continue with the interrupted run's files, decisions and settings
+                png_files, manifest, run_settings = resumed
+                enable_upscaling_bool = run_settings.get('enable_upscaling', enable_upscaling_bool)
+                enable_gpu_preference_bool = run_settings.get('enable_gpu', enable_gpu_preference_bool)
+                self.encoder_preset = run_settings.get('preset', 'balanced')
+                self.vram_budget_mb = run_settings.get('vram_budget_mb')
+            elif files is not None:
+                png_files, _ = optimizer.select_png_files(files, mods_path_str, log=self.log_message)
+            else:
+                if mods is not None:
+                    self.log_message(f"Converting {len(mods)} selected mods: {', '.join(mods)}")
+                png_files = self._discover_png_files_gui(mods_path_str, mods)
+            
+            total_files = len(png_files)
+            # Storing total_files in final_stats for summary
+            final_stats['total_files_discovered'] = total_files
+
+            if not png_files:
+                self.log_message("No PNG files found in the specified mods folder.", "info")
+                self.update_progress(100, "No PNG files found.", "") 
+                if resumed:
+                    journal.reopen(mods_path_str)
+                    journal.finish() # Nothing left to do for the interrupted run
+                # No return here; let it fall through to the finally block to reset UI
+            else:
+                if resumed:
+                    journal.reopen(mods_path_str)
+                else:
+                    self.log_message(f"Found {total_files} PNG files to process.")
+                    self.update_progress(0, f"Probing {total_files} texture headers...", "ETA: Calculating...")
+
+                    # Probe headers and precompute upscaling decisions for the whole corpus
+                    manifest = optimizer.build_manifest(mods_path_str, png_files, log=self.log_message)
+                    if self.vram_budget_mb: # Hidden setting: write the biggest textures smaller to fit the GPU memory
+                        manifest['budget_sizes'] = optimizer.fit_vram_budget(
+                            manifest, self.vram_budget_mb * 1024 * 1024, enable_upscaling_bool, self.path_rules,
+                            log=self.log_message)
+                    optimizer.save_manifest(manifest, log=self.log_message, keep_other_files=mods is not None or files is not None)
+                    if self.settings['encoder_preset'] == 'auto':
+                        self.update_progress(0, "Calibrating encoder presets...", "ETA: Calculating...")
+                    self.encoder_preset = optimizer.resolve_preset(
+                        self.settings['encoder_preset'], png_files, manifest, texconv_path_str, enable_gpu_preference_bool,
+                        min(8, (os.cpu_count() or 4) + 4), self.settings.get('preset_target_minutes'),
+                        self.settings.get('preset_min_psnr'), log=self.log_message)
+                    min_benefit_ms = self.settings.get('min_load_benefit_ms')
+                    if min_benefit_ms is not None:
+                        # Leave textures as PNG where the DDS would not make the game load faster
+                        lane_cost = optimizer.planned_lane_cost(enable_gpu_preference_bool, self.encoder_preset, texconv_path_str)
+                        png_files, low_benefit = optimizer.filter_by_benefit(png_files, manifest, min_benefit_ms,
+                                                                             enable_upscaling_bool, lane_cost, self.path_rules)
+                        optimizer.write_benefit_report(low_benefit, min_benefit_ms, log=self.log_message)
+                        for png_file, _ in low_benefit:
+                            manifest['files'].pop(os.path.relpath(png_file, manifest['mods_path']), None)
+                        total_files = len(png_files)
+                    run_settings = {'enable_upscaling': enable_upscaling_bool, 'enable_gpu': enable_gpu_preference_bool,
+                                    'preset': self.encoder_preset, 'vram_budget_mb': self.vram_budget_mb,
+                                    'budget_sizes': manifest.get('budget_sizes')}
+                    journal.start(mods_path_str, run_settings, png_files, manifest['upscale_decisions'])
+                if (not resumed and self.settings.get('encoder_backend', 'auto') == 'auto'
+                        and optimizer.cached_backend_benchmark(enable_gpu_preference_bool, self.encoder_preset) is None
+                        and len(optimizer.runnable_backends(enable_gpu_preference_bool)) > 1):
+                    self.update_progress(0, "Comparing encoders...", "ETA: Calculating...")
+                self.backend_choice = optimizer.resolve_backends(
+                    None if resumed else png_files, manifest, enable_gpu_preference_bool, self.encoder_preset,
+                    self.settings.get('encoder_backend'), log=self.log_message)
+                if enable_gpu_preference_bool:
+                    optimizer.gpu_scheduler(log=self.log_message) # Enumerate adapters, warnings go to the GUI log
+                if profiler:
+                    profiler.snapshot("discovery", log=self.log_message)
+                planned = optimizer.summarize_manifest(manifest, enable_upscaling_bool, rules=self.path_rules)
+                self.log_message(f"Encoder preset: {self.encoder_preset}")
+                self.log_message(f"Planned pixel work: {planned['planned_pixels'] / 1e6:.1f} Mpx "
+                                 f"(source {planned['source_pixels'] / 1e6:.1f} Mpx, {planned['upscaled']} textures upscaled)")
+                self.update_progress(0, f"Preparing to process {total_files} files...", "ETA: Calculating...")
+
+                loop_processed_count = 0
+                # loop_success_count, fail_count etc. are accumulated in final_stats
+
+                import concurrent.futures
+                num_workers = min(8, os.cpu_count() + 4 if os.cpu_count() else 8) 
+
+                if optimizer.LOCALITY_ORDER:
+                    png_files = optimizer.locality_order(png_files) # Sequential reads on hard disks
+                # Compact per-file records; the file list and manifest are not needed past this point
+                tasks = optimizer.TaskTable(png_files, manifest, rules=self.path_rules)
+                del png_files, manifest
+                throughput = optimizer.ThroughputModel(total_files, planned['planned_pixels'], tasks.total_bytes(),
+                                                       num_workers, saved=optimizer.saved_throughput(self.encoder_preset))
+
+                task = self._process_single_file_gui_task
+                if profiler:
+                    task = profiler.wrap(task)
+                if self.settings.get('background_mode'): # Low priority, capped, and slower while the game runs
+                    task = optimizer.start_background_mode(num_workers, log=self.log_message).wrap(task)
+                status_codes = {'gpu_converted': optimizer.TASK_CONVERTED, 'cpu_converted': optimizer.TASK_CONVERTED,
+                                'skipped_newer': optimizer.TASK_SKIPPED, 'cancelled': optimizer.TASK_CANCELLED}
+
+                def on_done(index, future):
+                    nonlocal loop_processed_count
+                    png_file_path = tasks.path(index)
+                    pixels = tasks.planned_pixels(index, enable_upscaling_bool)
+                    nbytes = tasks.sizes[index]
+                    try:
+                        result_stats = future.result()
+                        status = status_codes.get(result_stats['status'], optimizer.TASK_ERROR)
+                        if status == optimizer.TASK_CONVERTED:
+                            if result_stats['upscaled']:
+                                final_stats['upscaled'] += 1
+                            lane = 'gpu' if result_stats['status'] == 'gpu_converted' else 'cpu'
+                            throughput.record(lane, pixels, nbytes, result_stats['seconds'], result_stats['stage_seconds'])
+                        else:
+                            throughput.skip(pixels, nbytes)
+                    except Exception as exc:
+                        self.log_message(f"Error processing {os.path.basename(png_file_path)} in worker future: {exc}", "error")
+                        status = optimizer.TASK_ERROR
+                        throughput.skip(pixels, nbytes)
+                    tasks.mark(index, status)
+                    if status != optimizer.TASK_CANCELLED: # Cancelled files stay pending for 'Resume'
+                        journal.record_done(png_file_path, optimizer.TASK_STATUS_NAMES[status])
+                    if status == optimizer.TASK_CONVERTED:
+                        written.add(png_file_path)
+                    final_stats['success'] = tasks.counts[optimizer.TASK_CONVERTED]
+                    final_stats['skipped'] = tasks.counts[optimizer.TASK_SKIPPED]
+                    final_stats['fail'] = tasks.counts[optimizer.TASK_ERROR] + tasks.counts[optimizer.TASK_CANCELLED]
+
+                    loop_processed_count += 1
+                    final_stats['total_processed_in_loop'] = loop_processed_count
+                    if profiler:
+                        profiler.maybe_snapshot(loop_processed_count, log=self.log_message)
+
+                    current_progress_percent = int((loop_processed_count / total_files) * 100) if total_files > 0 else 0
+                    self.last_progress_percent = current_progress_percent
+
+                    mb_per_sec, mpx_per_sec = throughput.rates()
+                    eta_seconds = throughput.eta_seconds()
+                    eta_str = f"ETA: {optimizer.format_duration(eta_seconds)}" if eta_seconds is not None else "ETA: Calculating..."
+
+                    status_msg = (f"Processed: {loop_processed_count}/{total_files} (S: {final_stats['success']}, F: {final_stats['fail']}, "
+                                  f"Sk: {final_stats['skipped']}, Up: {final_stats['upscaled']}) | {mb_per_sec:.1f} MB/s, {mpx_per_sec:.1f} Mpx/s")
+                    self.update_progress(current_progress_percent, status_msg, eta_str)
+
+                read_ahead = optimizer.start_read_ahead(tasks.path(index) for index in range(total_files))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    def submit(index):
+                        return executor.submit(task, tasks.path(index), compression_format_str,
+                                               enable_upscaling_bool, generate_mipmaps_bool, enable_gpu_preference_bool,
+                                               tasks.texture_info(index), tasks.rule(index))
+
+                    # Only a small window of tasks is submitted; on cancel the files in flight are drained
+                    optimizer.run_task_window(executor, total_files, submit, on_done,
+                                              num_workers * optimizer.TASK_WINDOW_PER_WORKER,
+                                              should_stop=lambda: self.cancel_requested)
+                    if self.cancel_requested:
+                        self.log_message("Conversion cancellation initiated by user.", "warning")
+                # End of 'with executor' and 'for future' loop
+                optimizer.stop_read_ahead()
+                io_line = optimizer.io_cpu_line(throughput.stage_seconds)
+                if io_line:
+                    self.log_message(f"I/O wait vs CPU: {io_line}", "info")
+                if read_ahead is not None:
+                    self.log_message(f"Read-ahead: {read_ahead.summary()}", "info")
+
+                if self.cancel_requested:
+                    journal.close() # Keep the journal resumable
+                    self.log_message("Finished files are recorded; use 'Resume' to continue this run later.", "info")
+                else:
+                    journal.finish()
+
+                optimizer.save_throughput(throughput, self.encoder_preset)
+                optimizer.save_gpu_adapter_rates()
+                if enable_gpu_preference_bool and optimizer.GPU_SCHEDULER is not None and len(optimizer.GPU_SCHEDULER.adapters) > 1:
+                    for line in optimizer.GPU_SCHEDULER.summary():
+                        self.log_message(line, "info")
+
+            # After processing all files or if no files were found (and not returned early)
+            if not self.cancel_requested and total_files > 0 : # Only log summary if files were processed
+                total_conversion_time = time.time() - worker_start_time
+                mb_per_sec, mpx_per_sec = throughput.rates()
+                summary_msg = (f"✅ Conversion complete! "
+                               f"Files: {total_files}, Success: {final_stats['success']}, "
+                               f"Failed: {final_stats['fail']}, Skipped: {final_stats['skipped']}, "
+                               f"Upscaled: {final_stats['upscaled']}. "
+                               f"Time: {total_conversion_time:.2f}s ({mb_per_sec:.1f} MB/s, {mpx_per_sec:.1f} Mpx/s).")
+                self.log_message(summary_msg, "info")
+                # Ensure progress bar is at 100% if all tasks completed without cancellation
+                if final_stats['total_processed_in_loop'] == total_files:
+                     self.update_progress(100, "Conversion finished.", summary_msg)
+                else: # Should not happen if not cancelled, but as a fallback
+                     self.update_progress(self.last_progress_percent, "Conversion ended (some files may not have processed).", summary_msg)
+
+            elif self.cancel_requested:
+                processed_before_stop = final_stats['total_processed_in_loop']
+                self.log_message(f"🛑 Conversion process stopped by user. Processed {processed_before_stop}/{total_files if total_files else 'N/A'} before stopping.", "warning")
+                self.update_progress(self.last_progress_percent, f"Cancelled. Processed {processed_before_stop}/{total_files if total_files else 'N/A'}.", "Stopped.")
+            # If total_files was 0, the "No PNG files found" message is already on progress.
+
+        except Exception as e_worker:
+            self.log_message(f"💥 Critical error in conversion worker: {e_worker}", "error")
+            import traceback
+            self.log_message(traceback.format_exc(), "debug")
+            self.update_progress(self.last_progress_percent, "Error during conversion.", "Check logs.")
+        finally:
+            optimizer.stop_read_ahead()
+            optimizer.stop_background_mode()
+            if journal:
+                journal.close()
+            if written:
+                written.save(log=self.log_message)
+            if profiler:
+                profiler.finish(log=self.log_message)
+            self.log_message("ℹ️ Conversion worker finished.", "info")
+
+    def watch_worker(self):
+        """Background worker for watch mode (stopped with Cancel)."""
+        status_map = {'gpu_converted': 'converted', 'cpu_converted': 'converted', 'skipped_newer': 'skipped'}
+        texconv_path_str = self.settings['texconv_path']
+        enable_upscaling_bool = self.settings['enable_upscaling']
+        enable_gpu_preference_bool = self.settings['enable_gpu']
+        
+        def process_file(png_path):
+            result_stats = self._process_single_file_gui_task(png_path, "BC7_UNORM",
+                                                              enable_upscaling_bool, True, enable_gpu_preference_bool)
+            return status_map.get(result_stats['status'], 'error')
+        
+        try:
+            self.encoder_preset = optimizer.resolve_preset(self.settings['encoder_preset'], texconv_path=texconv_path_str,
+                                                           use_gpu=enable_gpu_preference_bool, log=self.log_message)
+            self.backend_choice = optimizer.resolve_backends(use_gpu=enable_gpu_preference_bool, preset=self.encoder_preset,
+                                                             choice=self.settings.get('encoder_backend'), log=self.log_message)
+            if enable_gpu_preference_bool:
+                optimizer.gpu_scheduler(log=self.log_message)
+            self.update_progress(0, "Watching for texture changes...", "")
+            optimizer.watch_mods(self.settings['mods_path'], process_file,
+                                 'loadfolders' if self.settings['loaded_textures_only'] else 'all',
+                                 self.settings['game_version'],
+                                 should_stop=lambda: self.cancel_requested, log=self.log_message,
+                                 rules=self.path_rules)
+        except Exception as e:
+            self.log_message(f"Watch mode stopped with an error: {e}", "error")
+
+    def restore_worker(self, mods=None):
+        """Worker for PNG restoration (DDS deletion), only in the mod folders in mods when given."""
+        try:
+            self.log_message("🔙 Starting PNG restoration (deleting DDS files)...", "info")
+            mods_path = self.settings['mods_path']
+
+            self.log_message(f"Scanning for DDS files in: {mods_path}", "info")
+
+            dds_files_to_check = []
+            self.log_message("Phase 1: Scanning all directories for DDS files...", "info")
+            # Scan for DDS files in every folder (conversion also writes into Common/ and the version folders)
+            for _, current_mod_path in optimizer.list_mod_folders(mods_path, mods, log=self.log_message):
+                if self.cancel_requested: break
+                for dds_path, _ in optimizer.iter_restorable_dds(current_mod_path):
+                    dds_files_to_check.append(dds_path)
+            
+            total_files = len(dds_files_to_check)
+            if self.cancel_requested:
+                 self.log_message("Scan cancelled by user during file collection.", "warning")
+                 self.update_progress(0, "Scan Cancelled", "")
+                 return
+
+
+            if total_files == 0:
+                self.log_message("No DDS files found to process for restoration.", "info")
+                self.update_progress(100, "No DDS files found.", "Done")
+                return
+
+            self.log_message(f"Found {total_files} DDS files. Phase 2: Processing files...", "info")
+
+            deleted_count = 0
+            skipped_count = 0
+            errors = 0
+            start_time = time.time()
+
+            for i, dds_path in enumerate(dds_files_to_check):
+                if self.cancel_requested:
+                    self.log_message("Restoration cancelled by user during processing.", "warning")
+                    break
+
+                progress = int(((i + 1) / total_files) * 100) # i+1 for current item
+                elapsed_time = time.time() - start_time
+                eta_str = "Calculating..."
+                if i > 0: # Avoid division by zero for the first item
+                    time_per_file = elapsed_time / (i + 1)
+                    eta_seconds = time_per_file * (total_files - (i + 1))
+                    eta_str = f"ETA: {int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
+                
+                self.update_progress(progress, f"Processing {i+1}/{total_files}: {os.path.basename(dds_path)}", eta_str)
+
+                png_path = os.path.splitext(dds_path)[0] + '.png'
+
+                try:
+                    if os.path.exists(png_path):
+                        os.remove(dds_path)
+                        deleted_count += 1
+                        self.log_message(f"Deleted: {os.path.relpath(dds_path, mods_path)} (PNG companion exists)", "success")
+                    else:
+                        skipped_count += 1
+                        # self.log_message(f"Skipped: {os.path.relpath(dds_path, mods_path)} (No PNG companion found)", "info") # reduce log spam
+                except Exception as e:
+                    errors += 1
+                    self.log_message(f"Error deleting {os.path.relpath(dds_path, mods_path)}: {e}", "error")
+            
+            final_elapsed_time = time.time() - start_time
+            if self.cancel_requested:
+                self.log_message("Restoration process was cancelled.", "warning")
+            else:
+                self.log_message("🎉 PNG Restoration Complete!", "success")
+            
+            self.log_message(f"DDS files deleted: {deleted_count}", "info")
+            self.log_message(f"DDS files skipped (no PNG companion): {skipped_count}", "info")
+            self.log_message(f"Errors during deletion: {errors}", "error" if errors > 0 else "info")
+            self.log_message(f"Total time: {final_elapsed_time:.1f} seconds", "info")
+            self.update_progress(100, "Restoration Finished" if not self.cancel_requested else "Restoration Cancelled", f"{final_elapsed_time:.1f}s")
+
+        except Exception as e:
+            self.log_message(f"An unexpected error occurred during restoration: {e}", "error")
+            self.update_progress(100, "Error during restoration", "")
+
+def run_worker_process(job, settings, event_queue, cancel_event, kwargs):
+    """Entry point of the worker child process: run one ConversionWorker job."""
+    events = EventBatcher(event_queue)
+    try:
+        worker = ConversionWorker(settings, events, cancel_event)
+        getattr(worker, job)(**kwargs)
+    except Exception as e:
+        events.log(f"💥 Worker process failed: {e}", "error")
+    finally:
+        events.close()
+
+class DaemonWorker:
+    """
+    A job running on the conversion daemon, behind the interfaces the GUI uses for a local job:
+    the worker process (is_alive/join/exitcode/terminate), its cancel event (set) and its event
+    queue (get_nowait/empty). A reader thread collects the job's events as they are streamed.
+    """
+    
+    def __init__(self, client, job_id):
+        self.client = client
+        self.job_id = job_id
+        self.exitcode = None # 0 once the job's 'done' event arrived
+        self.events = []
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read_events, daemon=True)
+    
+    def start(self):
+        self.reader.start()
+    
+    def _read_events(self):
+        try:
+            for event in self.client.events(self.job_id):
+                with self.lock:
+                    self.events.append(tuple(event))
+                if event[0] == 'done':
+                    self.exitcode = 0
+        except (OSError, ValueError):
+            pass # Daemon gone; reported by _poll_worker as an unexpected end
+        if self.exitcode is None:
+            self.exitcode = 1
+    
+    def get_nowait(self):
+        import queue
+        with self.lock:
+            batch, self.events = self.events, []
+        if not batch:
+            raise queue.Empty
+        return batch
+    
+    def empty(self):
+        with self.lock:
+            return not self.events
+    
+    def is_alive(self):
+        return self.reader.is_alive()
+    
+    def join(self, timeout=None):
+        self.reader.join(timeout)
+    
+    def set(self):
+        try:
+            self.client.cancel(self.job_id)
+        except OSError:
+            pass
+    
+    terminate = set # The job cannot be killed from here; cancelling is all a client can do
+
+class RimWorldOptimizerGUI:
+    def __init__(self, root):
+        self.root = root
+        self.config = self.load_config() # Load config first to get geometry
+
+        # Set window geometry
+        saved_geometry = self.config.get('window_geometry')
+        if saved_geometry:
+            try:
+                # Validate geometry string format (e.g., "800x600+100+100")
+                if isinstance(saved_geometry, str) and 'x' in saved_geometry and '+' in saved_geometry:
+                    self.root.geometry(saved_geometry)
+                else:
+                    self.root.geometry("800x650") # Default if format is invalid
+                    self.log_message(f"Invalid window geometry format in config: {saved_geometry}. Using default.", "warning") # Log if possible, or print
+            except tk.TclError: # Catch errors if Tkinter can't parse the geometry
+                self.root.geometry("800x650") # Default on error
+                self.log_message(f"Error applying window geometry: {saved_geometry}. Using default.", "warning")
+        else:
+            self.root.geometry("800x650") # Default if not found
+
+        self.root.title("RimConvert") # UPDATED default window title
+        # self.root.geometry("800x650") # Moved up
+        self.root.resizable(True, True)
+        
+        # Configuration
+        # self.config = self.load_config() # Moved up
+        self.processing = False
+        self.cancel_requested = False
+        self.worker_process = None # Child process running the current job
+        self.event_queue = None
+        self.cancel_event = None
+        
+        # Thread-safe variables
+        self.progress_var = IntVar()
+        self.status_var = StringVar(value="Initializing...") # Initial status
+        self.eta_var = StringVar(value="")
+        self.mods_path_var = StringVar() # Moved initialization here
+        self.texconv_path_var = StringVar() # Moved initialization here
+        
+        # Setup GUI
+        self.setup_style()
+        self.create_widgets()
+        self.load_settings() 
+        self._reset_ui_state() 
+        if os.path.isdir(self.mods_path_var.get()):
+            self.root.after(500, self.start_scan) # Fill the mod list once the window is up
+        
+        # Protocol handler for window close
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+    def on_closing(self):
+        """Handle window closing: save config (including geometry) and destroy window."""
+        # Save current geometry
+        self.config['window_geometry'] = self.root.geometry()
+        self.save_config()
+        if self.worker_process and self.worker_process.is_alive():
+            self.cancel_event.set()
+            self.worker_process.join(timeout=5)
+            if self.worker_process.is_alive():
+                self.worker_process.terminate()
+        self.root.destroy()
+
+    def setup_style(self):
+        """Setup dark theme styling to mimic Windows Dark Mode."""
+        self.style = ttk.Style()
+
+        # Windows Dark Mode-inspired colors
+        self.win_bg_color = "#202020"      # Overall window/frame background (dark gray)
+        self.win_fg_color = "#FFFFFF"      # General text (pure white for better contrast)
+        
+        self.ctrl_bg_color = "#2D2D2D"     # Background for buttons, entries (medium dark gray)
+        self.ctrl_fg_color = "#FFFFFF"     # Text on controls (pure white)
+        
+        self.ctrl_hover_bg_color = "#3E3E3E" # Button hover (slightly lighter gray)
+        self.ctrl_active_bg_color = "#4A4A4A" # Button pressed (even lighter)
+        
+        self.entry_field_bg_color = "#252525" # Background of text input area (very dark gray)
+        
+        self.accent_color = "#0078D4"      # Accent for progress bar, selections (Windows blue)
+        self.accent_fg_color = "#FFFFFF"   # Text on accent background (white)
+
+        self.disabled_fg_color = "#6B6B6B" # Disabled text color (medium gray)
+        self.log_bg_color = "#1E1E1E"      # Log area background (very dark, like VS Code terminal)
+        self.border_color = "#3C3C3C"      # Subtle border color for controls
+        self.labelframe_bg_color = "#202020"  # Explicit background for label frames
+
+        self.root.configure(bg=self.win_bg_color)
+        
+        self.style.theme_use('clam') 
+
+        # Configure the theme to use our dark colors as defaults
+        self.style.configure('.', 
+                             background=self.win_bg_color,
+                             foreground=self.win_fg_color,
+                             bordercolor=self.border_color,
+                             focuscolor=self.accent_color)
+
+        # General Frame and Label
+        self.style.configure('TFrame', 
+                             background=self.win_bg_color,
+                             borderwidth=0,
+                             relief='flat')
+        
+        self.style.configure('TLabel', 
+                             background=self.win_bg_color, 
+                             foreground=self.win_fg_color, 
+                             padding=2,
+                             font=('Segoe UI Variable Text', 9))
+        
+        self.style.configure('Header.TLabel', 
+                             background=self.win_bg_color,
+                             foreground=self.win_fg_color,
+                             font=('Segoe UI Variable Text', 16, 'bold')) 
+        
+        self.style.configure('Subtitle.TLabel', 
+                             background=self.win_bg_color,
+                             foreground=self.win_fg_color,
+                             font=('Segoe UI Variable Text', 10))
+
+        # Button
+        self.style.configure('TButton', 
+                             background=self.ctrl_bg_color, 
+                             foreground=self.ctrl_fg_color,
+                             bordercolor=self.border_color, 
+                             lightcolor=self.ctrl_bg_color,
+                             darkcolor=self.ctrl_bg_color,
+                             font=('Segoe UI Variable Text', 9),
+                             padding=(8, 5),
+                             relief='flat',
+                             borderwidth=1)
+        self.style.map('TButton',
+                       background=[('active', self.ctrl_active_bg_color), 
+                                   ('hover', self.ctrl_hover_bg_color),
+                                   ('disabled', self.ctrl_bg_color)],
+                       foreground=[('disabled', self.disabled_fg_color),
+                                   ('active', self.ctrl_fg_color),
+                                   ('hover', self.ctrl_fg_color)],
+                       bordercolor=[('disabled', self.disabled_fg_color)])
+
+        # Entry
+        self.style.configure('TEntry', 
+                             fieldbackground=self.entry_field_bg_color, 
+                             foreground=self.ctrl_fg_color, 
+                             insertcolor=self.ctrl_fg_color, 
+                             bordercolor=self.border_color, 
+                             lightcolor=self.entry_field_bg_color,
+                             darkcolor=self.entry_field_bg_color,
+                             padding=5,
+                             relief='flat',
+                             borderwidth=1)
+        self.style.map('TEntry',
+                       foreground=[('disabled', self.disabled_fg_color)],
+                       fieldbackground=[('disabled', self.ctrl_bg_color)],
+                       bordercolor=[('focus', self.accent_color), ('disabled', self.disabled_fg_color)])
+
+        # Progressbar
+        self.style.configure('TProgressbar', 
+                             background=self.accent_color, 
+                             troughcolor=self.ctrl_bg_color,
+                             bordercolor=self.border_color,
+                             lightcolor=self.ctrl_bg_color,
+                             darkcolor=self.ctrl_bg_color,
                              thickness=12,
                              relief='flat',
                              borderwidth=1)
@@ -295,6 +1128,27 @@ class RimWorldOptimizerGUI:
                                    ('hover', self.accent_color),
                                    ('disabled', self.disabled_fg_color)],
                        troughcolor=[('disabled', self.win_bg_color)])
+        
+        # Treeview (mod list)
+        self.style.configure('Treeview', 
+                             background=self.entry_field_bg_color,
+                             fieldbackground=self.entry_field_bg_color,
+                             foreground=self.ctrl_fg_color,
+                             bordercolor=self.border_color,
+                             relief='flat',
+                             borderwidth=1,
+                             rowheight=22)
+        self.style.map('Treeview',
+                       background=[('selected', self.accent_color)],
+                       foreground=[('selected', self.accent_fg_color)])
+        self.style.configure('Treeview.Heading', 
+                             background=self.ctrl_bg_color,
+                             foreground=self.ctrl_fg_color,
+                             bordercolor=self.border_color,
+                             relief='flat',
+                             font=('Segoe UI Variable Text', 9, 'bold'))
+        self.style.map('Treeview.Heading',
+                       background=[('active', self.ctrl_hover_bg_color)])
 
         # ScrolledText styling
         self.log_text_font = ('Consolas', 10) # Using a common monospace font
@@ -340,7 +1194,7 @@ class RimWorldOptimizerGUI:
         
         # Upscaling options
         self.enable_upscaling_var = BooleanVar(value=True)
-        upscale_check = ttk.Checkbutton(settings_frame, text="Enable 2x upscaling for images smaller than 256x256 pixels", 
+        upscale_check = ttk.Checkbutton(settings_frame, text=f"Enable upscaling (up to 2x) for images smaller than {optimizer.MIN_UPSCALING_DIM} pixels", 
                                        variable=self.enable_upscaling_var)
         upscale_check.grid(row=0, column=0, columnspan=2, sticky="w", pady=3)
         
@@ -357,6 +1211,34 @@ class RimWorldOptimizerGUI:
         # gpu_check.grid(row=2, column=0, columnspan=2, sticky="w", pady=3) # Original position commented out
         gpu_check.grid(row=1, column=0, columnspan=2, sticky="w", pady=3) # New position (row 1, as mipmap_check is removed)
         
+        # Discovery: only textures the game loads (LoadFolders.xml / version folders) for the selected version
+        self.loaded_only_var = BooleanVar(value=True)
+        loaded_only_check = ttk.Checkbutton(settings_frame, text="Only convert textures the game loads (LoadFolders.xml) for RimWorld version:", 
+                                           variable=self.loaded_only_var)
+        loaded_only_check.grid(row=2, column=0, sticky="w", pady=3)
+        
+        self.game_version_var = StringVar(value=optimizer.GAME_VERSION)
+        game_version_combo = ttk.Combobox(settings_frame, textvariable=self.game_version_var, 
+                                          values=list(optimizer.GAME_VERSIONS), state="readonly", width=6,
+                                          font=('Segoe UI Variable Text', 9))
+        game_version_combo.grid(row=2, column=1, sticky="w", padx=(5, 0), pady=3)
+        
+        # Encoder speed/quality preset ('auto' calibrates on a sample of the mods first)
+        preset_label = ttk.Label(settings_frame, text="Encoder preset (fast / balanced / max quality, or auto):")
+        preset_label.grid(row=3, column=0, sticky="w", pady=3)
+        
+        self.encoder_preset_var = StringVar(value=optimizer.ENCODER_PRESET)
+        preset_combo = ttk.Combobox(settings_frame, textvariable=self.encoder_preset_var, 
+                                    values=list(optimizer.PRESET_QUALITY_ORDER) + ['auto'], state="readonly", width=9,
+                                    font=('Segoe UI Variable Text', 9))
+        preset_combo.grid(row=3, column=1, sticky="w", padx=(5, 0), pady=3)
+        
+        # Background mode: low priority, part of the CPU, slower while RimWorld runs
+        self.background_var = BooleanVar(value=False)
+        background_check = ttk.Checkbutton(settings_frame, text="Background mode (low priority, slows down while RimWorld is running)",
+                                          variable=self.background_var)
+        background_check.grid(row=4, column=0, columnspan=2, sticky="w", pady=3)
+        
         # Compression format (UI Hidden, forced to BC7_UNORM)
         # compression_label = ttk.Label(settings_frame, text="Compression format:") # UI element commented out
         # compression_label.grid(row=3, column=0, sticky="w", pady=(8,5)) # UI element commented out
@@ -367,6 +1249,44 @@ class RimWorldOptimizerGUI:
         #                                font=('Segoe UI Variable Text', 9))
         # compression_combo.grid(row=3, column=1, sticky="w", padx=(10, 0), pady=(8,5)) # UI element commented out
         
+        # Mod list - filled by a quick scan (no conversion); select mods to convert or restore only those
+        mods_frame = ttk.LabelFrame(main_frame, text="Mods", padding="10", style="TLabelframe")
+        mods_frame.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(0, 5))
+        mods_frame.columnconfigure(0, weight=1)
+        
+        self.mod_tree = ttk.Treeview(mods_frame, columns=MOD_LIST_COLUMNS, height=6, selectmode="extended")
+        self.mod_tree.heading("#0", text="Mod", command=lambda: self._sort_mod_list("#0"))
+        self.mod_tree.column("#0", width=260, stretch=True)
+        for column, title, width in (("textures", "Textures", 80), ("mpx", "Mpx", 70),
+                                     ("converted", "Converted", 80), ("time", "Est. time", 90)):
+            self.mod_tree.heading(column, text=title, command=lambda column=column: self._sort_mod_list(column))
+            self.mod_tree.column(column, width=width, anchor=E, stretch=False)
+        self.mod_tree.grid(row=0, column=0, sticky="ew")
+        mod_scrollbar = ttk.Scrollbar(mods_frame, orient="vertical", command=self.mod_tree.yview)
+        mod_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.mod_tree.configure(yscrollcommand=mod_scrollbar.set)
+        self.mod_rows = {} # folder -> plan row, for sorting and the selection total
+        self.pending_scan = None # Mods to rescan when the current job finishes
+        self.mod_tree.bind("<<TreeviewSelect>>", self._show_selection_total)
+        
+        mod_buttons_frame = ttk.Frame(mods_frame, style="TFrame")
+        mod_buttons_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(8, 0))
+        
+        self.scan_button = ttk.Button(mod_buttons_frame, text="🔍 Scan Mods", 
+                                     command=self.start_scan)
+        self.scan_button.pack(side=LEFT, padx=(0, 5))
+        
+        self.convert_selected_button = ttk.Button(mod_buttons_frame, text="🔄 Convert Selected", 
+                                                 command=self.convert_selected, state=DISABLED)
+        self.convert_selected_button.pack(side=LEFT, padx=5)
+        
+        self.restore_selected_button = ttk.Button(mod_buttons_frame, text="🔙 Restore Selected", 
+                                                 command=self.restore_selected, state=DISABLED)
+        self.restore_selected_button.pack(side=LEFT, padx=5)
+        
+        self.selection_var = StringVar(value="")
+        ttk.Label(mod_buttons_frame, textvariable=self.selection_var).pack(side=RIGHT, padx=5)
+        
         # Action buttons frame
         buttons_frame = ttk.Frame(main_frame, style="TFrame")
         buttons_frame.grid(row=5, column=0, columnspan=3, pady=15)
@@ -375,6 +1295,18 @@ class RimWorldOptimizerGUI:
                                         command=self.start_conversion)
         self.convert_button.pack(side=LEFT, padx=5)
         
+        self.resume_button = ttk.Button(buttons_frame, text="⏯ Resume", 
+                                       command=self.resume_conversion, state=DISABLED)
+        self.resume_button.pack(side=LEFT, padx=5)
+        
+        self.watch_button = ttk.Button(buttons_frame, text="👁 Watch", 
+                                      command=self.start_watch)
+        self.watch_button.pack(side=LEFT, padx=5)
+        
+        self.plan_button = ttk.Button(buttons_frame, text="📋 Plan", 
+                                     command=self.start_plan)
+        self.plan_button.pack(side=LEFT, padx=5)
+        
         self.restore_button = ttk.Button(buttons_frame, text="🔙 Restore PNGs", 
                                         command=self.restore_pngs)
         self.restore_button.pack(side=LEFT, padx=5)
@@ -399,533 +1331,308 @@ class RimWorldOptimizerGUI:
         status_frame.columnconfigure(0, weight=1)
         
         self.status_label = ttk.Label(status_frame, textvariable=self.status_var)
-        self.status_label.grid(row=0, column=0, sticky=W)
-        
-        self.eta_label = ttk.Label(status_frame, textvariable=self.eta_var)
-        self.eta_label.grid(row=0, column=1, sticky=E)
-        
-        # Log area - explicitly use TLabelframe style
-        log_frame = ttk.LabelFrame(main_frame, text="Conversion Log", padding="15", style="TLabelframe")
-        log_frame.grid(row=7, column=0, columnspan=3, sticky="nsew", pady=10)
-        log_frame.columnconfigure(0, weight=1)
-        log_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(7, weight=1)
-        
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80, 
-                                                 bg=self.log_bg_color, fg=self.win_fg_color,
-                                                 insertbackground=self.win_fg_color,
-                                                 relief='flat',
-                                                 borderwidth=0,
-                                                 font=self.log_text_font,
-                                                 selectbackground=self.accent_color,
-                                                 selectforeground=self.accent_fg_color)
-        self.log_text.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
-        
-        # Configure text tags for colored output
-        self.log_text.tag_configure("info", foreground="#87ceeb")
-        self.log_text.tag_configure("success", foreground="#90ee90")
-        self.log_text.tag_configure("warning", foreground="#ffa500")
-        self.log_text.tag_configure("error", foreground="#ff6b6b")
-        
-        # Tip label REMOVED
-        # tip_label = ttk.Label(main_frame, 
-        #                      text="💡 Tip: You can minimize this window and continue other work during conversion", 
-        #                      font=("Segoe UI Variable Text", 9))
-        # tip_label.grid(row=8, column=0, columnspan=3, pady=(10,5))
-    
-    def _reset_ui_state(self):
-        """Helper to reset UI elements to their default state (must be called from main thread)."""
-        texconv_ok = bool(self.texconv_path_var.get() and os.path.exists(self.texconv_path_var.get()))
-
-        if texconv_ok:
-            self.convert_button.config(state=NORMAL)
-            if hasattr(self, 'status_var'): 
-                 self.status_var.set("Ready")
-        else:
-            self.convert_button.config(state=DISABLED)
-            if hasattr(self, 'status_var'): 
-                 self.status_var.set("texconv.exe not found. Conversion disabled.")
-        
-        self.restore_button.config(state=NORMAL) # Restore doesn't depend on texconv
-        self.cancel_button.config(state=DISABLED)
-        self.root.title("RimConvert") # UPDATED reset window title
-        self.processing = False # Ensure processing flag is reset
-
-    def load_config(self):
-        """Load configuration from JSON file."""
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                # If loading fails, return an empty dict
-                self.log_message(f"Error loading config file {CONFIG_FILE}. Using defaults.", "warning")
-                return {}
-        return {} # If file doesn't exist, return an empty dict
-
-    def save_config(self):
-        """Save configuration to JSON file."""
-        config = {
-            'mods_path': self.mods_path_var.get(),
-            'enable_upscaling': self.enable_upscaling_var.get(),
-            'enable_gpu': self.enable_gpu_var.get(),
-            # 'generate_mipmaps': self.generate_mipmaps_var.get(), # Option removed from UI and config
-            # 'compression_format': self.compression_var.get(),   # Option removed from UI and config
-            'window_geometry': self.root.geometry() if hasattr(self.root, 'geometry') else None 
-        }
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
-            self.log_message(f"Could not save config: {e}", "warning")
-
-    def load_settings(self):
-        """Load settings from config."""
-        self.mods_path_var.set(self.config.get('mods_path', r"C:\\Steam\\steamapps\\common\\RimWorld\\Mods"))
-        
-        detected_texconv_path = get_texconv_path()
-        self.texconv_path_var.set(detected_texconv_path)
-        if not detected_texconv_path:
-            self.log_message("texconv.exe not found in the 'compressors' subdirectory next to the application. Conversion features will be disabled.", "error")
-        else:
-            self.log_message(f"Found texconv.exe at: {detected_texconv_path}", "info")
-            
-        self.enable_upscaling_var.set(self.config.get('enable_upscaling', True))
-        self.enable_gpu_var.set(self.config.get('enable_gpu', True))
-        
-        # Force mipmaps and compression format, ignore any saved config values for these
-        self.generate_mipmaps_var.set(True)     # Forced True
-        self.compression_var.set("BC7_UNORM")   # Forced BC7_UNORM
-    
-    def browse_mods_folder(self):
-        """Browse for RimWorld mods folder."""
-        folder = filedialog.askdirectory(title="Select RimWorld Mods Folder",
-                                        initialdir=self.mods_path_var.get())
-        if folder:
-            self.mods_path_var.set(folder)
-    
-    def log_message(self, message, level="info"):
-        """Add message to log with timestamp and coloring."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
+        self.status_label.grid(row=0, column=0, sticky=W)
         
-        # Thread-safe GUI update
-        self.root.after(0, self._update_log, formatted_message, level)
-    
-    def _update_log(self, message, level):
-        """Update log text widget (must be called from main thread)."""
-        self.log_text.insert(END, message, level)
-        self.log_text.see(END)
-        self.root.update_idletasks()
-    
-    def update_progress(self, value, status="", eta=""):
-        """Update progress bar and status (thread-safe)."""
-        self.root.after(0, self._update_progress_gui, value, status, eta)
-    
-    def _update_progress_gui(self, value, status, eta):
-        """Update progress GUI elements (must be called from main thread)."""
-        self.progress_var.set(value)
-        if status:
-            self.status_var.set(status)
-        if eta:
-            self.eta_var.set(eta)
+        self.eta_label = ttk.Label(status_frame, textvariable=self.eta_var)
+        self.eta_label.grid(row=0, column=1, sticky=E)
         
-        # Update window title with progress
-        if self.processing and value > 0:
-            self.root.title(f"RimConvert - {value}% Complete") # UPDATED Title during processing
-        elif not self.processing:
-            self.root.title("RimConvert") # UPDATED default/idle window title
+        # Log area - explicitly use TLabelframe style
+        log_frame = ttk.LabelFrame(main_frame, text="Conversion Log", padding="15", style="TLabelframe")
+        log_frame.grid(row=7, column=0, columnspan=3, sticky="nsew", pady=10)
+        log_frame.columnconfigure(0, weight=1)
+        log_frame.rowconfigure(0, weight=1)
+        main_frame.rowconfigure(7, weight=1)
         
-        self.root.update_idletasks()
-          
-    def validate_settings(self):
-        """Validate current settings."""
-        if not os.path.exists(self.mods_path_var.get()):
-            messagebox.showerror("Error", "RimWorld mods folder does not exist!")
-            return False
+        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80, 
+                                                 bg=self.log_bg_color, fg=self.win_fg_color,
+                                                 insertbackground=self.win_fg_color,
+                                                 relief='flat',
+                                                 borderwidth=0,
+                                                 font=self.log_text_font,
+                                                 selectbackground=self.accent_color,
+                                                 selectforeground=self.accent_fg_color)
+        self.log_text.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
         
-        # Validate auto-detected texconv.exe path
-        current_texconv_path = self.texconv_path_var.get()
-        if not current_texconv_path or not os.path.exists(current_texconv_path):
-            # Attempt to re-detect, in case it was placed there after app start (unlikely for exe)
-            # but more for robustness during script development.
-            # For a running .exe, this re-check might not be as useful if it failed initially.
-            refreshed_texconv_path = get_texconv_path()
-            if refreshed_texconv_path and os.path.exists(refreshed_texconv_path):
-                self.texconv_path_var.set(refreshed_texconv_path)
-                self.log_message(f"Re-detected texconv.exe at: {refreshed_texconv_path}", "info")
-                # Update UI state if it was previously disabled
-                self._reset_ui_state() # This will re-evaluate button states
-            else:
-                messagebox.showerror("Error", "texconv.exe was not found in the 'compressors' subdirectory next to the application. Please ensure it is correctly placed and restart the application if necessary.")
-                return False
+        # Configure text tags for colored output
+        self.log_text.tag_configure("info", foreground="#87ceeb")
+        self.log_text.tag_configure("success", foreground="#90ee90")
+        self.log_text.tag_configure("warning", foreground="#ffa500")
+        self.log_text.tag_configure("error", foreground="#ff6b6b")
         
-        return True
+        # Tip label REMOVED
+        # tip_label = ttk.Label(main_frame, 
+        #                      text="💡 Tip: You can minimize this window and continue other work during conversion", 
+        #                      font=("Segoe UI Variable Text", 9))
+        # tip_label.grid(row=8, column=0, columnspan=3, pady=(10,5))
     
-    def _get_image_info_gui(self, image_path):
-        """GUI version of get_image_info, logs errors via self.log_message."""
-        if not PILLOW_AVAILABLE or PILImage is None:
-            self.log_message(f"Pillow not available, cannot get image info for {os.path.basename(image_path)}", "error")
-            return None
-        try:
-            with PILImage.open(image_path) as img:                return {
-                    'width': img.width,
-                    'height': img.height,
-                    'mode': img.mode,
-                    'has_alpha': img.mode in ('RGBA', 'LA') or 'transparency' in img.info
-                }
-        except Exception as e:
-            self.log_message(f"Could not read image info for {os.path.basename(image_path)}: {e}", "warning")
-            return None
-
-    def _upscale_image_gui(self, image_path, output_path, target_width, target_height):
-        """GUI version of upscale_image, logs errors via self.log_message."""
-        if not PILLOW_AVAILABLE or PILImage is None:
-            self.log_message(f"Pillow not available, cannot upscale {os.path.basename(image_path)}", "error")
-            return False
-        try:
-            with PILImage.open(image_path) as img:
-                upscaled_img = img.resize((target_width, target_height), PILImage.Resampling.LANCZOS)
-                upscaled_img.save(output_path, 'PNG', optimize=True)
-                return True
-        except Exception as e:
-            self.log_message(f"Failed to upscale image {os.path.basename(image_path)}: {e}", "error")
-            return False
+    def _reset_ui_state(self):
+        """Helper to reset UI elements to their default state (must be called from main thread)."""
+        texconv_ok = bool(self.texconv_path_var.get() and os.path.exists(self.texconv_path_var.get()))
 
-    def _convert_png_to_dds_gui(self, png_path_to_convert, dds_output_path, has_alpha, use_gpu, texconv_path, compression_format, generate_mipmaps):
-        """
-        GUI version of convert_png_to_dds, logs messages via self.log_message.
+        if texconv_ok:
+            self.convert_button.config(state=NORMAL)
+            self.watch_button.config(state=NORMAL)
+            resumable = optimizer.RunJournal.is_resumable(self.mods_path_var.get())
+            self.resume_button.config(state=NORMAL if resumable else DISABLED)
+            if hasattr(self, 'status_var'): 
+                 self.status_var.set("Ready (interrupted run can be resumed)" if resumable else "Ready")
+        else:
+            self.convert_button.config(state=DISABLED)
+            self.resume_button.config(state=DISABLED)
+            self.watch_button.config(state=DISABLED)
+            if hasattr(self, 'status_var'): 
+                 self.status_var.set("texconv.exe not found. Conversion disabled.")
         
-        Key parameters based on RimPy's successful approach:
-        - BC7_UNORM for best quality with alpha support
-        - Generate mipmaps for performance
-        - Proper handling of alpha channels
-        - FLIPPED INPUT: Pre-flip PNG before conversion to correct in-game orientation
-        - Optional GPU acceleration.
-        """
-        temp_flipped_path = None
-        input_path = png_path_to_convert # Default to original path
-
-        try:
-            # Pre-flip the PNG to correct in-game orientation issues
-            if PILImage is not None: # Check if PILImage module is loaded
-                temp_flipped_path = os.path.splitext(png_path_to_convert)[0] + f"_temp_flipped_gui_{int(time.time()*1000)}.png"
-                
-                try:
-                    with PILImage.open(png_path_to_convert) as img:
-                        flipped_img = img.transpose(PILImage.Transpose.FLIP_TOP_BOTTOM)
-                        flipped_img.save(temp_flipped_path)
-                        
-                    input_path = temp_flipped_path # Use the flipped image for conversion
-                    self.log_message(f"Pre-flipped texture for correct orientation: {os.path.basename(png_path_to_convert)}", "info")
-                    
-                except Exception as e:
-                    self.log_message(f"Failed to flip texture {os.path.basename(png_path_to_convert)}: {e}", "warning")
-                    self.log_message("Proceeding with original texture (may appear upside down in-game)", "warning")
-                    # input_path remains png_path_to_convert
-            else:
-                self.log_message("Pillow (PIL) module not loaded. Cannot pre-flip. Textures might appear upside down.", "warning")
-                # input_path remains png_path_to_convert
-
-            base_cmd = [
-                texconv_path,
-                "-f", compression_format,
-                "-o", os.path.dirname(dds_output_path),
-                "-y",
-                "-ft", "dds"
-            ]
-            if generate_mipmaps:
-                base_cmd.extend(["-m", "0"])
-            if has_alpha:
-                base_cmd.append("-pmalpha")
-
-            cmd_to_run = list(base_cmd) # Make a copy
-            if use_gpu:
-                cmd_to_run.extend(["-gpu", "0"])
-            cmd_to_run.append(input_path)
-
-            # self.log_message(f"Converting ({'GPU' if use_gpu else 'CPU'}): {os.path.basename(png_path_to_convert)} -> {os.path.basename(dds_output_path)}", "info")
-            
-            result = subprocess.run(
-                cmd_to_run, 
-                capture_output=True, 
-                text=True, 
-                timeout=120, # Increased timeout for potentially slower individual conversions
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            
-            if result.returncode == 0:
-                # texconv creates files with original name + .dds, need to rename if output path is different
-                # This logic might be simplified if dds_output_path is always derived correctly.
-                generated_dds_by_texconv = os.path.join(os.path.dirname(dds_output_path),
-                                           os.path.splitext(os.path.basename(input_path))[0] + ".dds")
-                
-                if generated_dds_by_texconv != dds_output_path and os.path.exists(generated_dds_by_texconv):
-                    shutil.move(generated_dds_by_texconv, dds_output_path)
-                elif not os.path.exists(dds_output_path):
-                    # This case implies texconv might have failed silently or output name mismatch
-                    self.log_message(f"texconv reported success for {os.path.basename(png_path_to_convert)} but output DDS {os.path.basename(dds_output_path)} not found. Generated: {generated_dds_by_texconv}", "error")
-                    # self.log_message(f"texconv stdout: {result.stdout}", "error")
-                    # self.log_message(f"texconv stderr: {result.stderr}", "error")
-                    return False
-                return True
-            else:
-                self.log_message(f"texconv failed for {os.path.basename(png_path_to_convert)} ({'GPU' if use_gpu else 'CPU'} attempt).", "error")
-                # self.log_message(f"Command: {' '.join(cmd_to_run)}", "error") # Can be too verbose
-                # self.log_message(f"Error output: {result.stderr}", "error")
-                return False
-        except subprocess.TimeoutExpired:
-            self.log_message(f"Conversion timeout for {os.path.basename(png_path_to_convert)} ({'GPU' if use_gpu else 'CPU'} attempt).", "error")
-            return False
-        except Exception as e:
-            self.log_message(f"Conversion failed for {os.path.basename(png_path_to_convert)}: {e}", "error")
-            return False
-        finally:
-            # Clean up temporary flipped file
-            if temp_flipped_path and os.path.exists(temp_flipped_path):
-                try:
-                    os.remove(temp_flipped_path)
-                except Exception as e_cleanup:
-                    self.log_message(f"Could not remove temporary flipped file {os.path.basename(temp_flipped_path)}: {e_cleanup}", "warning")
-
-    def _process_single_file_gui_task(self, png_path, texconv_path, compression_format, 
-                                    enable_upscaling, generate_mipmaps, enable_gpu_preference, 
-                                    target_upscale_min_dim=256): # Added target_upscale_min_dim
-        task_stats = {'status': 'unknown', 'upscaled': False, 'original_path': png_path}
-        temp_path = None # Initialize temp_path for robustness in finally block
-        try:
-            dds_path = Path(png_path).with_suffix('.dds')
-
-            if self.cancel_requested:
-                task_stats['status'] = 'cancelled'
-                return task_stats
-
-            # DDS Skipping Logic
-            if dds_path.exists():
-                try:
-                    png_mtime = os.path.getmtime(png_path)
-                    dds_mtime = os.path.getmtime(dds_path)
-                    if dds_mtime > png_mtime:
-                        self.log_message(f"Skipping (DDS newer): {os.path.basename(png_path)}", "info")
-                        task_stats['status'] = 'skipped_newer'
-                        return task_stats
-                except FileNotFoundError:
-                    self.log_message(f"File not found during mtime check for {os.path.basename(png_path)}. Processing.", "warning")
-                except Exception as e_mtime:
-                    self.log_message(f"Error checking mtime for {os.path.basename(png_path)}: {e_mtime}. Processing.", "warning")
-            
-            img_info = self._get_image_info_gui(png_path)
-            if not img_info:
-                task_stats['status'] = 'error_img_info'
-                return task_stats
-
-            current_path_for_conversion = png_path
-            
-            if enable_upscaling and (img_info['width'] < target_upscale_min_dim or img_info['height'] < target_upscale_min_dim):
-                if self.cancel_requested: return {**task_stats, 'status': 'cancelled'}
-                
-                # Upscale by 2x
-                new_width = img_info['width'] * 2
-                new_height = img_info['height'] * 2
-                new_width = max(1, new_width) # Ensure dimensions are at least 1
-                new_height = max(1, new_height)
-
-                # Using a more unique temp name
-                temp_filename = f"temp_gui_upscaled_{os.path.splitext(os.path.basename(png_path))[0]}_{int(time.time()*1000)}_{os.urandom(4).hex()}.png"
-                temp_path = os.path.join(os.path.dirname(png_path), temp_filename)
-
-                self.log_message(f"Upscaling {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to {new_width}x{new_height}", "info")
-                if self._upscale_image_gui(png_path, temp_path, new_width, new_height):
-                    current_path_for_conversion = temp_path
-                    task_stats['upscaled'] = True
-                else:
-                    task_stats['status'] = 'error_upscale'
-                    # Error already logged by _upscale_image_gui
-                    return task_stats
-            
-            if self.cancel_requested: return {**task_stats, 'status': 'cancelled'}
-
-            conversion_successful = False
-            # Attempt GPU conversion if preferred
-            if enable_gpu_preference:
-                self.log_message(f"Converting (GPU): {os.path.basename(current_path_for_conversion)} -> {dds_path.name}", "info")
-                if self._convert_png_to_dds_gui(current_path_for_conversion, str(dds_path), img_info['has_alpha'], True, texconv_path, compression_format, generate_mipmaps):
-                    conversion_successful = True
-                    task_stats['status'] = 'gpu_converted'
-                else:
-                    self.log_message(f"GPU conversion failed for {os.path.basename(current_path_for_conversion)}. Trying CPU.", "warning")
-            
-            # If GPU not preferred, or if GPU failed, try CPU
-            if not conversion_successful:
-                if self.cancel_requested: return {**task_stats, 'status': 'cancelled'}
-                self.log_message(f"Converting (CPU): {os.path.basename(current_path_for_conversion)} -> {dds_path.name}", "info")
-                if self._convert_png_to_dds_gui(current_path_for_conversion, str(dds_path), img_info['has_alpha'], False, texconv_path, compression_format, generate_mipmaps):
-                    conversion_successful = True
-                    task_stats['status'] = 'cpu_converted'
-                else:
-                    # Error already logged by _convert_png_to_dds_gui
-                    task_stats['status'] = 'error_cpu_conversion'
-            
-            if conversion_successful and task_stats['status'] not in ['gpu_converted', 'cpu_converted']:
-                 # Should not happen if logic is correct, but as a fallback
-                 task_stats['status'] = 'error_unknown_conversion_state'
-            elif not conversion_successful and task_stats['status'] == 'unknown':
-                 task_stats['status'] = 'error_conversion_failed_completely'
-
-            return task_stats
-
-        except Exception as e_task:
-            self.log_message(f"Unexpected error processing {os.path.basename(png_path)} in task: {e_task}", "error")
-            task_stats['status'] = 'error_unexpected'
-            return task_stats
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except Exception as e_remove_temp:
-                    self.log_message(f"Could not remove temp upscaled file {os.path.basename(temp_path)}: {e_remove_temp}", "warning")
-
-    def conversion_worker(self):
-        """Background worker for texture conversion, now using ThreadPoolExecutor."""
-        progress_percent = 0 # Initialize progress_percent
-        final_stats = {'success': 0, 'fail': 0, 'skipped': 0, 'upscaled': 0, 'total_processed_in_loop': 0} # Initialize final_stats
-        self.last_progress_percent = 0 # Track last progress percent for final update
-        worker_start_time = time.time() # Track overall worker start time
-        try:
-            self.log_message("🚀 Starting texture conversion (GUI Parallel)...")
-            mods_path_str = self.mods_path_var.get()
-            texconv_path_str = self.texconv_path_var.get()
-            
-            # Force compression format and mipmap generation for GUI operations
-            compression_format_str = "BC7_UNORM" 
-            generate_mipmaps_bool = True
-            
-            enable_upscaling_bool = self.enable_upscaling_var.get()
-            enable_gpu_preference_bool = self.enable_gpu_var.get()
-
-            if not PILLOW_AVAILABLE:
-                # This check should ideally be before starting the worker or disable button
-                # but for now, ensure it logs and exits gracefully if worker somehow starts.
-                self.log_message("Pillow library not available. Conversion cannot proceed.", "error")
-                # Since this is a worker thread, messagebox might not be ideal here.
-                # Consider disabling button if Pillow not found at startup.
-                return
-            
-            # Find all PNG files
-            png_files = []
-            for root, _, files in os.walk(mods_path_str):
-                for file in files:
-                    if file.lower().endswith('.png'):
-                        png_files.append(os.path.join(root, file))
-            
-            total_files = len(png_files)
-            # Storing total_files in final_stats for summary
-            final_stats['total_files_discovered'] = total_files
-
-            if not png_files:
-                self.log_message("No PNG files found in the specified mods folder.", "info")
-                self.update_progress(100, "No PNG files found.", "") 
-                # No return here; let it fall through to the finally block to reset UI
-            else:
-                self.log_message(f"Found {total_files} PNG files to process.")
-                self.update_progress(0, f"Preparing to process {total_files} files...", "ETA: Calculating...")
-
-                loop_processed_count = 0
-                # loop_success_count, fail_count etc. are accumulated in final_stats
-                loop_start_time = time.time()
-
-                num_workers = min(8, os.cpu_count() + 4 if os.cpu_count() else 8) 
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-                    future_to_png = {executor.submit(self._process_single_file_gui_task, 
-                                                     png_file, 
-                                                     texconv_path_str, 
-                                                     compression_format_str, 
-                                                     enable_upscaling_bool, 
-                                                     generate_mipmaps_bool, 
-                                                     enable_gpu_preference_bool):
-                                     png_file for png_file in png_files}
-                    
-                    for future in concurrent.futures.as_completed(future_to_png):
-                        if self.cancel_requested:
-                            for f_pending in future_to_png:
-                                if not f_pending.done():
-                                    f_pending.cancel()
-                            self.log_message("Conversion cancellation initiated by user.", "warning")
-                            break 
-                        
-                        png_file_path = future_to_png[future]
-                        try:
-                            result_stats = future.result() 
-                            loop_processed_count += 1
-                            final_stats['total_processed_in_loop'] += 1
-                            
-                            if result_stats['status'] in ['gpu_converted', 'cpu_converted']:
-                                final_stats['success'] += 1
-                                if result_stats['upscaled']:
-                                    final_stats['upscaled'] += 1
-                            elif result_stats['status'] == 'skipped_newer':
-                                final_stats['skipped'] += 1
-                            elif result_stats['status'] == 'cancelled':
-                                final_stats['fail'] +=1 
-                            else: 
-                                final_stats['fail'] += 1
-
-                        except concurrent.futures.CancelledError:
-                            self.log_message(f"Task for {os.path.basename(png_file_path)} was cancelled during execution.", "info")
-                            final_stats['fail'] += 1 
-                        except Exception as exc:
-                            self.log_message(f"Error processing {os.path.basename(png_file_path)} in worker future: {exc}", "error")
-                            final_stats['fail'] += 1
-                        
-                        current_progress_percent = int((loop_processed_count / total_files) * 100) if total_files > 0 else 0
-                        self.last_progress_percent = current_progress_percent
-                        
-                        elapsed_time = time.time() - loop_start_time
-                        eta_str = ""
-                        if loop_processed_count > 0 and elapsed_time > 0:
-                            time_per_file = elapsed_time / loop_processed_count
-                            remaining_files = total_files - loop_processed_count
-                            eta_seconds = remaining_files * time_per_file
-                            eta_str = f"ETA: {int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
-                        
-                        status_msg = f"Processed: {loop_processed_count}/{total_files} (S: {final_stats['success']}, F: {final_stats['fail']}, Sk: {final_stats['skipped']}, Up: {final_stats['upscaled']})"
-                        self.update_progress(current_progress_percent, status_msg, eta_str)
-                # End of 'with executor' and 'for future' loop
+        self.restore_button.config(state=NORMAL) # Restore doesn't depend on texconv
+        self.plan_button.config(state=NORMAL)
+        self.scan_button.config(state=NORMAL)
+        selected = bool(self.mod_tree.selection())
+        self.convert_selected_button.config(state=NORMAL if texconv_ok and selected else DISABLED)
+        self.restore_selected_button.config(state=NORMAL if selected else DISABLED)
+        self.cancel_button.config(state=DISABLED)
+        self.root.title("RimConvert") # UPDATED reset window title
+        self.processing = False # Ensure processing flag is reset
 
-            # After processing all files or if no files were found (and not returned early)
-            if not self.cancel_requested and total_files > 0 : # Only log summary if files were processed
-                total_conversion_time = time.time() - worker_start_time
-                summary_msg = (f"✅ Conversion complete! "
-                               f"Files: {total_files}, Success: {final_stats['success']}, "
-                               f"Failed: {final_stats['fail']}, Skipped: {final_stats['skipped']}, "
-                               f"Upscaled: {final_stats['upscaled']}. "
-                               f"Time: {total_conversion_time:.2f}s.")
-                self.log_message(summary_msg, "info")
-                # Ensure progress bar is at 100% if all tasks completed without cancellation
-                if final_stats['total_processed_in_loop'] == total_files:
-                     self.update_progress(100, "Conversion finished.", summary_msg)
-                else: # Should not happen if not cancelled, but as a fallback
-                     self.update_progress(self.last_progress_percent, "Conversion ended (some files may not have processed).", summary_msg)
+    def load_config(self):
+        """Load configuration from JSON file."""
+        if os.path.exists(CONFIG_FILE):
+            try:
+                with open(CONFIG_FILE, 'r') as f:
+                    return json.load(f)
+            except Exception:
+                # If loading fails, return an empty dict
+                self.log_message(f"Error loading config file {CONFIG_FILE}. Using defaults.", "warning")
+                return {}
+        return {} # If file doesn't exist, return an empty dict
 
-            elif self.cancel_requested:
-                processed_before_stop = final_stats['total_processed_in_loop']
-                self.log_message(f"🛑 Conversion process stopped by user. Processed {processed_before_stop}/{total_files if total_files else 'N/A'} before stopping.", "warning")
-                self.update_progress(self.last_progress_percent, f"Cancelled. Processed {processed_before_stop}/{total_files if total_files else 'N/A'}.", "Stopped.")
-            # If total_files was 0, the "No PNG files found" message is already on progress.
+    def save_config(self):
+        """Save configuration to JSON file."""
+        config = {
+            'mods_path': self.mods_path_var.get(),
+            'enable_upscaling': self.enable_upscaling_var.get(),
+            'enable_gpu': self.enable_gpu_var.get(),
+            'loaded_textures_only': self.loaded_only_var.get(),
+            'game_version': self.game_version_var.get(),
+            'encoder_preset': self.encoder_preset_var.get(),
+            'background_mode': self.background_var.get(),
+            # 'generate_mipmaps': self.generate_mipmaps_var.get(), # Option removed from UI and config
+            # 'compression_format': self.compression_var.get(),   # Option removed from UI and config
+            'window_geometry': self.root.geometry() if hasattr(self.root, 'geometry') else None
+        }
+        # Settings without a widget (edited by hand in the config file) are kept as they are
+        for key in HIDDEN_CONFIG_KEYS:
+            if key in self.config:
+                config[key] = self.config[key]
+        try:
+            with open(CONFIG_FILE, 'w') as f:
+                json.dump(config, f, indent=2)
+        except Exception as e:
+            self.log_message(f"Could not save config: {e}", "warning")
 
-        except Exception as e_worker:
-            self.log_message(f"💥 Critical error in conversion worker: {e_worker}", "error")
-            import traceback
-            self.log_message(traceback.format_exc(), "debug")
-            self.update_progress(self.last_progress_percent, "Error during conversion.", "Check logs.")
-        finally:
-            self.convert_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
-            self.log_message("ℹ️ Conversion worker finished and UI reset.", "info")
+    def load_settings(self):
+        """Load settings from config."""
+        self.mods_path_var.set(self.config.get('mods_path', r"C:\\Steam\\steamapps\\common\\RimWorld\\Mods"))
+        
+        detected_texconv_path = get_texconv_path()
+        self.texconv_path_var.set(detected_texconv_path)
+        if not detected_texconv_path:
+            self.log_message("texconv.exe not found in the 'compressors' subdirectory next to the application. Conversion features will be disabled.", "error")
+        else:
+            self.log_message(f"Found texconv.exe at: {detected_texconv_path}", "info")
+            
+        self.enable_upscaling_var.set(self.config.get('enable_upscaling', True))
+        self.enable_gpu_var.set(self.config.get('enable_gpu', True))
+        self.loaded_only_var.set(self.config.get('loaded_textures_only', True))
+        self.game_version_var.set(self.config.get('game_version', optimizer.GAME_VERSION))
+        self.encoder_preset_var.set(self.config.get('encoder_preset', optimizer.ENCODER_PRESET))
+        self.background_var.set(self.config.get('background_mode', False))
+        
+        # Force mipmaps and compression format, ignore any saved config values for these
+        self.generate_mipmaps_var.set(True)     # Forced True
+        self.compression_var.set("BC7_UNORM")   # Forced BC7_UNORM
+    
+    def browse_mods_folder(self):
+        """Browse for RimWorld mods folder."""
+        folder = filedialog.askdirectory(title="Select RimWorld Mods Folder",
+                                        initialdir=self.mods_path_var.get())
+        if folder:
+            self.mods_path_var.set(folder)
+            self._clear_mod_list()
+            if not self.processing:
+                self.start_scan()
+    
+    def log_message(self, message, level="info"):
+        """Add message to log with timestamp and coloring."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        formatted_message = f"[{timestamp}] {message}\n"
+        
+        # Thread-safe GUI update
+        self.root.after(0, self._update_log, formatted_message, level)
+    
+    def _update_log(self, message, level):
+        """Update log text widget (must be called from main thread)."""
+        self.log_text.insert(END, message, level)
+        self.log_text.see(END)
+        self.root.update_idletasks()
+    
+    def _trim_log(self):
+        """Drop the oldest log lines beyond LOG_MAX_LINES (a huge Text widget slows Tk down)."""
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete('1.0', f"{line_count - LOG_MAX_LINES + 1}.0")
+    
+    def _worker_settings(self):
+        """Snapshot of the settings for a worker job (read on the main thread)."""
+        settings = {
+            'mods_path': self.mods_path_var.get(),
+            'texconv_path': self.texconv_path_var.get(),
+            'enable_upscaling': self.enable_upscaling_var.get(),
+            'enable_gpu': self.enable_gpu_var.get(),
+            'loaded_textures_only': self.loaded_only_var.get(),
+            'game_version': self.game_version_var.get(),
+            'encoder_preset': self.encoder_preset_var.get(),
+            'background_mode': self.background_var.get(),
+        }
+        for key in HIDDEN_CONFIG_KEYS:
+            if key in self.config:
+                settings[key] = self.config[key]
+        return settings
+    
+    def _start_worker(self, job, **kwargs):
+        """Run a ConversionWorker job on the conversion daemon when one is in use, else in a child process,
+        and start polling its events."""
+        if self._start_daemon_job(job, kwargs):
+            self.root.after(WORKER_POLL_MS, self._poll_worker)
+            return
+        import multiprocessing
+        context = multiprocessing.get_context('spawn') # Same behaviour on Windows and Linux; no Tk state is forked
+        self.event_queue = context.Queue()
+        self.cancel_event = context.Event()
+        self.worker_process = context.Process(target=run_worker_process,
+                                              args=(job, self._worker_settings(), self.event_queue,
+                                                    self.cancel_event, kwargs),
+                                              daemon=True)
+        self.worker_process.start()
+        self.root.after(WORKER_POLL_MS, self._poll_worker)
+    
+    def _start_daemon_job(self, job, kwargs):
+        """Hand the job to a running daemon ("use_daemon" in the config); False when none takes it."""
+        if not self.config.get('use_daemon'):
+            return False
+        client = optimizer.DaemonClient(self.config.get('daemon_port'))
+        if client.status() is None:
+            self.log_message("No conversion daemon is running; converting in this window.", "info")
+            return False
+        settings = self._worker_settings()
+        for key in optimizer.DAEMON_OWN_SETTINGS: # The daemon only runs the encoders of its own config
+            settings.pop(key, None)
+        if settings['mods_path']:
+            settings['mods_path'] = os.path.abspath(settings['mods_path']) # The daemon has its own working folder
+        try:
+            job_id = client.submit(job, settings, kwargs)
+        except (OSError, ValueError) as e:
+            self.log_message(f"The conversion daemon did not accept the job ({e}); converting in this window.", "warning")
+            return False
+        self.log_message(f"Running on the conversion daemon as job {job_id}.", "info")
+        self.worker_process = self.cancel_event = self.event_queue = DaemonWorker(client, job_id)
+        self.worker_process.start()
+        return True
+    
+    def _poll_worker(self):
+        """Apply the batched events of the worker process (main thread)."""
+        import queue
+        done = False
+        progress = None
+        try:
+            for _ in range(50): # Bounded so a flood of events cannot block the UI
+                for event in self.event_queue.get_nowait():
+                    if event[0] == 'log':
+                        self.log_text.insert(END, event[1], event[2])
+                    elif event[0] == 'progress':
+                        progress = event[1:]
+                    elif event[0] == 'mod':
+                        self._apply_mod_row(*event[1:])
+                    elif event[0] == 'done':
+                        done = True
+        except queue.Empty:
+            pass
+        self._trim_log()
+        self.log_text.see(END)
+        if progress:
+            self._update_progress_gui(*progress)
+        
+        if not done and self.worker_process.is_alive():
+            self.root.after(WORKER_POLL_MS, self._poll_worker)
+            return
+        if not done and not self.event_queue.empty():
+            self.root.after(WORKER_POLL_MS, self._poll_worker) # Exited; drain what is left first
+            return
+        self.worker_process.join(timeout=5)
+        exit_code = self.worker_process.exitcode
+        if not done and not self.cancel_requested:
+            self.log_message(f"Worker process ended unexpectedly (exit code {exit_code}).", "error")
+        self.worker_process = None
+        self._reset_ui_state()
+        if self.pending_scan is not None:
+            mods, self.pending_scan = self.pending_scan, None
+            self.start_scan(mods or None)
+    
+    def _terminate_worker(self, process):
+        """Stop a worker process that did not finish within the cancel grace period."""
+        if process is self.worker_process and process.is_alive():
+            process.terminate()
+            self.log_message("Worker did not stop in time and was terminated. Use 'Resume' to continue.", "warning")
+    
+    def update_progress(self, value, status="", eta=""):
+        """Update progress bar and status (thread-safe)."""
+        self.root.after(0, self._update_progress_gui, value, status, eta)
+    
+    def _update_progress_gui(self, value, status, eta):
+        """Update progress GUI elements (must be called from main thread)."""
+        self.progress_var.set(value)
+        if status:
+            self.status_var.set(status)
+        if eta:
+            self.eta_var.set(eta)
+        
+        # Update window title with progress
+        if self.processing and value > 0:
+            self.root.title(f"RimConvert - {value}% Complete") # UPDATED Title during processing
+        elif not self.processing:
+            self.root.title("RimConvert") # UPDATED default/idle window title
+        
+        self.root.update_idletasks()
+          
+    def validate_settings(self):
+        """Validate current settings."""
+        if not os.path.exists(self.mods_path_var.get()):
+            messagebox.showerror("Error", "RimWorld mods folder does not exist!")
+            return False
+        
+        # Validate auto-detected texconv.exe path
+        current_texconv_path = self.texconv_path_var.get()
+        if not current_texconv_path or not os.path.exists(current_texconv_path):
+            # Attempt to re-detect, in case it was placed there after app start (unlikely for exe)
+            # but more for robustness during script development.
+            # For a running .exe, this re-check might not be as useful if it failed initially.
+            refreshed_texconv_path = get_texconv_path()
+            if refreshed_texconv_path and os.path.exists(refreshed_texconv_path):
+                self.texconv_path_var.set(refreshed_texconv_path)
+                self.log_message(f"Re-detected texconv.exe at: {refreshed_texconv_path}", "info")
+                # Update UI state if it was previously disabled
+                self._reset_ui_state() # This will re-evaluate button states
+            else:
+                messagebox.showerror("Error", "texconv.exe was not found in the 'compressors' subdirectory next to the application. Please ensure it is correctly placed and restart the application if necessary.")
+                return False
+        
+        return True
+    
+    def resume_conversion(self):
+        """Resume the interrupted conversion run recorded in the run journal."""
+        self.start_conversion(resume=True)
 
-    def start_conversion(self):
-        """Start texture conversion in background thread."""
+    def start_conversion(self, resume=False, mods=None):
+        """Start texture conversion in a worker process (only the mod folders in mods when given)."""
         if not self.validate_settings():
             return
         
@@ -939,6 +1646,9 @@ class RimWorldOptimizerGUI:
         # Confirm operation
         result = messagebox.askyesno(
             "Confirm Conversion",
+            ("This will continue the interrupted conversion run, skipping files that are already done.\n\n"
+             if resume else "") +
+            (f"Only the {len(mods)} selected mods will be converted.\n\n" if mods else "") +
             "This will create DDS files alongside your PNG files in the original mod folders.\n\n"
             "Original PNG files will NOT be modified or renamed.\n"
             "This allows the game to fall back to PNGs if needed.\n\n"
@@ -956,24 +1666,73 @@ class RimWorldOptimizerGUI:
         self.processing = True
         self.cancel_requested = False
         self.convert_button.config(state=DISABLED)
+        self.resume_button.config(state=DISABLED)
+        self.watch_button.config(state=DISABLED)
+        self.plan_button.config(state=DISABLED)
         self.restore_button.config(state=DISABLED)
+        self._disable_mod_buttons()
         self.cancel_button.config(state=NORMAL)
         
         # Clear log
         self.log_text.delete(1.0, END)
         
-        # Start conversion thread
-        # Pass necessary parameters to the worker method if it's not a class method or if it needs them directly
-        # In this case, conversion_worker is a method and can access self
-        threading.Thread(target=self.conversion_worker, daemon=True).start()
+        # Start the conversion in a child process (keeps the window responsive)
+        self.pending_scan = mods or [] # Refresh the mod list afterwards
+        if mods:
+            self._start_worker('conversion_worker', resume=resume, mods=mods)
+        else:
+            self._start_worker('conversion_worker', resume=resume)
+    
+    def start_plan(self):
+        """Start the dry-run planner in a worker process."""
+        if not self.validate_settings():
+            return
+        
+        self.save_config()
+        
+        self.processing = True
+        self.cancel_requested = False
+        self.convert_button.config(state=DISABLED)
+        self.resume_button.config(state=DISABLED)
+        self.watch_button.config(state=DISABLED)
+        self.plan_button.config(state=DISABLED)
+        self.restore_button.config(state=DISABLED)
+        self._disable_mod_buttons()
+        
+        self.log_text.delete(1.0, END)
+        
+        self._start_worker('plan_worker')
+
+    def start_watch(self):
+        """Start watch mode: keep converting new or changed textures until cancelled."""
+        if not self.validate_settings():
+            return
+        
+        self.save_config()
+        
+        self.processing = True
+        self.cancel_requested = False
+        self.convert_button.config(state=DISABLED)
+        self.resume_button.config(state=DISABLED)
+        self.watch_button.config(state=DISABLED)
+        self.plan_button.config(state=DISABLED)
+        self.restore_button.config(state=DISABLED)
+        self._disable_mod_buttons()
+        self.cancel_button.config(state=NORMAL)
+        
+        self.log_text.delete(1.0, END)
+        
+        self.root.title("RimConvert - Watching")
+        self._start_worker('watch_worker')
     
-    def restore_pngs(self):
-        """Start PNG restoration (DDS deletion) in background thread."""
+    def restore_pngs(self, mods=None):
+        """Start PNG restoration (DDS deletion) in a worker process (only the mod folders in mods when given)."""
         if not self.validate_settings(): # Basic validation for paths
             return
 
         result = messagebox.askyesno(
             "Confirm PNG Restoration",
+            (f"Only the {len(mods)} selected mods will be restored.\n\n" if mods else "") +
             "This will scan your RimWorld mods folder and DELETE .dds files "
             "IF a corresponding .png file exists in the same directory.\\n\\n"
             "This effectively reverts textures to their original PNG versions.\\n\\n"
@@ -988,117 +1747,122 @@ class RimWorldOptimizerGUI:
         self.processing = True
         self.cancel_requested = False
         self.convert_button.config(state=DISABLED)
+        self.resume_button.config(state=DISABLED)
+        self.watch_button.config(state=DISABLED)
+        self.plan_button.config(state=DISABLED)
         self.restore_button.config(state=DISABLED)
+        self._disable_mod_buttons()
         self.cancel_button.config(state=NORMAL)
         
         self.log_text.delete(1.0, END)
         
-        threading.Thread(target=self.restore_worker, daemon=True).start()
-
-    def restore_worker(self):
-        """Background worker for PNG restoration (DDS deletion)."""
-        try:
-            self.log_message("🔙 Starting PNG restoration (deleting DDS files)...", "info")
-            mods_path = self.mods_path_var.get()
-            
-            # Define skip_folders, similar to conversion_worker
-            # Ideally, this should be a class or module-level constant
-            skip_folders_config = { 
-                'About', 'Assemblies', 'Defs', 'Languages', 'Patches', 
-                'Sounds', 'Source', '.git', '.svn', '__pycache__',
-                'Common', 'v1.0', 'v1.1', 'v1.2', 'v1.3', 'v1.4', 'v1.5' # Common game version folders
-            }
-
-            self.log_message(f"Scanning for DDS files in: {mods_path}", "info")
-
-            dds_files_to_check = []
-            self.log_message("Phase 1: Scanning all directories for DDS files...", "info")
-            # Scan for DDS files
-            for mod_folder_name in os.listdir(mods_path):
-                if self.cancel_requested: break
-                current_mod_path = os.path.join(mods_path, mod_folder_name)
-                if not os.path.isdir(current_mod_path) or mod_folder_name in skip_folders_config:
-                    continue
-                
-                for root, dirs, files in os.walk(current_mod_path):
-                    if self.cancel_requested: break
-                    dirs[:] = [d for d in dirs if d not in skip_folders_config] # Prune recursion
-                    for file_name in files:
-                        if file_name.lower().endswith('.dds'):
-                            dds_files_to_check.append(os.path.join(root, file_name))
-                if self.cancel_requested: break
-            
-            total_files = len(dds_files_to_check)
-            if self.cancel_requested:
-                 self.log_message("Scan cancelled by user during file collection.", "warning")
-                 self.update_progress(0, "Scan Cancelled", "")
-                 return
-
-
-            if total_files == 0:
-                self.log_message("No DDS files found to process for restoration.", "info")
-                self.update_progress(100, "No DDS files found.", "Done")
-                return
-
-            self.log_message(f"Found {total_files} DDS files. Phase 2: Processing files...", "info")
-
-            deleted_count = 0
-            skipped_count = 0
-            errors = 0
-            start_time = time.time()
-
-            for i, dds_path in enumerate(dds_files_to_check):
-                if self.cancel_requested:
-                    self.log_message("Restoration cancelled by user during processing.", "warning")
-                    break
-
-                progress = int(((i + 1) / total_files) * 100) # i+1 for current item
-                elapsed_time = time.time() - start_time
-                eta_str = "Calculating..."
-                if i > 0: # Avoid division by zero for the first item
-                    time_per_file = elapsed_time / (i + 1)
-                    eta_seconds = time_per_file * (total_files - (i + 1))
-                    eta_str = f"ETA: {int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
-                
-                self.update_progress(progress, f"Processing {i+1}/{total_files}: {os.path.basename(dds_path)}", eta_str)
-
-                png_path = os.path.splitext(dds_path)[0] + '.png'
+        self.pending_scan = mods or []
+        if mods:
+            self._start_worker('restore_worker', mods=mods)
+        else:
+            self._start_worker('restore_worker')
 
-                try:
-                    if os.path.exists(png_path):
-                        os.remove(dds_path)
-                        deleted_count += 1
-                        self.log_message(f"Deleted: {os.path.relpath(dds_path, mods_path)} (PNG companion exists)", "success")
-                    else:
-                        skipped_count += 1
-                        # self.log_message(f"Skipped: {os.path.relpath(dds_path, mods_path)} (No PNG companion found)", "info") # reduce log spam
-                except Exception as e:
-                    errors += 1
-                    self.log_message(f"Error deleting {os.path.relpath(dds_path, mods_path)}: {e}", "error")
-            
-            final_elapsed_time = time.time() - start_time
-            if self.cancel_requested:
-                self.log_message("Restoration process was cancelled.", "warning")
+    def start_scan(self, mods=None):
+        """Fill the mod list (or refresh the rows of mods) from a quick scan in a worker process."""
+        if self.processing:
+            return
+        if not os.path.isdir(self.mods_path_var.get()):
+            messagebox.showerror("Error", "RimWorld mods folder does not exist!")
+            return
+        if mods is None:
+            self._clear_mod_list()
+        
+        self.processing = True
+        self.cancel_requested = False
+        self.convert_button.config(state=DISABLED)
+        self.resume_button.config(state=DISABLED)
+        self.watch_button.config(state=DISABLED)
+        self.plan_button.config(state=DISABLED)
+        self.restore_button.config(state=DISABLED)
+        self._disable_mod_buttons()
+        self.cancel_button.config(state=NORMAL)
+        
+        if mods:
+            self._start_worker('scan_worker', mods=mods)
+        else:
+            self._start_worker('scan_worker')
+    
+    def convert_selected(self):
+        """Convert only the mods selected in the mod list."""
+        mods = self._selected_mods()
+        if mods:
+            self.start_conversion(mods=mods)
+    
+    def restore_selected(self):
+        """Restore PNGs (delete DDS files) only in the mods selected in the mod list."""
+        mods = self._selected_mods()
+        if mods:
+            self.restore_pngs(mods=mods)
+    
+    def _selected_mods(self):
+        """Folder names of the mods selected in the mod list."""
+        return list(self.mod_tree.selection())
+    
+    def _disable_mod_buttons(self):
+        """Disable the mod list buttons while a job runs."""
+        self.scan_button.config(state=DISABLED)
+        self.convert_selected_button.config(state=DISABLED)
+        self.restore_selected_button.config(state=DISABLED)
+    
+    def _clear_mod_list(self):
+        """Remove all rows of the mod list."""
+        self.mod_tree.delete(*self.mod_tree.get_children())
+        self.mod_rows = {}
+        self.selection_var.set("")
+    
+    def _apply_mod_row(self, folder, name, row):
+        """Insert or update the mod list row of one scanned mod (main thread)."""
+        converted = f"{row['skip'] / row['files']:.0%}" if row['files'] else "-"
+        seconds = optimizer.format_duration(row['seconds']) if row['seconds'] is not None else "?"
+        values = (row['files'], f"{row['source_mpx']:.1f}", converted, seconds if row['convert'] else "-")
+        if self.mod_tree.exists(folder):
+            self.mod_tree.item(folder, text=name, values=values)
+        else:
+            self.mod_tree.insert("", END, iid=folder, text=name, values=values)
+        self.mod_rows[folder] = row
+        self._show_selection_total()
+    
+    def _sort_mod_list(self, column):
+        """Sort the mod list by a column (name ascending, the numbers largest first)."""
+        if column == "#0":
+            key, reverse = (lambda folder: self.mod_tree.item(folder, 'text').lower()), False
+        else:
+            field = {"textures": 'files', "mpx": 'source_mpx', "time": 'seconds'}.get(column)
+            if field:
+                key = lambda folder: self.mod_rows[folder][field] or 0
             else:
-                self.log_message("🎉 PNG Restoration Complete!", "success")
-            
-            self.log_message(f"DDS files deleted: {deleted_count}", "info")
-            self.log_message(f"DDS files skipped (no PNG companion): {skipped_count}", "info")
-            self.log_message(f"Errors during deletion: {errors}", "error" if errors > 0 else "info")
-            self.log_message(f"Total time: {final_elapsed_time:.1f} seconds", "info")
-            self.update_progress(100, "Restoration Finished" if not self.cancel_requested else "Restoration Cancelled", f"{final_elapsed_time:.1f}s")
-
-        except Exception as e:
-            self.log_message(f"An unexpected error occurred during restoration: {e}", "error")
-            self.update_progress(100, "Error during restoration", "")
-        finally:
-            self.processing = False # Ensure processing flag is reset
-            self.root.after(0, self._reset_ui_state) # UI updates on main thread
+                key = lambda folder: self.mod_rows[folder]['skip'] / max(1, self.mod_rows[folder]['files'])
+            reverse = True
+        for position, folder in enumerate(sorted(self.mod_rows, key=key, reverse=reverse)):
+            self.mod_tree.move(folder, "", position)
+    
+    def _show_selection_total(self, event=None):
+        """Show what the selected mods add up to and enable the selection buttons."""
+        mods = [folder for folder in self._selected_mods() if folder in self.mod_rows]
+        if not mods:
+            self.selection_var.set(f"{len(self.mod_rows)} mods" if self.mod_rows else "")
+        else:
+            convert = sum(self.mod_rows[folder]['convert'] for folder in mods)
+            seconds = [self.mod_rows[folder]['seconds'] for folder in mods]
+            eta = optimizer.format_duration(sum(seconds)) if None not in seconds else "?"
+            self.selection_var.set(f"{len(mods)} selected: {convert} to convert, ~{eta}")
+        if not self.processing:
+            texconv_ok = bool(self.texconv_path_var.get() and os.path.exists(self.texconv_path_var.get()))
+            self.convert_selected_button.config(state=NORMAL if mods and texconv_ok else DISABLED)
+            self.restore_selected_button.config(state=NORMAL if mods else DISABLED)
 
     def cancel_operation(self):
         """Request cancellation of the current operation."""
         if self.processing:
             self.cancel_requested = True
+            if self.cancel_event:
+                self.cancel_event.set()
+                self.root.after(WORKER_CANCEL_GRACE_MS, self._terminate_worker, self.worker_process)
             self.log_message("Cancel request received. Attempting to stop...", "warning")
             self.status_var.set("Cancelling...")
             # Disable cancel button to prevent multiple clicks, re-enabled when process fully stops
@@ -1129,4 +1893,6 @@ def main():
         pass
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support() # Worker child processes of the frozen executable
     main()
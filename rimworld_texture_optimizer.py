@@ -21,21 +21,23 @@ Date: June 7, 2025
 
 import os
 import sys
-import subprocess
-import shutil
 import argparse
 import json
+import math
+import re
 import time
-from pathlib import Path
+import struct
+import threading
+import importlib.util
+from array import array
 from datetime import datetime
-import concurrent.futures # Added for ThreadPoolExecutor
 
-try:
-    from PIL import Image as PILImage # Import PIL.Image as PILImage
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILImage = None # If import fails, PILImage is None
-    PILLOW_AVAILABLE = False
+# Heavy modules (Pillow, subprocess, shutil, concurrent.futures) are imported where
+# they are first used so that launching the tool stays fast.
+PILImage = None # Loaded on first use by _load_pillow()
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+np = None # NumPy is optional (DDS verification only), loaded by _load_numpy()
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
 
 # ============================================================================
 # CONFIGURATION VARIABLES
@@ -58,28 +60,166 @@ BC7ENC_PATH = defaults['bc7enc']
 
 # Conversion settings
 MIN_UPSCALING_DIM = 256  # Minimum dimension for upscaling (either width or height)
+MAX_UPSCALE_FACTOR = 2.0  # Never enlarge a texture more than this per axis
+MIN_UPSCALE_GAIN = 1.25  # Skip upscales smaller than this factor (not worth the encode time)
+MAX_UPSCALE_ASPECT = 4.0  # Thin strips (e.g. 1024x64) are left at native size
+UPSCALE_PIXEL_BUDGET = 512 * 512  # Upscaled textures never exceed this many pixels
 DEFAULT_COMPRESSION_FORMAT = "BC7_UNORM"  # BC7 for best quality with alpha support
 ALTERNATIVE_FORMAT = "BC3_UNORM"  # DXT5 fallback for compatibility
 GENERATE_MIPMAPS = True  # Generate mipmaps for better performance
 ENABLE_UPSCALING = True  # Enable AI upscaling for small textures
+
+# VRAM budget mode (--vram-budget, "vram_budget_mb" in the config): when the planned DDS files need
+# more GPU memory than this many MB, the biggest textures are written at a smaller size (see fit_vram_budget)
+VRAM_BUDGET_MB = None
+BUDGET_MIN_SIDE = 64  # Never reduce a texture's short side below this
+BUDGET_UI_WEIGHT = 0.25  # UI textures are drawn 1:1 on screen, so they are reduced last
+BUDGET_UPSCALE_WEIGHT = 4.0  # Dropping an upscale loses no source detail, so those go first
 ENABLE_GPU = True # Added for GPU acceleration
 
-# Skip these folders during processing
+# Encoder presets: extra texconv arguments trading BC7 encode speed for quality (texconv -bc flags)
+ENCODER_PRESETS = {
+    'fast': ['-bc', 'q'],  # Quick BC7 (mode 6 only)
+    'balanced': [],        # texconv default
+    'max': ['-bc', 'x'],   # Maximum BC7 (also tries modes 0 and 2)
+}
+PRESET_QUALITY_ORDER = ('fast', 'balanced', 'max')
+ENCODER_PRESET = "balanced"  # One of ENCODER_PRESETS, or 'auto' to pick from calibration
+CALIBRATION_SAMPLE_SIZE = 24  # Textures encoded per preset during calibration
+PRESET_MIN_PSNR = 40.0  # Quality floor (dB) for 'auto'
+PRESET_TARGET_MINUTES = None  # Run time target for 'auto' (None = fastest preset above the floor)
+
+# Encoder backends (see ENCODER BACKENDS): 'auto' benchmarks the available encoders once on this
+# machine and picks the fastest good one per texture size class, 'texconv' keeps texconv (GPU, then
+# CPU), any other value is a backend name tried first
+ENCODER_BACKEND = "auto"
+BACKEND_BENCHMARK_SAMPLE = 12  # Textures encoded per backend by the benchmark
+BACKEND_SIZE_CLASSES = ((128 * 128, 'small'), (512 * 512, 'medium'), (None, 'large'))  # (max pixels, name)
+BC7ENC_PRESETS = {  # bc7enc quality per encoder preset: (BC7 uber level -u, BC1/BC3 RGB level -L)
+    'fast': (2, 6),
+    'balanced': (4, 12),
+    'max': (6, 18),
+}
+ENCODER_TIMEOUT = 120  # Seconds before an encoder run on one texture is abandoned
+# Very large textures are split into bands of whole block rows that are encoded in parallel on the CPU
+BAND_MIN_PIXELS = 2048 * 2048  # Mip levels at least this large are banded
+BAND_MIN_ROWS = 64  # Smallest band height in pixels (a multiple of 4)
+BAND_WORKERS = None  # Bands encoded at once, None = one per CPU core
+
+# GPU adapters (see GPU ADAPTERS): GPU encodes are spread over every hardware adapter texconv lists
+GPU_ADAPTERS = None  # Adapter indices to use ("gpu_adapters" in the config), None = all of them
+ADAPTER_MAX_FAILURES = 3  # Consecutive failures before an adapter is dropped for the rest of the run
+ADAPTER_RATE_SMOOTHING = 0.2  # Weight of the newest job in an adapter's seconds-per-Mpx average
+
+# Cost/benefit filter (--min-benefit): textures whose estimated load time saved per game start,
+# minus the encode time spread over BENEFIT_LOADS starts, is below MIN_LOAD_BENEFIT_MS stay PNG
+MIN_LOAD_BENEFIT_MS = None  # None = convert everything
+BENEFIT_LOADS = 50  # Game starts the one-time encode cost is spread over
+LOAD_DISK_MB_PER_SEC = 200.0  # Read speed assumed when the game loads textures
+PNG_DECODE_NS_PER_PIXEL = 15.0  # Inflate, unfilter and RGBA conversion of a PNG on load
+PNG_MIPMAP_NS_PER_PIXEL = 4.0  # Mip chain the game builds on the CPU for a PNG
+UPLOAD_MB_PER_SEC = 3000.0  # Texture upload to the GPU
+
+# Load-time benchmark ('benchmark' command)
+BENCHMARK_SAMPLE_PER_MOD = 8  # Textures timed per mod
+BENCHMARK_REPEATS = 3  # Each load is timed this often; the fastest (warm cache) run counts
+
+# Output verification (convert --verify, 'verify' command): DDS structure is always checked, and with
+# NumPy the top mip and a few smaller ones are decoded and compared against the source texture
+VERIFY_OUTPUT = False
+VERIFY_MIN_PSNR = 30.0  # dB, top mip against the (flipped, resized, premultiplied) source
+VERIFY_MIN_MIP_PSNR = 20.0  # dB, smaller mips against a box-filtered source
+VERIFY_SAMPLED_MIPS = 2  # Mip levels decoded per texture (level 0, 2, 4, ...)
+VERIFY_CHUNK_BLOCKS = 65536  # Blocks decoded at once, bounds memory on 4k textures
+
+# Discovery: 'loadfolders' converts only the Textures folders RimWorld loads for GAME_VERSION
+# (per LoadFolders.xml or the default folder rules), 'all' walks every folder except SKIP_FOLDERS
+DISCOVERY_MODE = "loadfolders"
+GAME_VERSION = "1.6"
+GAME_VERSIONS = ("1.0", "1.1", "1.2", "1.3", "1.4", "1.5", "1.6")
+
+# Skip these folders during processing ('all' discovery mode)
 SKIP_FOLDERS = {
     'About', 'Assemblies', 'Defs', 'Languages', 'Patches', 
     'Sounds', 'Source', '.git', '.svn', '__pycache__',
     'Common', 'v1.4', 'v1.5'  # Version-specific folders
 }
 
+# Markers in the names of temporary files written next to the textures during conversion
+TEMP_FILE_MARKERS = ('temp_upscaled_', 'temp_gui_upscaled_', '_temp_flipped_', '_temp_premultiplied_')
+
 # Skip these file patterns
 SKIP_PATTERNS = {
     '_preview.png', '_thumb.png', 'preview.png', 'thumbnail.png',
-    'icon.png', 'logo.png'
+    'icon.png', 'logo.png',
+    *TEMP_FILE_MARKERS  # Leftovers of an interrupted run
 }
 
 # Configuration file for persistent settings
 CONFIG_FILE = "rimworld_optimizer_config.json"
 
+# Cache file for results that are expensive to recompute between runs (tool checks)
+CACHE_FILE = "rimworld_optimizer_cache.json"
+
+# Manifest of probed textures and precomputed upscaling decisions for the last scanned mods folder
+MANIFEST_FILE = "rimworld_optimizer_manifest.json"
+
+# DDS files this tool wrote (size and mtime), so watch mode only ever deletes its own output
+WRITTEN_DDS_FILE = "rimworld_optimizer_written_dds.json"
+
+# Journal of the current/last conversion run, used to resume after cancel or crash
+RUN_JOURNAL_FILE = "rimworld_optimizer_journal.jsonl"
+
+# Textures left as PNG by the cost/benefit filter in the last run (--min-benefit)
+BENEFIT_REPORT_FILE = "rimworld_optimizer_low_benefit.txt"
+
+# Profiling reports (--profile), one subfolder per run
+PROFILE_DIR = "rimworld_optimizer_profile"
+PROFILE_SNAPSHOT_EVERY = 1000  # Take a memory snapshot every this many files
+PROFILE_TOP_ENTRIES = 30  # Lines per section in the reports
+
+# Watch mode: wait this long after the last change before converting a batch (bursts during a
+# workshop sync are merged), but never longer than WATCH_MAX_BATCH_DELAY
+WATCH_DEBOUNCE_SECONDS = 3.0
+WATCH_MAX_BATCH_DELAY = 30.0
+WATCH_POLL_INTERVAL = 10.0  # Rescan interval of the polling fallback (no inotify)
+
+# Per-folder conversion settings: the "path_rules" list in the config file, compiled by main()
+# into a PathRules matcher (see PathRules for the rule format)
+PATH_RULES = None
+
+# Conversion runs keep at most this many tasks per worker submitted at once (see run_task_window)
+TASK_WINDOW_PER_WORKER = 4
+
+# Source reads (see READ-AHEAD): work is ordered by disk locality and the next PNGs are read into
+# memory while earlier ones are encoded, so hard-disk seeks overlap with encoding
+LOCALITY_ORDER = True  # Order the files folder by folder, by file number within a folder
+PREFETCH_MB = 256  # Memory for PNGs read ahead of the workers ("prefetch_mb" in the config), 0 = off
+
+# Conversion daemon (see DAEMON): a long-lived local process that runs the jobs of the CLI and GUI
+# with warm imports, encoder pools and caches
+DAEMON_HOST = "127.0.0.1"  # Local connections only
+DAEMON_PORT = 47474  # "daemon_port" in the config
+USE_DAEMON = False  # "use_daemon" in the config: hand conversions to a running daemon when one answers
+DAEMON_TOKEN_DIR = os.path.join(os.path.expanduser("~"), ".rimconvert")  # Per-user secret of each running daemon
+
+# Background mode (convert --background, "background_mode" in the config; see BACKGROUND MODE): the
+# conversion runs at low OS priority on part of the machine and slows down while the game is running
+BACKGROUND_MODE = False
+BACKGROUND_CPU_SHARE = 0.5  # Share of the CPU cores the file workers may use ("background_cpu_share")
+BACKGROUND_GPU_LANES = 1  # GPU encodes at once ("background_gpu_lanes")
+BACKGROUND_PROCESSES = ["RimWorldWin64.exe", "RimWorldWin.exe", "RimWorldLinux", "RimWorldMac"]  # ("background_processes")
+BACKGROUND_GAME_WORKERS = 1  # File workers while one of BACKGROUND_PROCESSES runs
+BACKGROUND_CHECK_SECONDS = 5.0  # How often the load and the processes are checked
+BACKGROUND_NICE = 10  # Niceness added on Linux and macOS
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000  # Windows process priority class
+
+# Startup budget for importing the entry-point modules (seconds), see check_startup_time()
+STARTUP_TIME_TARGET = 0.25
+
+# Modules that must not be loaded just by importing the entry points
+DEFERRED_MODULES = ('PIL', 'numpy', 'concurrent.futures', 'subprocess', 'shutil')
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
@@ -108,6 +248,11 @@ def print_info(message):
     """Print an info message."""
     print(f"ℹ️  {message}")
 
+def _cli_log(message, level="info"):
+    """Log callback for shared helpers; the GUI passes its own log_message instead."""
+    printers = {'warning': print_warning, 'error': print_error, 'success': print_success}
+    printers.get(level, print_info)(message)
+
 def load_config():
     """Load configuration from JSON file."""
     if os.path.exists(CONFIG_FILE):
@@ -126,6 +271,54 @@ def save_config(config):
     except Exception as e:
         print_warning(f"Could not save config file: {e}")
 
+def load_cache():
+    """Load the run-to-run cache from JSON file."""
+    if os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print_warning(f"Could not load cache file: {e}")
+    return {}
+
+def save_cache(cache):
+    """Save the run-to-run cache to JSON file."""
+    try:
+        with open(CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except Exception as e:
+        print_warning(f"Could not save cache file: {e}")
+
+def _load_pillow():
+    """Import Pillow on first use and return PIL.Image (None if unavailable)."""
+    global PILImage, PILLOW_AVAILABLE
+    if PILImage is None and PILLOW_AVAILABLE:
+        try:
+            from PIL import Image
+            PILImage = Image
+        except ImportError:
+            PILLOW_AVAILABLE = False
+    return PILImage
+
+def _load_numpy():
+    """Import NumPy on first use and return it (None if unavailable)."""
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            NUMPY_AVAILABLE = False
+    return np
+
+def tool_fingerprint(tool_path):
+    """Identify a tool binary by absolute path, size and mtime (None if missing)."""
+    try:
+        st = os.stat(tool_path)
+    except OSError:
+        return None
+    return {'path': os.path.abspath(tool_path), 'size': st.st_size, 'mtime': st.st_mtime}
+
 def check_virtual_environment():
     """Check if we're running in a virtual environment with required packages."""
     print_info("Checking virtual environment and dependencies...")
@@ -139,9 +332,7 @@ def check_virtual_environment():
     if not PILLOW_AVAILABLE:
         missing_packages.append("Pillow")
     
-    try:
-        import tkinter
-    except ImportError:
+    if importlib.util.find_spec("tkinter") is None:
         missing_packages.append("tkinter (usually comes with Python)")
     
     if not in_venv or missing_packages:
@@ -177,17 +368,26 @@ def check_tools():
         print("Please ensure RimPy's compressor tools are available.")
         return False
     
-    # Test texconv.exe
-    try:
-        result = subprocess.run([TEXCONV_PATH], capture_output=True, text=True, timeout=10)
-        print_success("texconv.exe is available and working")
-    except Exception as e:
-        print_error(f"texconv.exe test failed: {e}")
-        return False
+    # Test texconv.exe, unless this exact binary already passed on a previous run
+    cache = load_cache()
+    fingerprint = tool_fingerprint(TEXCONV_PATH)
+    cached = cache.get('tools', {}).get('texconv', {})
+    if cached.get('ok') and cached.get('fingerprint') == fingerprint:
+        print_success("texconv.exe is available and working (cached check)")
+    else:
+        import subprocess
+        try:
+            result = subprocess.run([TEXCONV_PATH], capture_output=True, text=True, timeout=10)
+            print_success("texconv.exe is available and working")
+        except Exception as e:
+            print_error(f"texconv.exe test failed: {e}")
+            return False
+        cache.setdefault('tools', {})['texconv'] = {'ok': True, 'fingerprint': fingerprint}
+        save_cache(cache)
     
     # Check bc7enc.exe (optional, for advanced compression)
     if os.path.exists(BC7ENC_PATH):
-        print_success("bc7enc.exe is available (optional tool)")
+        print_success("bc7enc.exe is available (used for the textures it encodes fastest)")
     else:
         print_warning("bc7enc.exe not found (optional tool)")
     
@@ -198,6 +398,11 @@ def should_skip_file(file_path):
     filename = os.path.basename(file_path).lower()
     return any(pattern in filename for pattern in SKIP_PATTERNS)
 
+def is_temp_file(file_path):
+    """Check if a file is a temporary file written during conversion."""
+    filename = os.path.basename(file_path).lower()
+    return any(marker in filename for marker in TEMP_FILE_MARKERS)
+
 def should_skip_folder(folder_path):
     """Check if a folder should be skipped."""
     folder_name = os.path.basename(folder_path)
@@ -205,7 +410,7 @@ def should_skip_folder(folder_path):
 
 def get_image_info(image_path):
     """Get image dimensions and format info."""
-    if not PILLOW_AVAILABLE or PILImage is None: # Check both
+    if _load_pillow() is None:
         print_warning(f"Pillow not available, cannot get image info for {image_path}")
         return None
     try:
@@ -220,28 +425,778 @@ def get_image_info(image_path):
         print_warning(f"Could not read image info for {image_path}: {e}")
         return None
 
+# ============================================================================
+# TEXTURE PROBING AND UPSCALING POLICY
+# ============================================================================
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def probe_png_header(png_path):
+    """Read width, height and alpha presence from the PNG header without decoding pixels."""
+    try:
+        with open(png_path, 'rb') as f:
+            header = f.read(33)
+            if len(header) < 33 or header[:8] != PNG_SIGNATURE or header[12:16] != b'IHDR':
+                return None
+            width, height = struct.unpack('>II', header[16:24])
+            color_type = header[25]
+            has_alpha = color_type in (4, 6)  # Grayscale+alpha, RGBA
+            
+            # A tRNS chunk before the image data also means transparency
+            while not has_alpha:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    break
+                length, chunk_type = struct.unpack('>I4s', chunk_header)
+                if chunk_type == b'tRNS':
+                    has_alpha = True
+                elif chunk_type in (b'IDAT', b'IEND'):
+                    break
+                else:
+                    f.seek(length + 4, os.SEEK_CUR)  # Skip chunk data and CRC
+            
+            return {'width': width, 'height': height, 'has_alpha': has_alpha}
+    except OSError:
+        return None
+
+def _next_power_of_two(value):
+    """Smallest power of two that is >= value."""
+    return 1 << max(0, math.ceil(value) - 1).bit_length()
+
+def choose_upscale_target(width, height):
+    """
+    Pick upscaled dimensions for a texture, or None to keep it at native size.
+    
+    Policy:
+    - Only textures whose short side is below MIN_UPSCALING_DIM are candidates
+    - Thin strips beyond MAX_UPSCALE_ASPECT are left alone
+    - The factor is just enough to reach MIN_UPSCALING_DIM, capped by MAX_UPSCALE_FACTOR
+      and by UPSCALE_PIXEL_BUDGET; gains below MIN_UPSCALE_GAIN are not worth encoding
+    - Power-of-two dimensions are preferred when reachable within those limits,
+      otherwise both sides are aligned to a multiple of 4 (the BC block size)
+    """
+    if width <= 0 or height <= 0:
+        return None
+    short_side, long_side = min(width, height), max(width, height)
+    if short_side >= MIN_UPSCALING_DIM or long_side / short_side > MAX_UPSCALE_ASPECT:
+        return None
+    
+    scale = min(MAX_UPSCALE_FACTOR, MIN_UPSCALING_DIM / short_side,
+                math.sqrt(UPSCALE_PIXEL_BUDGET / (width * height)))
+    if scale < MIN_UPSCALE_GAIN:
+        return None
+    
+    target_width, target_height = width * scale, height * scale
+    pow2_width, pow2_height = _next_power_of_two(target_width), _next_power_of_two(target_height)
+    fits_limits = (pow2_width <= width * MAX_UPSCALE_FACTOR and pow2_height <= height * MAX_UPSCALE_FACTOR
+                   and pow2_width * pow2_height <= UPSCALE_PIXEL_BUDGET)
+    keeps_aspect = abs(pow2_width / width - pow2_height / height) <= 0.1 * scale
+    if fits_limits and keeps_aspect:
+        return pow2_width, pow2_height
+    
+    return 4 * math.ceil(target_width / 4), 4 * math.ceil(target_height / 4)
+
 def needs_upscaling(width, height):
-    """Determine if image needs upscaling. Upscales if either dimension is less than MIN_UPSCALING_DIM."""
-    return ENABLE_UPSCALING and (width < MIN_UPSCALING_DIM or height < MIN_UPSCALING_DIM)
+    """Determine if image needs upscaling according to the upscaling policy (see choose_upscale_target)."""
+    return ENABLE_UPSCALING and choose_upscale_target(width, height) is not None
 
-def upscale_image(image_path, output_path, target_width, target_height):
-    """Upscale image using Pillow's high-quality resampling."""
-    if not PILLOW_AVAILABLE or PILImage is None: # Check both
-        print_error(f"Pillow not available, cannot upscale {image_path}")
-        return False
+def upscale_policy_key():
+    """Policy parameters a cached decision table depends on."""
+    return [MIN_UPSCALING_DIM, MAX_UPSCALE_FACTOR, MIN_UPSCALE_GAIN, MAX_UPSCALE_ASPECT, UPSCALE_PIXEL_BUDGET]
+
+def build_upscale_decision_table(dimensions):
+    """Precompute choose_upscale_target once for every distinct (width, height) in the corpus."""
+    return {f"{width}x{height}": choose_upscale_target(width, height) for width, height in set(dimensions)}
+
+# ============================================================================
+# TEXTURE MANIFEST
+# ============================================================================
+
+def load_manifest(mods_path):
+    """Load the manifest for mods_path (empty dict if missing or for another folder)."""
+    if os.path.exists(MANIFEST_FILE):
+        try:
+            with open(MANIFEST_FILE, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('mods_path') == os.path.abspath(mods_path):
+                return manifest
+        except Exception as e:
+            print_warning(f"Could not load manifest file: {e}")
+    return {}
+
+def save_manifest(manifest, log=_cli_log, keep_other_files=False):
+    """
+    Save the manifest to JSON file. With keep_other_files (runs over some of the mods),
+    saved entries of files outside this manifest are kept, so the next full scan can reuse them.
+    """
+    if keep_other_files:
+        files = {**load_manifest(manifest['mods_path']).get('files', {}), **manifest['files']}
+        dimensions = {(entry[2], entry[3]) for entry in files.values() if entry[2] and entry[3]}
+        manifest = {**manifest, 'files': files, 'upscale_decisions': build_upscale_decision_table(dimensions)}
     try:
-        with PILImage.open(image_path) as img: # Use PILImage directly
-            # Use LANCZOS for high-quality upscaling
-            upscaled = img.resize((target_width, target_height), PILImage.Resampling.LANCZOS) # Use PILImage directly
-            upscaled.save(output_path, 'PNG', optimize=True)
-            return True
+        with open(MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f)
     except Exception as e:
-        print_error(f"Failed to upscale image {image_path}: {e}")
-        return False
+        log(f"Could not save manifest file: {e}", "warning")
+
+def build_manifest(mods_path, png_files, log=_cli_log, previous_files=None):
+    """
+    Probe every PNG header and precompute upscaling decisions for the corpus.
+    
+    File entries are [size, mtime, width, height, has_alpha] keyed by path relative to
+    mods_path; entries from the previous manifest (or previous_files, when a caller builds
+    several manifests from one load) are reused when size and mtime match.
+    Width and height are 0 when the header could not be read.
+    """
+    mods_path = os.path.abspath(mods_path)
+    if previous_files is None:
+        previous_files = load_manifest(mods_path).get('files', {})
+    files = {}
+    reused = 0
+    
+    for png_path in png_files:
+        rel_path = os.path.relpath(png_path, mods_path)
+        try:
+            st = os.stat(png_path)
+        except OSError:
+            continue
+        entry = previous_files.get(rel_path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime:
+            reused += 1
+        else:
+            info = probe_png_header(png_path) or {'width': 0, 'height': 0, 'has_alpha': True}
+            entry = [st.st_size, st.st_mtime, info['width'], info['height'], info['has_alpha']]
+        files[rel_path] = entry
+    
+    dimensions = [(entry[2], entry[3]) for entry in files.values() if entry[2] and entry[3]]
+    manifest = {
+        'mods_path': mods_path,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'upscale_policy': upscale_policy_key(),
+        'files': files,
+        'upscale_decisions': build_upscale_decision_table(dimensions),
+    }
+    log(f"Probed {len(files)} texture headers ({reused} unchanged since last scan, "
+        f"{len(manifest['upscale_decisions'])} distinct sizes)", "info")
+    return manifest
+
+def manifest_texture_info(manifest, png_path):
+    """
+    Probed info for png_path including its precomputed 'upscale_to' and its 'budget_size'
+    from the VRAM budget (None if not in the manifest).
+    """
+    rel_path = os.path.relpath(png_path, manifest.get('mods_path', ''))
+    entry = manifest.get('files', {}).get(rel_path)
+    if not entry or not entry[2] or not entry[3]:
+        return None
+    width, height = entry[2], entry[3]
+    upscale_to = manifest['upscale_decisions'].get(f"{width}x{height}")
+    budget_size = manifest.get('budget_sizes', {}).get(rel_path)
+    return {
+        'width': width,
+        'height': height,
+        'has_alpha': entry[4],
+        'upscale_to': tuple(upscale_to) if upscale_to else None,
+        'budget_size': tuple(budget_size) if budget_size else None,
+    }
+
+class WrittenDds:
+    """
+    DDS files this tool wrote under one mods folder, with their size and mtime at the time.
+    
+    A mod update may delete a PNG and ship the author's own DDS in its place, so watch mode
+    only removes a DDS without PNG when it is listed here unchanged. save() merges the
+    entries into WRITTEN_DDS_FILE, keeping those other runs saved meanwhile.
+    """
+    
+    def __init__(self, mods_path, path=WRITTEN_DDS_FILE):
+        self.mods_path = os.path.abspath(mods_path)
+        self.path = path
+        self.files = self._load()  # Relative DDS path -> [size, mtime]
+        self.added = {}
+        self.removed = set()
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return saved.get('files', {}) if saved.get('mods_path') == self.mods_path else {}
+    
+    def add(self, png_path):
+        """Record the DDS just written for png_path."""
+        dds_path = os.path.splitext(png_path)[0] + '.dds'
+        try:
+            st = os.stat(dds_path)
+        except OSError:
+            return
+        rel_path = os.path.relpath(dds_path, self.mods_path)
+        with self._lock:
+            self.files[rel_path] = self.added[rel_path] = [st.st_size, st.st_mtime]
+            self.removed.discard(rel_path)
+    
+    def owns(self, dds_path):
+        """True if this tool wrote dds_path and nothing changed it since."""
+        entry = self.files.get(os.path.relpath(dds_path, self.mods_path))
+        try:
+            st = os.stat(dds_path)
+        except OSError:
+            return False
+        return entry is not None and entry == [st.st_size, st.st_mtime]
+    
+    def forget(self, dds_path):
+        rel_path = os.path.relpath(dds_path, self.mods_path)
+        with self._lock:
+            self.files.pop(rel_path, None)
+            self.added.pop(rel_path, None)
+            self.removed.add(rel_path)
+    
+    def save(self, log=_cli_log):
+        with self._lock:
+            if not self.added and not self.removed:
+                return
+            files = {**self._load(), **self.added}
+            for rel_path in self.removed:
+                files.pop(rel_path, None)
+            self.files, self.added, self.removed = files, {}, set()
+        try:
+            with open(self.path, 'w') as f:
+                json.dump({'mods_path': self.mods_path, 'files': files}, f)
+        except OSError as e:
+            log(f"Could not save the list of written DDS files: {e}", "warning")
+
+def summarize_manifest(manifest, enable_upscaling, rules=None):
+    """Total source and planned (post-upscale / VRAM budget) pixel work for the manifest."""
+    rules = PATH_RULES if rules is None else rules
+    decisions = manifest.get('upscale_decisions', {})
+    budget_sizes = manifest.get('budget_sizes', {})
+    source_pixels = planned_pixels = upscaled = 0
+    for rel_path, entry in manifest.get('files', {}).items():
+        pixels = entry[2] * entry[3]
+        source_pixels += pixels
+        if rel_path in budget_sizes:
+            planned_pixels += budget_sizes[rel_path][0] * budget_sizes[rel_path][1]
+            continue
+        target = decisions.get(f"{entry[2]}x{entry[3]}") if enable_upscaling else None
+        if target and rules and rules.settings_for(rel_path.replace(os.sep, '/').split('/', 1)[-1]).get('upscale') is False:
+            target = None
+        if target:
+            planned_pixels += target[0] * target[1]
+            upscaled += 1
+        else:
+            planned_pixels += pixels
+    return {'source_pixels': source_pixels, 'planned_pixels': planned_pixels, 'upscaled': upscaled}
+
+def output_size(texture_info, enable_upscaling, rule=None):
+    """
+    (width, height) of the DDS written for a texture: its VRAM budget size when it has one,
+    else its upscale target (if upscaling is on and no path rule turns it off), else its own size.
+    """
+    if texture_info.get('budget_size'):
+        return tuple(texture_info['budget_size'])
+    if enable_upscaling and texture_info.get('upscale_to') and (rule or {}).get('upscale') is not False:
+        return tuple(texture_info['upscale_to'])
+    return texture_info['width'], texture_info['height']
+
+def planned_pixels(texture_info, enable_upscaling):
+    """Pixels the encoder will process for a texture (after upscaling, if enabled, or the VRAM budget)."""
+    if not texture_info:
+        return 0
+    width, height = output_size(texture_info, enable_upscaling)
+    return width * height
+
+# ============================================================================
+# PATH RULES (PER-FOLDER CONVERSION SETTINGS)
+# ============================================================================
+
+PATH_RULE_KEYS = ('format', 'mipmaps', 'upscale', 'downscale', 'exclude')
+
+def _glob_to_regex(pattern):
+    """Regex for a path glob: '*' and '?' stay within one folder, '**' crosses folders."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+def compile_path_pattern(rule):
+    """
+    Compiled, case-insensitive pattern of a rule, matched against mod-relative paths with '/'.
+    
+    "match" is a glob: 'UI/' matches any folder named UI, a glob without '/' (such as
+    '*_m.png') matches the file name in any folder, anything else is anchored at the mod
+    folder ('Textures/Terrain/**'). "regex" is searched anywhere in the path.
+    """
+    if 'regex' in rule:
+        return re.compile(rule['regex'], re.IGNORECASE)
+    pattern = rule['match'].replace('\\', '/').lstrip('/')
+    if pattern.endswith('/'):
+        regex = '(?:.*/)?' + _glob_to_regex(pattern) + '.*'
+    elif '/' not in pattern:
+        regex = '(?:.*/)?' + _glob_to_regex(pattern)
+    else:
+        regex = _glob_to_regex(pattern)
+    return re.compile(r'\A' + regex + r'\Z', re.IGNORECASE)
+
+class PathRules:
+    """
+    Per-folder conversion settings from the "path_rules" config list.
+    
+    Each rule has a "match" glob or a "regex" (see compile_path_pattern) and any of
+    "format" (texconv format, e.g. "BC1_UNORM"), "mipmaps" (mip levels, 0 = full chain,
+    1 = none), "upscale" (false to never upscale), "downscale" (false to never reduce the
+    texture for the VRAM budget) and "exclude" (true to skip the file).
+    Every matching rule applies, later rules overriding earlier ones. Merged settings are
+    interned as profiles, so a file's settings can be stored as a small profile number;
+    profile 0 is the empty one (defaults). Lookups are safe from the worker threads.
+    """
+    
+    def __init__(self, rules=None, log=_cli_log):
+        self.rules = []  # (compiled pattern, settings)
+        for rule in rules or []:
+            try:
+                if not isinstance(rule, dict) or ('match' in rule) == ('regex' in rule):
+                    raise ValueError("needs exactly one of 'match' or 'regex'")
+                if 'mipmaps' in rule and (not isinstance(rule['mipmaps'], int) or rule['mipmaps'] < 0):
+                    raise ValueError("'mipmaps' must be a number of levels (0 = full chain)")
+                self.rules.append((compile_path_pattern(rule), {key: rule[key] for key in PATH_RULE_KEYS if key in rule}))
+            except (ValueError, TypeError, re.error) as e:
+                log(f"Ignoring path rule {rule!r}: {e}", "warning")
+        self.profiles = [{}]
+        self._profile_ids = {(): 0}
+        self._lock = threading.Lock()  # New profiles are made by the conversion workers too
+    
+    def __bool__(self):
+        return bool(self.rules)
+    
+    def profile_id(self, rel_path):
+        """Profile number of the merged settings for a mod-relative path."""
+        matched = tuple(i for i, (pattern, _) in enumerate(self.rules) if pattern.search(rel_path))
+        profile_id = self._profile_ids.get(matched)
+        if profile_id is None:
+            with self._lock:
+                profile_id = self._profile_ids.get(matched)  # Another worker may have made it meanwhile
+                if profile_id is None:
+                    settings = {}
+                    for i in matched:
+                        settings.update(self.rules[i][1])
+                    self.profiles.append(settings)
+                    profile_id = self._profile_ids[matched] = len(self.profiles) - 1
+        return profile_id
+    
+    def settings_for(self, rel_path):
+        return self.profiles[self.profile_id(rel_path)]
+    
+    def excluded(self, rel_path):
+        return bool(self.settings_for(rel_path).get('exclude'))
+
+def mod_relative_path(path, mods_path):
+    """Path of a file inside its mod folder, with '/' separators ('Textures/UI/icon.png')."""
+    parts = os.path.relpath(path, mods_path).split(os.sep)
+    return '/'.join(parts[1:])
+
+def rule_for_path(png_path, mods_path=None, rules=None):
+    """Merged path-rule settings for a texture ({} when no rule applies)."""
+    rules = PATH_RULES if rules is None else rules
+    if not rules:
+        return {}
+    return rules.settings_for(mod_relative_path(png_path, mods_path or RIMWORLD_MODS_PATH))
+
+# ============================================================================
+# THROUGHPUT MODEL AND ETA
+# ============================================================================
+
+def format_duration(seconds):
+    """Format a duration as '1h 02m', '5m 03s' or '42s'."""
+    seconds = max(0, int(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class ThroughputModel:
+    """
+    Online estimate of remaining run time, weighted by pixels instead of file count.
+    
+    For each encoder lane ('gpu', 'cpu') the cost of a file is modelled as
+    overhead + seconds_per_mpx * megapixels, fitted by an exponentially weighted
+    least-squares regression over completed files so that recent behaviour dominates
+    and the ETA stays steady. Remaining work is split across lanes by their recent
+    share of files and divided by the number of parallel workers.
+    """
+    
+    def __init__(self, total_files, total_pixels, total_bytes, workers, smoothing=0.05, saved=None):
+        self.total_files = total_files
+        self.total_mpx = total_pixels / 1e6
+        self.total_bytes = total_bytes
+        self.workers = max(1, workers)
+        self.decay = 1.0 - smoothing
+        self.saved = saved or {}  # lane -> [overhead, seconds_per_mpx] from a previous run
+        self.lanes = {}  # lane -> exponentially weighted sums [n, x, y, xx, xy]
+        self.stage_seconds = {}
+        self.done_files = 0
+        self.done_mpx = 0.0  # Progress: every finished file
+        self.done_bytes = 0
+        self.encoded_mpx = 0.0  # Rates: only the files that were encoded
+        self.encoded_bytes = 0
+        self.start_time = time.time()
+    
+    def record(self, lane, pixels, nbytes, seconds, stage_seconds=None):
+        """Account for a file encoded on lane, taking seconds in total."""
+        x = pixels / 1e6
+        sums = self.lanes.setdefault(lane, [0.0] * 5)
+        for i, value in enumerate((1.0, x, seconds, x * x, x * seconds)):
+            sums[i] = sums[i] * self.decay + value
+        for stage, stage_time in (stage_seconds or {}).items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + stage_time
+        self.encoded_mpx += x
+        self.encoded_bytes += nbytes
+        self._advance(pixels, nbytes)
+    
+    def skip(self, pixels, nbytes):
+        """Account for a file that finished without encoding work (skipped or failed)."""
+        self._advance(pixels, nbytes)
+    
+    def _advance(self, pixels, nbytes):
+        self.done_files += 1
+        self.done_mpx += pixels / 1e6
+        self.done_bytes += nbytes
+    
+    def lane_cost(self, lane):
+        """(overhead seconds per file, seconds per megapixel) for lane, or None if unknown."""
+        sums = self.lanes.get(lane)
+        if not sums or sums[0] < 1e-9:
+            saved = self.saved.get(lane)
+            return tuple(saved) if saved else None
+        n, sx, sy, sxx, sxy = sums
+        mean_x, mean_y = sx / n, sy / n
+        variance = sxx / n - mean_x * mean_x
+        if variance > 1e-12:
+            slope = (sxy / n - mean_x * mean_y) / variance
+            intercept = mean_y - slope * mean_x
+            if slope >= 0 and intercept >= 0:
+                return intercept, slope
+        # Sizes too uniform (or fit not physical): attribute all time to pixels
+        return (0.0, mean_y / mean_x) if mean_x > 0 else (mean_y, 0.0)
+    
+    def eta_seconds(self):
+        """Estimated seconds until all files are done, or None before any estimate exists."""
+        remaining_files = max(0, self.total_files - self.done_files)
+        remaining_mpx = max(0.0, self.total_mpx - self.done_mpx)
+        if remaining_files == 0:
+            return 0.0
+        
+        weights = {lane: sums[0] for lane, sums in self.lanes.items() if sums[0] > 1e-9}
+        if not weights:
+            weights = {lane: 1.0 for lane in self.saved}
+        total_weight = sum(weights.values())
+        
+        cost = 0.0
+        for lane, weight in weights.items():
+            lane_cost = self.lane_cost(lane)
+            if lane_cost is None:
+                return None
+            overhead, seconds_per_mpx = lane_cost
+            cost += (weight / total_weight) * (overhead * remaining_files + seconds_per_mpx * remaining_mpx)
+        return cost / self.workers if weights else None
+    
+    def rates(self):
+        """
+        Average (MB/s of source PNGs, Mpx/s of planned pixels) encoded since the run started.
+        Skipped and failed files are left out, so an incremental or resumed run is not overstated.
+        """
+        elapsed = max(1e-6, time.time() - self.start_time)
+        return self.encoded_bytes / 1e6 / elapsed, self.encoded_mpx / elapsed
+    
+    def status_line(self):
+        """One-line throughput and ETA summary for progress output."""
+        mb_per_sec, mpx_per_sec = self.rates()
+        eta = self.eta_seconds()
+        eta_str = f"ETA: {format_duration(eta)}" if eta is not None else "ETA: Calculating..."
+        return f"{mb_per_sec:.1f} MB/s, {mpx_per_sec:.1f} Mpx/s, {eta_str}"
+    
+    def to_dict(self):
+        """Fitted lane costs for the cache, used to seed the next run's ETA."""
+        fitted = dict(self.saved)
+        for lane in self.lanes:
+            lane_cost = self.lane_cost(lane)
+            if lane_cost is not None:
+                fitted[lane] = list(lane_cost)
+        return fitted
+
+def saved_throughput(preset):
+    """Lane costs of the last run with this encoder preset (of the last run at all if there is none)."""
+    cache = load_cache()
+    return (cache.get('throughput_presets') or {}).get(preset) or cache.get('throughput')
+
+def save_throughput(throughput, preset):
+    """Keep a run's fitted lane costs for the next run's ETA and for plan, per encoder preset."""
+    cache = load_cache()
+    cache['throughput'] = throughput.to_dict()
+    cache.setdefault('throughput_presets', {})[preset] = cache['throughput']
+    save_cache(cache)
+
+# ============================================================================
+# RUN JOURNAL (RESUME SUPPORT)
+# ============================================================================
+
+class RunJournal:
+    """
+    Append-only JSON-lines journal of a conversion run.
+    
+    Records the run settings, the discovered files, the upscaling decision table and
+    every completed file, so an interrupted run (cancel, Ctrl+C, crash) can pick up
+    where it stopped without repeating discovery and probing. A run that reaches the
+    end is marked finished and is no longer resumable.
+    """
+    
+    def __init__(self, path=RUN_JOURNAL_FILE, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.mods_path = None
+        self._file = None
+        self._last_flush = 0.0
+    
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+    
+    def start(self, mods_path, settings, png_files, decisions):
+        """Begin a new journal, replacing any previous one."""
+        self.mods_path = os.path.abspath(mods_path)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({'type': 'start', 'mods_path': self.mods_path, 'settings': settings,
+                     'time': datetime.now().isoformat(timespec='seconds')})
+        self._write({'type': 'discovered', 'files': [os.path.relpath(p, self.mods_path) for p in png_files]})
+        self._write({'type': 'decisions', 'table': decisions})
+        self.checkpoint()
+    
+    def reopen(self, mods_path):
+        """Continue appending to the journal of an interrupted run."""
+        self.mods_path = os.path.abspath(mods_path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._write({'type': 'resumed', 'time': datetime.now().isoformat(timespec='seconds')})
+    
+    def record_done(self, png_path, status):
+        """Record a finished file; status is 'converted', 'skipped' or 'error'."""
+        self._write({'type': 'done', 'file': os.path.relpath(png_path, self.mods_path), 'status': status})
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.checkpoint()
+    
+    def checkpoint(self):
+        """Make everything recorded so far durable."""
+        if self._file:
+            self._file.flush()
+            try:
+                os.fsync(self._file.fileno())
+            except OSError:
+                pass
+            self._last_flush = time.time()
+    
+    def finish(self):
+        """Mark the run complete (nothing left to resume) and close the journal."""
+        if self._file:
+            self._write({'type': 'finished', 'time': datetime.now().isoformat(timespec='seconds')})
+        self.close()
+    
+    def close(self):
+        if self._file:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
+    
+    @staticmethod
+    def load_state(mods_path, path=RUN_JOURNAL_FILE):
+        """State of an interrupted run for mods_path, or None if there is nothing to resume."""
+        if not os.path.exists(path):
+            return None
+        state = {'settings': {}, 'files': [], 'decisions': {}, 'done': set(), 'finished': False}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line after a crash
+                    kind = record.get('type')
+                    if kind == 'start':
+                        if record.get('mods_path') != os.path.abspath(mods_path):
+                            return None
+                        state['settings'] = record.get('settings', {})
+                    elif kind == 'discovered':
+                        state['files'] = record['files']
+                    elif kind == 'decisions':
+                        state['decisions'] = record['table']
+                    elif kind == 'done':
+                        if record['status'] in ('converted', 'skipped'):
+                            state['done'].add(record['file'])
+                    elif kind == 'finished':
+                        state['finished'] = True
+        except OSError:
+            return None
+        if state['finished'] or not state['files']:
+            return None
+        return state
+    
+    @staticmethod
+    def is_resumable(mods_path, path=RUN_JOURNAL_FILE):
+        """Cheap check (first line and tail only) whether an unfinished run exists for mods_path."""
+        try:
+            with open(path, 'rb') as f:
+                first = json.loads(f.readline() or b'{}')
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 512))
+                tail = f.read().decode('utf-8', 'replace')
+        except (OSError, ValueError):
+            return False
+        return first.get('mods_path') == os.path.abspath(mods_path) and '"type": "finished"' not in tail
+
+def cleanup_stray_temp_files(directories, log=_cli_log):
+    """Remove temporary upscaled/flipped files left behind by an interrupted run."""
+    removed = 0
+    for directory in directories:
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            if is_temp_file(name):
+                try:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+    if removed:
+        log(f"Removed {removed} temporary files left by the interrupted run", "info")
+
+def prepare_resume(mods_path, log=_cli_log):
+    """
+    Load an interrupted run for mods_path.
+    
+    Returns (remaining_png_files, manifest, settings), or None if there is nothing to resume.
+    The manifest reuses the saved probe results and the run's original decision table.
+    """
+    state = RunJournal.load_state(mods_path)
+    if state is None:
+        log("No interrupted run to resume for this mods folder; starting a new run.", "warning")
+        return None
+    
+    mods_path = os.path.abspath(mods_path)
+    remaining = [os.path.join(mods_path, rel) for rel in state['files'] if rel not in state['done']]
+    remaining = [png_path for png_path in remaining if os.path.exists(png_path)]
+    log(f"Resuming interrupted run: {len(state['done'])} of {len(state['files'])} files already done, "
+        f"{len(remaining)} remaining", "info")
+    
+    cleanup_stray_temp_files({os.path.dirname(png_path) for png_path in remaining}, log)
+    manifest = build_manifest(mods_path, remaining, log)
+    manifest['upscale_decisions'] = state['decisions'] or manifest['upscale_decisions']
+    if state['settings'].get('budget_sizes') is not None:
+        manifest['budget_sizes'] = state['settings']['budget_sizes']  # The run's VRAM budget sizes
+    return remaining, manifest, state['settings']
+
+def journal_status(result_stats):
+    """Journal status for a CLI file_stats result."""
+    if result_stats['converted']:
+        return 'converted'
+    return 'skipped' if result_stats['skipped'] else 'error'
+
+class EncoderInput:
+    """
+    A texture ready for the encoders: decoded once, then upscaled and pre-flipped in memory.
+    
+    The same pixels are handed from stage to stage and to every fallback encoder without
+    being copied or decoded again. Backends with takes_pixels use .image directly; tools that
+    read a file get path(), written once (with light compression) on first use. close()
+    removes that file.
+    
+    source is the original texture (an EncoderInput as well) when .image is an exact 2x
+    upscale of it; it becomes mip 1, see encode_with_source_mip().
+    """
+    
+    def __init__(self, image, source_path, source=None):
+        self.image = image
+        self.source_path = source_path
+        self.source = source
+        self._path = None
+    
+    def path(self):
+        """The pixels as a PNG next to the source, for encoders that read a file."""
+        if self._path is None:
+            path = os.path.splitext(self.source_path)[0] + f"_temp_flipped_{os.urandom(4).hex()}.png"
+            self.image.save(path, compress_level=1)  # Read back right away; compression only costs time
+            self._path = path
+        return self._path
+    
+    def close(self):
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = None
+        if self.source is not None:
+            self.source.close()
+
+def prepare_encoder_input(png_path, upscale_to=None, data=None):
+    """
+    Decode a PNG once (from data, its bytes, when given), upscale it to (width, height) if given
+    and pre-flip it. Returns an EncoderInput.
+    """
+    import io
+    if _load_pillow() is None:
+        raise RuntimeError("Pillow is not available")
+    with PILImage.open(io.BytesIO(data) if data is not None else png_path) as img:
+        # Use LANCZOS for high-quality upscaling; the flip makes the copy that outlives the file
+        image = img.resize(upscale_to, PILImage.Resampling.LANCZOS) if upscale_to else img
+        source = None
+        if upscale_to and tuple(upscale_to) == (img.width * 2, img.height * 2):
+            source = EncoderInput(img.transpose(PILImage.Transpose.FLIP_TOP_BOTTOM), png_path) # Mip 1 as it is
+        return EncoderInput(image.transpose(PILImage.Transpose.FLIP_TOP_BOTTOM), png_path, source)
+
+def texconv_command(input_path, output_dir, has_alpha=True, use_gpu=False, preset=None, texconv_path=None,
+                    compression_format=None, mipmaps=None, adapter=0):
+    """Build the texconv command line for one texture (format and mip levels default to the config)."""
+    cmd = [
+        texconv_path or TEXCONV_PATH,
+        "-f", compression_format or DEFAULT_COMPRESSION_FORMAT,  # BC7_UNORM
+        "-o", output_dir,                  # Output directory
+        "-y",                              # Overwrite existing files
+        "-ft", "dds",                      # Output DDS format
+    ]
+    
+    if mipmaps is not None:
+        cmd.extend(["-m", str(mipmaps)])  # Mip levels from a path rule (1 = no mipmaps)
+    elif GENERATE_MIPMAPS:
+        cmd.extend(["-m", "0"])  # Generate all mipmap levels
+    
+    if has_alpha:
+        cmd.append("-pmalpha")  # Convert to premultiplied alpha for better quality
+    
+    cmd.extend(ENCODER_PRESETS.get(preset or ENCODER_PRESET, []))
+    
+    if use_gpu:
+        cmd.extend(["-gpu", str(adapter)]) # Adapter index (see GpuScheduler)
+    
+    cmd.append(input_path)
+    return cmd
 
-def convert_png_to_dds(png_path, dds_path, has_alpha=True, use_gpu=False):
+def convert_png_to_dds(png_path, dds_path, has_alpha=True, use_gpu=False, preset=None, compression_format=None, mipmaps=None,
+                       backend=None, texture=None):
     """
-    Convert PNG to DDS using texconv.exe (RimPy's approach).
+    Convert PNG to DDS with an encoder backend (texconv on the GPU or CPU by default, see ENCODER BACKENDS).
     
     Key parameters based on RimPy's successful approach:
     - BC7_UNORM for best quality with alpha support
@@ -249,105 +1204,2660 @@ def convert_png_to_dds(png_path, dds_path, has_alpha=True, use_gpu=False):
     - Proper handling of alpha channels
     - FLIPPED INPUT: Pre-flip PNG before conversion to correct in-game orientation
     - Optional GPU acceleration.
+    
+    texture is the EncoderInput of png_path when the caller already prepared it (it stays open).
     """
-    temp_flipped_path = None
+    own_texture = texture is None
+    backend = backend or ENCODER_BACKENDS['texconv-gpu' if use_gpu else 'texconv-cpu']
     try:
         # Pre-flip the PNG to correct in-game orientation issues
         # Based on runtime testing, RimWorld displays textures upside down when converted normally
-        if PILLOW_AVAILABLE:
-            temp_flipped_path = os.path.splitext(png_path)[0] + f"_temp_flipped_{int(time.time()*1000)}.png"
-            
+        if texture is None and _load_pillow() is not None:
             try:
-                with PILImage.open(png_path) as img:
-                    # Flip vertically to correct in-game orientation
-                    flipped_img = img.transpose(PILImage.Transpose.FLIP_TOP_BOTTOM)
-                    flipped_img.save(temp_flipped_path)
-                    
-                # Use the flipped image for conversion
-                input_path = temp_flipped_path
+                texture = prepare_encoder_input(png_path)
                 print_info(f"Pre-flipped texture for correct orientation: {os.path.basename(png_path)}")
-                
             except Exception as e:
                 print_warning(f"Failed to flip texture {os.path.basename(png_path)}: {e}")
                 print_warning("Proceeding with original texture (may appear upside down in-game)")
-                input_path = png_path
-        else:
+        elif texture is None:
             print_warning("Pillow not available - textures may appear upside down in-game")
-            input_path = png_path
-        
-        # Build texconv command
-        cmd = [
-            TEXCONV_PATH,
-            "-f", DEFAULT_COMPRESSION_FORMAT,  # BC7_UNORM
-            "-o", os.path.dirname(dds_path),   # Output directory
-            "-y",                              # Overwrite existing files
-            "-ft", "dds",                      # Output DDS format
-        ]
-        
-        if GENERATE_MIPMAPS:
-            cmd.extend(["-m", "0"])  # Generate all mipmap levels
-        
-        if has_alpha:
-            cmd.append("-pmalpha")  # Convert to premultiplied alpha for better quality
-
-        if use_gpu:
-            cmd.extend(["-gpu", "0"]) # Add GPU flag
         
-        cmd.append(input_path)
-        
-        print_info(f"Converting: {os.path.basename(png_path)} -> {os.path.basename(dds_path)}")
+        if texture is None:
+            input_path, pixels = png_path, None
+        elif backend.takes_pixels:
+            input_path, pixels = None, texture.image  # No file needed
+        else:
+            input_path, pixels = texture.path(), None
         
-        # Execute conversion with no visible window
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            timeout=60,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
+        print_info(f"Converting ({backend.name}): {os.path.basename(png_path)} -> {os.path.basename(dds_path)}")
         
-        if result.returncode == 0:
-            # texconv creates files with original name + .dds, need to rename if different
-            generated_dds = os.path.join(os.path.dirname(dds_path), 
-                                       os.path.splitext(os.path.basename(input_path))[0] + ".dds")
-            
-            if generated_dds != dds_path and os.path.exists(generated_dds):
-                shutil.move(generated_dds, dds_path)
-            return True
+        if texture is not None and texture.source is not None:
+            # Upscaled 2x: the original pixels are mip 1 instead of the upscale sampled back down
+            error = encode_with_source_mip(backend, texture, dds_path, has_alpha, preset or ENCODER_PRESET,
+                                           compression_format or DEFAULT_COMPRESSION_FORMAT, mipmaps)
         else:
-            print_error(f"texconv failed for {png_path}")
-            print(f"Command: {' '.join(cmd)}")
-            print(f"Error output: {result.stderr}")
+            error = backend.encode(input_path, dds_path, has_alpha, preset or ENCODER_PRESET,
+                                   compression_format or DEFAULT_COMPRESSION_FORMAT, mipmaps, pixels=pixels)
+        if error:
+            print_error(f"{backend.name} failed for {png_path}: {error}")
             return False
+        return True
             
-    except subprocess.TimeoutExpired:
-        print_error(f"Conversion timeout for {png_path}")
-        return False
     except Exception as e:
         print_error(f"Conversion failed for {png_path}: {e}")
         return False
     finally:
-        # Clean up temporary flipped file
-        if temp_flipped_path and os.path.exists(temp_flipped_path):
+        # Clean up the temporary flipped file
+        if own_texture and texture is not None:
             try:
-                os.remove(temp_flipped_path)
+                texture.close()
             except Exception as e_cleanup:
-                print_warning(f"Could not remove temporary flipped file {temp_flipped_path}: {e_cleanup}")
+                print_warning(f"Could not remove temporary flipped file of {png_path}: {e_cleanup}")
 
 # ============================================================================
-# WORKER FUNCTION FOR PARALLEL PROCESSING
+# ENCODER PRESETS AND CALIBRATION
 # ============================================================================
 
-def _process_file_task(png_path, enable_gpu_cli_arg):
-    """Processes a single PNG file: upscale, convert to DDS (GPU/CPU), skip logic."""
-    file_stats = {
-        'converted': 0, 'upscaled': 0, 'skipped': 0, 'errors': 0,
-        'gpu_conversions': 0, 'cpu_conversions': 0
-    }
-    temp_path = None  # For temporary upscaled image
+def stratified_sample(png_files, manifest, sample_size=CALIBRATION_SAMPLE_SIZE):
+    """Pick up to sample_size textures spread over size classes and alpha/opaque in proportion to the corpus."""
+    strata = {}
+    for png_file in sorted(png_files):
+        info = manifest_texture_info(manifest, png_file)
+        if not info:
+            continue
+        size_class = int(math.log2(max(1, info['width'] * info['height']))) // 2  # Steps of 4x pixels
+        strata.setdefault((size_class, info['has_alpha']), []).append(png_file)
+    
+    total = sum(len(files) for files in strata.values())
+    sample = []
+    for key in sorted(strata):
+        files = strata[key]
+        count = min(len(files), max(1, round(sample_size * len(files) / total)))
+        step = len(files) / count
+        sample.extend(files[int(i * step)] for i in range(count))
+    if len(sample) > sample_size:  # One per stratum can exceed the budget when there are many strata
+        step = len(sample) / sample_size
+        sample = [sample[int(i * step)] for i in range(sample_size)]
+    return sample
+
+def measure_psnr(reference, decoded):
+    """PSNR in dB between two images of the same size (RGBA), or None if they differ in size."""
+    from PIL import ImageChops, ImageStat
+    if reference.size != decoded.size:
+        return None
+    diff = ImageChops.difference(reference.convert('RGBA'), decoded.convert('RGBA'))
+    squared = ImageStat.Stat(diff).sum2
+    mse = sum(squared) / (len(squared) * reference.width * reference.height)
+    return 99.0 if mse == 0 else 10 * math.log10(255 * 255 / mse)
 
+def calibrate_presets(png_files, manifest, texconv_path=None, use_gpu=False,
+                      sample_size=CALIBRATION_SAMPLE_SIZE, log=_cli_log):
+    """
+    Encode a stratified sample under every preset and measure time and PSNR.
+    
+    PSNR compares the decoded top mip against the (flipped, premultiplied) texconv input, so
+    it only measures the encoder. The result is cached for this texconv build and GPU setting.
+    """
+    import subprocess
+    import shutil
+    import tempfile
+    if _load_pillow() is None:
+        log("Pillow is required for calibration", "error")
+        return None
+    
+    texconv_path = texconv_path or TEXCONV_PATH
+    sample = stratified_sample(png_files, manifest, sample_size)
+    if not sample:
+        log("No textures to calibrate with", "warning")
+        return None
+    log(f"Calibrating encoder presets on {len(sample)} of {len(png_files)} textures...", "info")
+    
+    work_dir = tempfile.mkdtemp(prefix="rimconvert_calibration_")
+    results = {}
     try:
-        # Generate DDS path (same location, different extension)
+        # Flipped inputs and reference images are prepared once for all presets
+        inputs = []
+        sample_pixels = 0
+        for index, png_file in enumerate(sample):
+            has_alpha = manifest_texture_info(manifest, png_file)['has_alpha']
+            try:
+                with PILImage.open(png_file) as img:
+                    flipped = img.convert('RGBA').transpose(PILImage.Transpose.FLIP_TOP_BOTTOM)
+            except Exception as e:
+                log(f"Skipping {os.path.basename(png_file)} in calibration: {e}", "warning")
+                continue
+            input_path = os.path.join(work_dir, f"sample_{index}.png")
+            flipped.save(input_path)
+            if has_alpha:
+                flipped = PILImage.frombytes('RGBA', flipped.size, flipped.convert('RGBa').tobytes())
+            inputs.append((input_path, has_alpha, flipped))
+            sample_pixels += flipped.width * flipped.height
+        
+        for preset in PRESET_QUALITY_ORDER:
+            out_dir = os.path.join(work_dir, preset)
+            os.makedirs(out_dir)
+            seconds = 0.0
+            scores = []
+            failures = 0
+            for input_path, has_alpha, reference in inputs:
+                cmd = texconv_command(input_path, out_dir, has_alpha, use_gpu, preset, texconv_path)
+                start = time.perf_counter()
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=120,
+                                        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+                seconds += time.perf_counter() - start
+                dds_path = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".dds")
+                if result.returncode != 0 or not os.path.exists(dds_path):
+                    failures += 1
+                    continue
+                try:
+                    with PILImage.open(dds_path) as decoded:
+                        score = measure_psnr(reference, decoded)
+                except Exception:
+                    score = None  # This Pillow cannot decode the DDS format
+                if score is not None:
+                    scores.append(score)
+            
+            results[preset] = {
+                'seconds_per_file': seconds / len(inputs) if inputs else 0.0,
+                'seconds_per_mpx': seconds / max(sample_pixels / 1e6, 1e-6),
+                'mean_psnr': sum(scores) / len(scores) if scores else None,
+                'min_psnr': min(scores) if scores else None,
+                'failures': failures,
+            }
+            log(f"  {preset:<9} {format_preset_result(results[preset])}", "info")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    calibration = {'texconv': tool_fingerprint(texconv_path), 'gpu': bool(use_gpu),
+                   'files': len(inputs), 'pixels': sample_pixels, 'presets': results}
+    cache = load_cache()
+    cache['calibration'] = calibration
+    save_cache(cache)
+    return calibration
+
+def format_preset_result(result):
+    """One-line summary of a preset's calibration result."""
+    if result['mean_psnr'] is None:
+        quality = "PSNR n/a"
+    else:
+        quality = f"PSNR {result['mean_psnr']:.1f} dB (worst {result['min_psnr']:.1f} dB)"
+    failed = f", {result['failures']} failed" if result['failures'] else ""
+    return f"{result['seconds_per_file'] * 1000:.0f} ms/texture, {quality}{failed}"
+
+def cached_calibration(texconv_path=None, use_gpu=False):
+    """Calibration from the cache if it was measured with this texconv build and GPU setting."""
+    calibration = load_cache().get('calibration')
+    if (calibration and calibration.get('gpu') == bool(use_gpu)
+            and calibration.get('texconv') == tool_fingerprint(texconv_path or TEXCONV_PATH)):
+        return calibration
+    return None
+
+def recommend_preset(calibration, total_files, workers=1, target_seconds=None, min_psnr=PRESET_MIN_PSNR):
+    """
+    Pick a preset from calibration results. Returns (preset, reason).
+    
+    Presets below the quality floor are dropped, as are presets whose quality could not be
+    measured. With a run time target the best-quality preset that fits is chosen (the
+    fastest one if none fits); without one, the fastest.
+    """
+    presets = calibration['presets']
+    
+    def predicted(preset):
+        return presets[preset]['seconds_per_file'] * total_files / max(1, workers)
+    
+    working = [p for p in PRESET_QUALITY_ORDER if p in presets and not presets[p]['failures']]
+    if not working:
+        return 'balanced', "calibration failed for every preset"
+    candidates = [p for p in working
+                  if presets[p]['mean_psnr'] is not None and presets[p]['mean_psnr'] >= min_psnr]
+    if not candidates:
+        return working[-1], f"no preset reaches {min_psnr:.0f} dB, using the best quality"
+    
+    if target_seconds:
+        fits = [p for p in candidates if predicted(p) <= target_seconds]
+        if fits:
+            preset = fits[-1]
+            return preset, f"best quality within {format_duration(target_seconds)} (~{format_duration(predicted(preset))})"
+        preset = min(candidates, key=predicted)
+        return preset, f"nothing fits {format_duration(target_seconds)}, using the fastest (~{format_duration(predicted(preset))})"
+    preset = min(candidates, key=predicted)
+    return preset, f"fastest at or above {min_psnr:.0f} dB (~{format_duration(predicted(preset))})"
+
+def resolve_preset(preset, png_files=None, manifest=None, texconv_path=None, use_gpu=False, workers=1,
+                   target_minutes=None, min_psnr=None, log=_cli_log):
+    """
+    Turn 'auto' into a concrete preset, calibrating first if there is no cached calibration
+    (and png_files are given). Other presets are returned unchanged.
+    """
+    if preset != 'auto':
+        return preset if preset in ENCODER_PRESETS else 'balanced'
+    calibration = cached_calibration(texconv_path, use_gpu)
+    if calibration is None and png_files:
+        calibration = calibrate_presets(png_files, manifest, texconv_path, use_gpu, log=log)
+    if calibration is None:
+        log("No encoder calibration available; using the 'balanced' preset", "warning")
+        return 'balanced'
+    
+    target_seconds = target_minutes * 60 if target_minutes else None
+    chosen, reason = recommend_preset(calibration, len(png_files) if png_files else calibration['files'],
+                                      workers, target_seconds, PRESET_MIN_PSNR if min_psnr is None else min_psnr)
+    log(f"Encoder preset 'auto' -> '{chosen}': {reason}", "info")
+    return chosen
+
+# ============================================================================
+# GPU ADAPTERS
+# ============================================================================
+
+ADAPTER_LINE_RE = re.compile(r'^\s*(\d+):\s*VID:([0-9A-Fa-f]+),\s*PID:([0-9A-Fa-f]+)\s*-\s*(.+?)\s*$')
+SOFTWARE_ADAPTER_VID = '1414'  # Microsoft Basic Render Driver (WARP), not worth a lane
+
+def list_gpu_adapters(texconv_path=None):
+    """[(index, name)] of the hardware adapters texconv can use, read from its usage text."""
+    import subprocess
+    try:
+        result = subprocess.run([texconv_path or TEXCONV_PATH], capture_output=True, text=True, timeout=10,
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    adapters = []
+    for line in (result.stdout + result.stderr).splitlines():
+        match = ADAPTER_LINE_RE.match(line)
+        if match and match.group(2).upper() != SOFTWARE_ADAPTER_VID:
+            adapters.append((int(match.group(1)), match.group(4)))
+    return adapters
+
+class GpuScheduler:
+    """
+    Spreads GPU encode jobs over the adapters.
+    
+    Each job goes to the adapter that would finish it first, (jobs in flight + 1) x its
+    measured seconds per Mpx, so an adapter twice as fast gets about twice the work. An
+    adapter without a measurement gets the next job whenever it is idle, so every adapter
+    is measured early in a run. Failures are counted per adapter; after ADAPTER_MAX_FAILURES
+    in a row the adapter gets no more jobs. Rates can be seeded from an earlier run
+    (to_dict() output, keyed by adapter name).
+    """
+    
+    def __init__(self, adapters, rates=None, log=_cli_log):
+        self.log = log
+        self._lock = threading.Lock()
+        rates = rates or {}
+        self.adapters = dict(adapters)
+        self.stats = {index: {'in_flight': 0, 'seconds_per_mpx': rates.get(name), 'files': 0, 'mpx': 0.0,
+                              'failures': 0, 'failed_in_row': 0, 'disabled': False}
+                      for index, name in self.adapters.items()}
+    
+    def _cost(self, row, fallback):
+        if row['seconds_per_mpx'] is None:
+            return 0.0 if row['in_flight'] == 0 else (row['in_flight'] + 1) * fallback
+        return (row['in_flight'] + 1) * row['seconds_per_mpx']
+    
+    def acquire(self, exclude=()):
+        """Index of the adapter for the next job (counted as in flight), or None if none is usable."""
+        with self._lock:
+            usable = [index for index, row in self.stats.items() if not row['disabled'] and index not in exclude]
+            if not usable:
+                return None
+            measured = [row['seconds_per_mpx'] for row in self.stats.values() if row['seconds_per_mpx'] is not None]
+            fallback = sum(measured) / len(measured) if measured else 1.0
+            index = min(usable, key=lambda i: (self._cost(self.stats[i], fallback), i))
+            self.stats[index]['in_flight'] += 1
+            return index
+    
+    def release(self, index, mpx, seconds, ok, sharing=1):
+        """Record a finished job on an adapter; sharing is the number of jobs it had in flight, this one included."""
+        with self._lock:
+            row = self.stats[index]
+            row['in_flight'] -= 1
+            if ok:
+                row['files'] += 1
+                row['mpx'] += mpx
+                row['failed_in_row'] = 0
+                rate = seconds / sharing / max(mpx, 0.01)  # Jobs on one adapter share it, so wall time overstates
+                row['seconds_per_mpx'] = rate if row['seconds_per_mpx'] is None else \
+                    (1 - ADAPTER_RATE_SMOOTHING) * row['seconds_per_mpx'] + ADAPTER_RATE_SMOOTHING * rate
+                return
+            row['failures'] += 1
+            row['failed_in_row'] += 1
+            if row['failed_in_row'] >= ADAPTER_MAX_FAILURES and not row['disabled']:
+                row['disabled'] = True
+                self.log(f"GPU adapter {index} ({self.adapters[index]}) failed {row['failed_in_row']} times in a row; "
+                    f"not using it for the rest of this run", "warning")
+    
+    def run(self, encode, mpx):
+        """Call encode(adapter) on the best adapter, moving on to the next one if it fails. Returns None or an error."""
+        tried, error = set(), "no usable GPU adapter"
+        throttle = THROTTLE
+        if throttle is not None:
+            throttle.acquire('gpu') # Background mode caps the GPU encodes in flight
+        try:
+            while (index := self.acquire(tried)) is not None:
+                sharing = self.stats[index]['in_flight']
+                start = time.perf_counter()
+                error = "encoder raised an exception"
+                try:
+                    error = encode(index)
+                finally:
+                    self.release(index, mpx, time.perf_counter() - start, error is None, sharing)
+                if error is None:
+                    return None
+                tried.add(index)
+                error = f"adapter {index}: {error}"
+            return error
+        finally:
+            if throttle is not None:
+                throttle.release('gpu')
+    
+    def summary(self):
+        """One line per adapter: files, Mpx, measured speed and failures."""
+        lines = []
+        for index, row in self.stats.items():
+            speed = f"{1 / row['seconds_per_mpx']:.2f} Mpx/s" if row['seconds_per_mpx'] else "not measured"
+            failed = f", {row['failures']} failed" + (" (dropped)" if row['disabled'] else "") if row['failures'] else ""
+            lines.append(f"GPU {index} {self.adapters[index]}: {row['files']} files, {row['mpx']:.1f} Mpx, {speed}{failed}")
+        return lines
+    
+    def to_dict(self):
+        """Measured seconds per Mpx by adapter name, for the cache."""
+        return {self.adapters[index]: row['seconds_per_mpx'] for index, row in self.stats.items()
+                if row['seconds_per_mpx'] is not None}
+
+GPU_SCHEDULER = None  # Created on the first GPU encode of the process, see gpu_scheduler()
+_GPU_SCHEDULER_LOCK = threading.Lock()
+
+def gpu_scheduler(log=None):
+    """
+    The process's GpuScheduler over the adapters in GPU_ADAPTERS (default: all hardware adapters).
+    log, when given, gets its warnings from then on (a daemon runs many jobs over one scheduler).
+    """
+    global GPU_SCHEDULER
+    with _GPU_SCHEDULER_LOCK:
+        if GPU_SCHEDULER is None:
+            log = log or _cli_log
+            adapters = list_gpu_adapters()
+            if GPU_ADAPTERS is not None:
+                names = dict(adapters)
+                adapters = [(index, names.get(index, f"adapter {index}")) for index in GPU_ADAPTERS]
+            GPU_SCHEDULER = GpuScheduler(adapters or [(0, "default adapter")], load_cache().get('gpu_adapters'), log)
+            if len(GPU_SCHEDULER.adapters) > 1:
+                log(f"Spreading GPU work over {len(GPU_SCHEDULER.adapters)} adapters: "
+                    + ", ".join(f"{index} {name}" for index, name in GPU_SCHEDULER.adapters.items()), "info")
+        elif log is not None:
+            GPU_SCHEDULER.log = log
+        return GPU_SCHEDULER
+
+def save_gpu_adapter_rates():
+    """Keep the adapters' measured speeds so the next run starts with the right weights."""
+    if GPU_SCHEDULER is not None and GPU_SCHEDULER.to_dict():
+        cache = load_cache()
+        cache['gpu_adapters'] = {**cache.get('gpu_adapters', {}), **GPU_SCHEDULER.to_dict()}
+        save_cache(cache)
+
+# ============================================================================
+# BACKGROUND MODE (LOW PRIORITY, CAPS AND THROTTLING)
+# ============================================================================
+
+THROTTLE = None  # WorkerThrottle of the running background conversion, see start_background_mode()
+
+def lower_process_priority(log=_cli_log):
+    """
+    Run the conversion and the encoders it starts at low priority: below normal on Windows,
+    BACKGROUND_NICE and the lowest best-effort I/O priority (ionice) on Linux, nice on macOS.
+    On Linux both belong to the calling thread; the worker threads and encoder processes
+    started from it afterwards inherit them. Raising the priority again needs privileges, so
+    a daemon runs each job on a thread of its own. On Windows the priority class is process
+    wide; the previous class is returned for restore_process_priority() (None elsewhere).
+    """
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        previous = kernel32.GetPriorityClass(kernel32.GetCurrentProcess())
+        if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS):
+            log("Background mode: running at below-normal priority", "info")
+            return previous or None
+        log("Background mode: could not lower the process priority", "warning")
+        return None
+    import shutil
+    import subprocess
+    lowered = []
+    try:
+        os.nice(BACKGROUND_NICE)
+        lowered.append(f"nice +{BACKGROUND_NICE}")
+    except OSError as e:
+        log(f"Background mode: could not lower the CPU priority: {e}", "warning")
+    ionice = shutil.which('ionice') if sys.platform.startswith('linux') else None
+    if ionice and subprocess.run([ionice, '-c', '2', '-n', '7', '-p', str(threading.get_native_id())],
+                                 capture_output=True).returncode == 0:
+        lowered.append("lowest I/O priority")
+    if lowered:
+        log(f"Background mode: running at {' and '.join(lowered)}", "info")
+    return None
+
+def restore_process_priority(priority_class):
+    """Give the process back the Windows priority class lower_process_priority() returned."""
+    if os.name == 'nt' and priority_class:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), priority_class)
+
+def running_process(names):
+    """The first of names (executable names, any case) that is running, or None."""
+    import subprocess
+    wanted = {name.lower(): name for name in names or ()}
+    if not wanted:
+        return None
+    if os.name == 'nt':
+        output = subprocess.run(['tasklist', '/FO', 'CSV', '/NH'], capture_output=True, text=True,
+                                creationflags=subprocess.CREATE_NO_WINDOW).stdout
+        running = (line.split('","')[0].strip('"') for line in output.splitlines())
+    elif os.path.isdir('/proc'):
+        def proc_names():
+            for pid in os.listdir('/proc'):
+                if not pid.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                        command = f.read().split(b'\0', 1)[0].decode('utf-8', 'replace')
+                    with open(f"/proc/{pid}/comm") as f:
+                        comm = f.read().strip()
+                except OSError:
+                    continue  # Exited meanwhile, or not ours to read
+                yield comm  # Cut to 15 characters by the kernel
+                yield re.split(r'[\\/]', command)[-1]  # Also finds Windows builds run through Wine/Proton
+        running = proc_names()
+    else:
+        output = subprocess.run(['ps', '-A', '-o', 'comm='], capture_output=True, text=True).stdout
+        running = (os.path.basename(line.strip()) for line in output.splitlines())
+    for name in running:
+        if name.lower() in wanted:
+            return wanted[name.lower()]
+    return None
+
+def system_cpu_seconds():
+    """Busy CPU seconds of the whole machine since boot (all cores), or None where this is unknown."""
+    if os.name == 'nt':
+        import ctypes
+        idle, kernel, user = (ctypes.c_ulonglong(), ctypes.c_ulonglong(), ctypes.c_ulonglong())
+        if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        return (kernel.value + user.value - idle.value) / 1e7  # Kernel time includes idle; 100 ns units
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    return (sum(fields[:8]) - fields[3] - fields[4]) / os.sysconf('SC_CLK_TCK')  # Minus idle and iowait
+
+def live_children_cpu_seconds():
+    """CPU seconds used so far by our child processes that have not exited yet (Linux), 0 elsewhere."""
+    if not os.path.isdir('/proc'):
+        return 0.0
+    parent = os.getpid()
+    ticks = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue  # Exited meanwhile
+        fields = stat[stat.rfind(')') + 2:].split()  # From field 3 (state) on; the name may contain spaces
+        if len(fields) > 14 and int(fields[1]) == parent:
+            ticks += sum(int(value) for value in fields[11:15])  # utime, stime, cutime, cstime
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+class WorkerThrottle:
+    """
+    Live caps on the file workers and GPU encodes of a conversion in background mode.
+    
+    Each file takes a 'cpu' slot (wrap()) and each GPU encode a 'gpu' slot; a worker waits
+    while its lane is at the limit. Limits change at any time: a lower one lets the files in
+    flight finish, a higher one wakes waiting workers. The monitor thread (start()) drops to
+    BACKGROUND_GAME_WORKERS while one of BACKGROUND_PROCESSES runs, and otherwise moves the
+    CPU limit one step per check towards the cores the rest of the machine leaves free,
+    never above the cap it started with.
+    """
+    
+    def __init__(self, cpu_cap, gpu_cap, log=_cli_log):
+        self.caps = {'cpu': cpu_cap, 'gpu': gpu_cap}
+        self.limits = dict(self.caps)
+        self.active = {'cpu': 0, 'gpu': 0}
+        self.log = log
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sample = None  # (wall, machine busy, our busy) seconds at the last check
+        self.priority_class = None  # Windows class to restore when the conversion ends
+    
+    def acquire(self, lane):
+        with self._condition:
+            while self.active[lane] >= self.limits[lane]:
+                self._condition.wait()
+            self.active[lane] += 1
+    
+    def release(self, lane):
+        with self._condition:
+            self.active[lane] -= 1
+            self._condition.notify_all()
+    
+    def wrap(self, task):
+        """task, run in a 'cpu' slot."""
+        def throttled(*args, **kwargs):
+            self.acquire('cpu')
+            try:
+                return task(*args, **kwargs)
+            finally:
+                self.release('cpu')
+        return throttled
+    
+    def set_limits(self, cpu, gpu, reason):
+        """Change the limits (kept between 1 and the caps) and log the change."""
+        cpu, gpu = max(1, min(self.caps['cpu'], cpu)), max(1, min(self.caps['gpu'], gpu))
+        with self._condition:
+            if (cpu, gpu) == (self.limits['cpu'], self.limits['gpu']):
+                return
+            self.limits['cpu'], self.limits['gpu'] = cpu, gpu
+            self._condition.notify_all()
+        self.log(f"Background mode: {cpu} file worker{'s' if cpu != 1 else ''}, {gpu} GPU "
+                 f"lane{'s' if gpu != 1 else ''} ({reason})", "info")
+    
+    def other_load(self):
+        """Cores kept busy by other programs since the last call (None on the first call or where unknown)."""
+        machine = system_cpu_seconds()
+        if machine is None:
+            return None
+        times = os.times()  # Encoder processes count once they have exited (not on Windows)...
+        ours = times.user + times.system + times.children_user + times.children_system
+        ours += live_children_cpu_seconds()  # ...and the running ones from /proc on Linux
+        sample, self._sample = self._sample, (time.monotonic(), machine, ours)
+        if sample is None or self._sample[0] - sample[0] <= 0:
+            return None
+        load = (machine - sample[1] - (ours - sample[2])) / (self._sample[0] - sample[0])
+        if os.name == 'nt':
+            load -= self.active['cpu']  # Roughly one core per running encoder
+        return max(0.0, load)
+    
+    def check(self):
+        """Adjust the limits to the game and the machine's load (one monitor step)."""
+        game = running_process(BACKGROUND_PROCESSES)
+        load = self.other_load()
+        if game:
+            self.set_limits(BACKGROUND_GAME_WORKERS, 1, f"{game} is running")
+        elif load is not None:
+            free = max(1, int((os.cpu_count() or 1) - load))
+            cpu = self.limits['cpu']
+            self.set_limits(cpu + (free > cpu) - (free < cpu), self.caps['gpu'],
+                            f"other programs use {load:.1f} cores")
+        elif self.limits['cpu'] < self.caps['cpu']:
+            self.set_limits(self.limits['cpu'] + 1, self.caps['gpu'], "the game is not running")
+    
+    def _monitor(self):
+        while not self._stop.wait(BACKGROUND_CHECK_SECONDS):
+            try:
+                self.check()
+            except Exception as e:
+                self.log(f"Background mode: load check failed, keeping the current limits: {e}", "warning")
+    
+    def start(self):
+        self.check()  # The game may already be running
+        self._thread = threading.Thread(target=self._monitor, name="throttle", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+def start_background_mode(workers, log=_cli_log):
+    """
+    Lower the priority and start throttling a conversion with `workers` file workers: at most
+    BACKGROUND_CPU_SHARE of the cores and BACKGROUND_GPU_LANES GPU encodes. Returns the WorkerThrottle.
+    """
+    global THROTTLE
+    priority_class = lower_process_priority(log)
+    cpu_cap = max(1, min(workers, int((os.cpu_count() or 1) * BACKGROUND_CPU_SHARE)))
+    THROTTLE = WorkerThrottle(cpu_cap, max(1, BACKGROUND_GPU_LANES), log)
+    THROTTLE.priority_class = priority_class
+    log(f"Background mode: at most {cpu_cap} file workers and {THROTTLE.caps['gpu']} GPU lanes, fewer while the "
+        f"machine is busy or {' / '.join(BACKGROUND_PROCESSES) or 'the game'} runs", "info")
+    return THROTTLE.start()
+
+def stop_background_mode():
+    """
+    Stop the throttle's monitor and restore the Windows priority class. On Linux the lowered
+    thread ends with its job; the band pool's threads started meanwhile inherited the low
+    priority, so the pool is retired and the next job gets a fresh one. (On macOS nice is
+    process wide and cannot be undone.)
+    """
+    global THROTTLE, BAND_EXECUTOR
+    if THROTTLE is not None:
+        THROTTLE.stop()
+        restore_process_priority(THROTTLE.priority_class)
+        THROTTLE = None
+        with _BAND_EXECUTOR_LOCK:
+            if BAND_EXECUTOR is not None:
+                BAND_EXECUTOR.shutdown(wait=False) # Idle threads exit; queued bands still run
+                BAND_EXECUTOR = None
+
+# ============================================================================
+# ENCODER BACKENDS
+# ============================================================================
+
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+DDSCAPS_COMPLEX_MIPMAP = 0x400008
+
+def _run_encoder_tool(cmd, timeout=None):
+    """Run an encoder command line without a console window. Returns None, or an error message."""
+    import subprocess
+    timeout = timeout or ENCODER_TIMEOUT
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout,
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+    except subprocess.TimeoutExpired:
+        return f"timed out after {timeout}s"
+    except OSError as e:
+        return str(e)
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout or '').strip().splitlines()
+        return f"exit code {result.returncode}" + (f" ({output[-1]})" if output else "")
+    return None
+
+def _input_megapixels(input_path):
+    """Size of an encoder input in Mpx (0 if the header cannot be read), for GPU scheduling."""
+    info = probe_png_header(input_path)
+    return info['width'] * info['height'] / 1e6 if info else 0.0
+
+class EncoderBackend:
+    """
+    Common interface of the DDS encoders.
+    
+    A backend has a unique name, the lane it runs on ('gpu' or 'cpu', used for throughput
+    accounting and --no-gpu) and the formats it writes. encode() turns a PNG that is already
+    flipped and upscaled into a DDS; an in-process encoder simply does its work there.
+    Backends with takes_pixels accept the decoded input as a Pillow image (no file is written
+    for them). Backends with large_only are not benchmarked and only used for textures of
+    BAND_MIN_PIXELS and up. Instances are made available to the pipeline with register_backend().
+    """
+    name = None
+    lane = 'cpu'
+    formats = ('BC7_UNORM', 'BC3_UNORM', 'BC1_UNORM')
+    takes_pixels = False
+    large_only = False
+    
+    def available(self):
+        """Whether the encoder can run on this machine."""
+        return True
+    
+    def fingerprint(self):
+        """Identifies the encoder build; cached benchmark results are dropped when it changes."""
+        return None
+    
+    def encode(self, input_path, dds_path, has_alpha, preset, compression_format, mipmaps=None, pixels=None):
+        """
+        Write dds_path with premultiplied alpha if has_alpha. mipmaps is a texconv level count
+        (0 = full chain, None = GENERATE_MIPMAPS). With takes_pixels, the input may come as
+        pixels (a Pillow image) instead of input_path. Returns None, or an error message.
+        """
+        raise NotImplementedError
+
+class TexconvBackend(EncoderBackend):
+    """texconv (DirectXTex) on the GPU or the CPU; it builds the mip chain and premultiplies itself."""
+    
+    def __init__(self, use_gpu):
+        self.use_gpu = use_gpu
+        self.name = 'texconv-gpu' if use_gpu else 'texconv-cpu'
+        self.lane = 'gpu' if use_gpu else 'cpu'
+    
+    def available(self):
+        return os.path.exists(TEXCONV_PATH)
+    
+    def fingerprint(self):
+        return tool_fingerprint(TEXCONV_PATH)
+    
+    def encode(self, input_path, dds_path, has_alpha, preset, compression_format, mipmaps=None, pixels=None):
+        if not self.use_gpu:
+            return self._encode_on(None, input_path, dds_path, has_alpha, preset, compression_format, mipmaps)
+        return gpu_scheduler().run(
+            lambda adapter: self._encode_on(adapter, input_path, dds_path, has_alpha, preset, compression_format, mipmaps),
+            _input_megapixels(input_path))
+    
+    def _encode_on(self, adapter, input_path, dds_path, has_alpha, preset, compression_format, mipmaps):
+        import shutil
+        output_dir = os.path.dirname(dds_path)
+        error = _run_encoder_tool(texconv_command(input_path, output_dir, has_alpha, self.use_gpu, preset,
+                                                  compression_format=compression_format, mipmaps=mipmaps,
+                                                  adapter=adapter or 0))
+        if error:
+            return error
+        # texconv names the output after its input
+        generated = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + ".dds")
+        if generated != dds_path and os.path.exists(generated):
+            shutil.move(generated, dds_path)
+        return None if os.path.exists(dds_path) else "no DDS was written"
+
+BAND_EXECUTOR = None  # Thread pool shared by the banded encodes of all conversion workers
+_BAND_EXECUTOR_LOCK = threading.Lock()
+
+def band_executor():
+    """The shared pool that runs the bands of large textures (BAND_WORKERS threads)."""
+    global BAND_EXECUTOR
+    import concurrent.futures
+    with _BAND_EXECUTOR_LOCK:
+        if BAND_EXECUTOR is None:
+            BAND_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=BAND_WORKERS or os.cpu_count() or 1,
+                                                                  thread_name_prefix="band")
+        return BAND_EXECUTOR
+
+def band_rows(height, bands):
+    """[(top, bottom)] pixel rows of up to `bands` bands of whole 4-pixel block rows."""
+    rows = max(BAND_MIN_ROWS, -(-height // max(1, bands) // 4) * 4)
+    return [(top, min(height, top + rows)) for top in range(0, height, rows)]
+
+def write_dds_levels(dds_path, header, count, payloads):
+    """Write a DDS from the header of its level 0 and the payloads of its `count` levels in order."""
+    header = bytearray(header)
+    if count > 1:
+        flags, = struct.unpack_from('<I', header, 8)
+        caps, = struct.unpack_from('<I', header, 108)
+        struct.pack_into('<I', header, 8, flags | DDSD_MIPMAPCOUNT)
+        struct.pack_into('<I', header, 28, count)
+        struct.pack_into('<I', header, 108, caps | DDSCAPS_COMPLEX_MIPMAP)
+    with open(dds_path, 'wb') as f:
+        f.write(header)
+        for payload in payloads:
+            f.write(payload)
+
+class PerLevelBackend(EncoderBackend):
+    """
+    Base for encoders that write a single level and leave alpha alone (bc7enc, most command-line
+    tools). The mip chain is built here with a box filter from the premultiplied texture, each
+    level is encoded on its own and the levels are joined into one DDS.
+    
+    On the CPU, levels of BAND_MIN_PIXELS and up are cut into bands of whole block rows that
+    are encoded in parallel on the band pool. BC blocks do not depend on their neighbours and
+    are stored row by row, so the band payloads joined in order are the level's payload.
+    """
+    takes_pixels = True
+    
+    def encode_level(self, input_path, dds_path, preset, compression_format, adapter=None):
+        """Encode one level (a PNG) into its own DDS. Returns None, or an error message."""
+        raise NotImplementedError
+    
+    def _encode_image(self, image, work_dir, stem, preset, compression_format, adapter):
+        """Encode one image with encode_level. Returns (error, DDS header, payload)."""
+        level_png = os.path.join(work_dir, f"{stem}.png")
+        level_dds = os.path.join(work_dir, f"{stem}.dds")
+        image.save(level_png, compress_level=1)  # Read back right away; compression only costs time
+        error = self.encode_level(level_png, level_dds, preset, compression_format, adapter)
+        if error:
+            return error, None, None
+        try:
+            with open(level_dds, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return "no DDS was written", None, None
+        parsed = parse_dds_header(data)
+        if parsed is None:
+            return "output is not a DDS", None, None
+        return None, data[:parsed['data_offset']], data[parsed['data_offset']:]
+    
+    def _encode_bands(self, image, work_dir, stem, preset, compression_format, adapter):
+        """Encode a large image as parallel bands and join them. Returns (error, DDS header, payload)."""
+        # The bands are cropped from the one decoded image the threads share; nothing is decoded twice
+        # Background mode keeps the bands of one texture within the throttle's CPU limit
+        rows = band_rows(image.height, THROTTLE.limits['cpu'] if THROTTLE is not None else BAND_WORKERS or os.cpu_count() or 1)
+        futures = [band_executor().submit(self._encode_image, image.crop((0, top, image.width, bottom)), work_dir,
+                                          f"{stem}_band{index}", preset, compression_format, adapter)
+                   for index, (top, bottom) in enumerate(rows)]
+        results = [future.result() for future in futures]
+        for index, (error, _, _) in enumerate(results):
+            if error:
+                return f"band {index + 1}/{len(rows)}: {error}", None, None
+        header = bytearray(results[0][1])
+        payload = b''.join(result[2] for result in results)
+        struct.pack_into('<I', header, 12, image.height)
+        flags, = struct.unpack_from('<I', header, 8)
+        if flags & DDSD_LINEARSIZE:
+            struct.pack_into('<I', header, 20, len(payload))
+        return None, bytes(header), payload
+    
+    def encode(self, input_path, dds_path, has_alpha, preset, compression_format, mipmaps=None, adapter=None,
+               pixels=None):
+        import shutil
+        import tempfile
+        if _load_pillow() is None:
+            return "Pillow is required to build the mip chain"
+        if pixels is not None:
+            level = pixels if pixels.mode == 'RGBA' else pixels.convert('RGBA')  # Only read, never changed
+        else:
+            with PILImage.open(input_path) as img:
+                level = img.convert('RGBA')
+        if has_alpha:
+            level = PILImage.frombytes('RGBA', level.size, level.convert('RGBa').tobytes())
+        count = mip_level_count(level.width, level.height, mipmaps)
+        work_dir = tempfile.mkdtemp(prefix="rimconvert_levels_")
+        try:
+            header, payloads = None, []
+            for index in range(count):
+                banded = self.lane == 'cpu' and level.width * level.height >= BAND_MIN_PIXELS
+                encode = self._encode_bands if banded else self._encode_image
+                error, level_header, payload = encode(level, work_dir, f"level{index}", preset, compression_format,
+                                                      adapter)
+                if error:
+                    return f"mip {index}: {error}"
+                if header is None:
+                    header = bytearray(level_header)
+                payloads.append(payload)
+                level = level.resize((max(1, level.width // 2), max(1, level.height // 2)), PILImage.Resampling.BOX)
+            write_dds_levels(dds_path, header, count, payloads)
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+class Bc7encBackend(PerLevelBackend):
+    """bc7enc (bc7e BC7, rgbcx BC1/BC3) on the CPU."""
+    name = 'bc7enc'
+    
+    def available(self):
+        return os.path.exists(BC7ENC_PATH)
+    
+    def fingerprint(self):
+        return tool_fingerprint(BC7ENC_PATH)
+    
+    def encode_level(self, input_path, dds_path, preset, compression_format, adapter=None):
+        uber_level, rgb_level = BC7ENC_PRESETS.get(preset, BC7ENC_PRESETS['balanced'])
+        cmd = [BC7ENC_PATH, '-q', '-g']  # Quiet, no unpacked PNG
+        if compression_format.startswith('BC1'):
+            cmd += ['-1', '-b', f'-L{rgb_level}']  # -b: no transparent texels for dark colors
+        elif compression_format.startswith('BC3'):
+            cmd += ['-3', f'-L{rgb_level}']
+        else:
+            cmd.append(f'-u{uber_level}')
+        return _run_encoder_tool(cmd + [input_path, dds_path])
+
+class TexconvBandsBackend(PerLevelBackend):
+    """
+    texconv on the CPU, one level at a time, so that large levels are encoded as parallel
+    bands. Used instead of texconv-cpu for textures of BAND_MIN_PIXELS and up.
+    """
+    name = 'texconv-bands'
+    large_only = True
+    
+    def available(self):
+        return os.path.exists(TEXCONV_PATH)
+    
+    def fingerprint(self):
+        return tool_fingerprint(TEXCONV_PATH)
+    
+    def encode_level(self, input_path, dds_path, preset, compression_format, adapter=None):
+        # Alpha is already premultiplied by encode(); texconv names the output after its input
+        error = _run_encoder_tool(texconv_command(input_path, os.path.dirname(dds_path), False, False, preset,
+                                                  compression_format=compression_format, mipmaps=1))
+        if error:
+            return error
+        return None if os.path.exists(dds_path) else "no DDS was written"
+
+class CommandBackend(PerLevelBackend):
+    """
+    An encoder from the "encoder_backends" list in the config file, e.g. a local stand-in
+    for testing. Each entry has a "name" and a "command" (list of arguments, which may use
+    {input}, {output}, {output_dir}, {format}, {mipmaps}, {preset} and {adapter}), plus
+    optional "lane" ('cpu'/'gpu'), "formats" and "mipmaps": true if the tool writes the
+    whole mip chain (otherwise it is run once per level). The tool always gets premultiplied
+    input. A GPU command using {adapter} is spread over the adapters like texconv.
+    """
+    
+    def __init__(self, definition):
+        self.name = str(definition['name'])
+        self.command = [str(arg) for arg in definition['command']]
+        self.lane = definition.get('lane', 'cpu')
+        if self.lane not in ('cpu', 'gpu'):
+            raise ValueError(f"lane must be 'cpu' or 'gpu', not {self.lane!r}")
+        self.formats = tuple(definition.get('formats', EncoderBackend.formats))
+        self.writes_mipmaps = bool(definition.get('mipmaps', False))
+        self.uses_adapter = self.lane == 'gpu' and any('{adapter}' in arg for arg in self.command)
+        self.takes_pixels = not self.writes_mipmaps  # The levels are written here
+    
+    def available(self):
+        executable = self.command[0]
+        import shutil
+        return os.path.exists(executable) or shutil.which(executable) is not None
+    
+    def fingerprint(self):
+        return tool_fingerprint(self.command[0])
+    
+    def _run(self, input_path, dds_path, preset, compression_format, mipmaps, adapter):
+        import shutil
+        output_dir = os.path.dirname(dds_path)
+        fields = {'input': input_path, 'output': dds_path, 'output_dir': output_dir, 'format': compression_format,
+                  'mipmaps': mipmaps, 'preset': preset, 'adapter': adapter or 0}
+        error = _run_encoder_tool([arg.format(**fields) for arg in self.command])
+        if error:
+            return error
+        generated = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + ".dds")
+        if not os.path.exists(dds_path) and os.path.exists(generated):
+            shutil.move(generated, dds_path)
+        return None if os.path.exists(dds_path) else "no DDS was written"
+    
+    def encode_level(self, input_path, dds_path, preset, compression_format, adapter=None):
+        return self._run(input_path, dds_path, preset, compression_format, 1, adapter)
+    
+    def encode(self, input_path, dds_path, has_alpha, preset, compression_format, mipmaps=None, adapter=None,
+               pixels=None):
+        if self.uses_adapter and adapter is None:
+            return gpu_scheduler().run(
+                lambda index: self.encode(input_path, dds_path, has_alpha, preset, compression_format, mipmaps, index,
+                                          pixels),
+                pixels.width * pixels.height / 1e6 if pixels is not None else _input_megapixels(input_path))
+        if not self.writes_mipmaps:
+            return super().encode(input_path, dds_path, has_alpha, preset, compression_format, mipmaps, adapter, pixels)
+        levels = 0 if mipmaps is None and GENERATE_MIPMAPS else mipmaps if mipmaps is not None else 1
+        if not has_alpha:
+            return self._run(input_path, dds_path, preset, compression_format, levels, adapter)
+        if _load_pillow() is None:
+            return "Pillow is required to premultiply alpha"
+        premultiplied_path = os.path.splitext(input_path)[0] + f"_temp_premultiplied_{os.urandom(4).hex()}.png"
+        try:
+            with PILImage.open(input_path) as img:
+                PILImage.frombytes('RGBA', img.size, img.convert('RGBA').convert('RGBa').tobytes()).save(premultiplied_path)
+            return self._run(premultiplied_path, dds_path, preset, compression_format, levels, adapter)
+        finally:
+            if os.path.exists(premultiplied_path):
+                os.remove(premultiplied_path)
+
+def encode_with_source_mip(backend, texture, dds_path, has_alpha, preset, compression_format, mipmaps=None):
+    """
+    Encode a texture upscaled 2x (an EncoderInput with a source) with the original pixels as mip 1.
+    
+    A full chain made from the upscale starts by sampling it back down to the original size,
+    which only gives a blurrier copy of pixels we already have. Here level 0 is encoded on its
+    own, the original with the rest of the chain, and the two payloads are joined in level
+    order. Works with any backend. Returns None, or an error message.
+    """
+    import shutil
+    import tempfile
+    count = mip_level_count(texture.image.width, texture.image.height, mipmaps)
+    if count < 2:
+        return backend.encode(None if backend.takes_pixels else texture.path(), dds_path, has_alpha, preset,
+                              compression_format, mipmaps, pixels=texture.image if backend.takes_pixels else None)
+    work_dir = tempfile.mkdtemp(prefix="rimconvert_source_mip_")
+    try:
+        parts = []
+        for stem, part, levels in (("level0", texture, 1), ("mips", texture.source, count - 1)):
+            part_path = os.path.join(work_dir, f"{stem}.dds")
+            if backend.takes_pixels:
+                error = backend.encode(None, part_path, has_alpha, preset, compression_format, levels, pixels=part.image)
+            else:
+                error = backend.encode(part.path(), part_path, has_alpha, preset, compression_format, levels)
+            if error:
+                return f"{'level 0' if levels == 1 else 'mips from the original'}: {error}"
+            try:
+                with open(part_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return "no DDS was written"
+            parsed = parse_dds_header(data)
+            if parsed is None:
+                return "output is not a DDS"
+            if (parsed['width'], parsed['height'], parsed['mipmaps']) != (part.image.width, part.image.height, levels):
+                return f"{stem} came out {parsed['width']}x{parsed['height']} with {parsed['mipmaps']} levels"
+            parts.append((data[:parsed['data_offset']], data[parsed['data_offset']:]))
+        write_dds_levels(dds_path, parts[0][0], count, [payload for _, payload in parts])
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+ENCODER_BACKENDS = {}  # name -> EncoderBackend, see register_backend()
+BACKEND_CHOICE = None  # BackendChoice of the running conversion (set by convert and watch)
+
+def register_backend(backend):
+    """Make an encoder available to conversions and the benchmark (replaces one of the same name)."""
+    ENCODER_BACKENDS[backend.name] = backend
+    return backend
+
+for _backend in (TexconvBackend(use_gpu=True), TexconvBackend(use_gpu=False), TexconvBandsBackend(), Bc7encBackend()):
+    register_backend(_backend)
+
+def register_config_backends(definitions, log=_cli_log):
+    """Register the command-line encoders from the config file's "encoder_backends" list."""
+    for definition in definitions or []:
+        try:
+            register_backend(CommandBackend(definition))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            log(f"Ignoring encoder backend {definition!r}: {e}", "warning")
+
+def runnable_backends(use_gpu, compression_format=None, ranked_only=False):
+    """
+    Registered backends that can run here (GPU lanes only with use_gpu) and write the format.
+    ranked_only leaves out the large_only backends, which are not benchmarked.
+    """
+    compression_format = compression_format or DEFAULT_COMPRESSION_FORMAT
+    return [backend for backend in ENCODER_BACKENDS.values()
+            if (use_gpu or backend.lane != 'gpu') and compression_format in backend.formats and backend.available()
+            and not (ranked_only and backend.large_only)]
+
+def size_class(pixels):
+    """Name of the BACKEND_SIZE_CLASSES class a texture of this many pixels falls in."""
+    for limit, name in BACKEND_SIZE_CLASSES:
+        if limit is None or pixels <= limit:
+            return name
+
+def benchmark_backends(png_files, manifest, use_gpu=False, preset=None, sample_size=BACKEND_BENCHMARK_SAMPLE,
+                       log=_cli_log):
+    """
+    Encode a stratified sample with every runnable backend and measure the time per size class
+    and the PSNR of the top mip. The result is cached for these encoder builds, GPU setting and preset.
+    """
+    import shutil
+    import tempfile
+    if _load_pillow() is None:
+        log("Pillow is required to benchmark the encoders", "error")
+        return None
+    preset = preset if preset in ENCODER_PRESETS else 'balanced'
+    backends = runnable_backends(use_gpu, ranked_only=True)
+    sample = stratified_sample(png_files, manifest, sample_size)
+    if not backends or not sample:
+        return None
+    log(f"Benchmarking {len(backends)} encoders on {len(sample)} textures (once per machine)...", "info")
+    
+    work_dir = tempfile.mkdtemp(prefix="rimconvert_backends_")
+    results = {}
+    try:
+        inputs = []
+        for index, png_file in enumerate(sample):
+            has_alpha = manifest_texture_info(manifest, png_file)['has_alpha']
+            try:
+                with PILImage.open(png_file) as img:
+                    flipped = img.convert('RGBA').transpose(PILImage.Transpose.FLIP_TOP_BOTTOM)
+            except Exception as e:
+                log(f"Skipping {os.path.basename(png_file)} in the encoder benchmark: {e}", "warning")
+                continue
+            input_path = os.path.join(work_dir, f"sample_{index}.png")
+            flipped.save(input_path)
+            if has_alpha:
+                flipped = PILImage.frombytes('RGBA', flipped.size, flipped.convert('RGBa').tobytes())
+            inputs.append((input_path, has_alpha, flipped))
+        
+        for backend in backends:
+            out_dir = os.path.join(work_dir, backend.name)
+            os.makedirs(out_dir)
+            classes = {}
+            scores = []
+            failures = 0
+            for input_path, has_alpha, reference in inputs:
+                dds_path = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".dds")
+                start = time.perf_counter()
+                error = backend.encode(input_path, dds_path, has_alpha, preset, DEFAULT_COMPRESSION_FORMAT)
+                seconds = time.perf_counter() - start
+                if error:
+                    failures += 1
+                    continue
+                row = classes.setdefault(size_class(reference.width * reference.height),
+                                         {'files': 0, 'seconds': 0.0, 'mpx': 0.0})
+                row['files'] += 1
+                row['seconds'] += seconds
+                row['mpx'] += reference.width * reference.height / 1e6
+                try:
+                    with PILImage.open(dds_path) as decoded:
+                        score = measure_psnr(reference, decoded)
+                except Exception:
+                    score = None  # This Pillow cannot decode the DDS format
+                if score is not None:
+                    scores.append(score)
+            results[backend.name] = {
+                'lane': backend.lane,
+                'classes': classes,
+                'mean_psnr': sum(scores) / len(scores) if scores else None,
+                'failures': failures,
+            }
+            log(f"  {backend.name:<12} {format_backend_result(results[backend.name])}", "info")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    benchmark = {'backends': {backend.name: backend.fingerprint() for backend in backends}, 'gpu': bool(use_gpu),
+                 'preset': preset, 'files': len(inputs), 'results': results}
+    cache = load_cache()
+    cache['backend_benchmark'] = benchmark
+    save_cache(cache)
+    return benchmark
+
+def format_backend_result(result):
+    """One-line summary of a backend's benchmark result."""
+    speeds = ", ".join(f"{name} {row['seconds'] / row['files'] * 1000:.0f} ms/texture"
+                       for _, name in BACKEND_SIZE_CLASSES if (row := result['classes'].get(name)))
+    quality = "PSNR n/a" if result['mean_psnr'] is None else f"PSNR {result['mean_psnr']:.1f} dB"
+    failed = f", {result['failures']} failed" if result['failures'] else ""
+    return f"{speeds or 'no successful encodes'}, {quality}{failed}"
+
+def cached_backend_benchmark(use_gpu=False, preset=None):
+    """The cached benchmark if it covers the backends runnable now with these settings."""
+    benchmark = load_cache().get('backend_benchmark')
+    if not benchmark or benchmark.get('gpu') != bool(use_gpu) or benchmark.get('preset') != preset:
+        return None
+    current = {backend.name: backend.fingerprint() for backend in runnable_backends(use_gpu, ranked_only=True)}
+    return benchmark if benchmark.get('backends') == current else None
+
+class BackendChoice:
+    """
+    The encoders a run tries for each texture, in order: a preferred backend (if one was
+    asked for), then the benchmark ranking for the texture's size class (fastest first,
+    among backends without failures that reach min_psnr), then texconv on the GPU and the
+    CPU as fallbacks, so a failing encoder never loses a texture. From BAND_MIN_PIXELS up,
+    texconv-bands takes the place of texconv-cpu (which stays as the last fallback).
+    """
+    
+    def __init__(self, use_gpu, benchmark=None, preferred=None, min_psnr=None):
+        self.use_gpu = use_gpu
+        self.benchmark = benchmark
+        self.preferred = preferred
+        self.min_psnr = PRESET_MIN_PSNR if min_psnr is None else min_psnr
+        self._orders = {}  # (size class, format) -> [backend]
+    
+    def ranking(self, size_class_name):
+        """Benchmarked backend names for a size class, fastest first."""
+        if not self.benchmark:
+            return []
+        ranked = []
+        for name, result in self.benchmark['results'].items():
+            if result['failures'] or (result['mean_psnr'] is not None and result['mean_psnr'] < self.min_psnr):
+                continue
+            rows = [result['classes'][size_class_name]] if size_class_name in result['classes'] \
+                else list(result['classes'].values())
+            mpx = sum(row['mpx'] for row in rows)
+            if mpx > 0:
+                ranked.append((sum(row['seconds'] for row in rows) / mpx, name))
+        return [name for _, name in sorted(ranked)]
+    
+    def candidates(self, pixels, compression_format=None):
+        """Backends to try, in order, for a texture of this many pixels."""
+        compression_format = compression_format or DEFAULT_COMPRESSION_FORMAT
+        banded = pixels >= BAND_MIN_PIXELS
+        key = (size_class(pixels), compression_format, banded)
+        if key not in self._orders:
+            names = ([self.preferred] if self.preferred else []) + self.ranking(key[0])
+            names += ['texconv-gpu', 'texconv-cpu'] if self.use_gpu else ['texconv-cpu']
+            if banded:
+                names = [('texconv-bands' if name == 'texconv-cpu' else name) for name in names] + ['texconv-cpu']
+            runnable = {backend.name: backend for backend in runnable_backends(self.use_gpu, compression_format)}
+            self._orders[key] = [runnable[name] for name in dict.fromkeys(names)
+                                 if name in runnable and (banded or not runnable[name].large_only or name == self.preferred)]
+        return self._orders[key]
+    
+    def describe(self):
+        """'small: bc7enc, medium: texconv-gpu, ...' for the log."""
+        classes = [(limit or 1024 * 1024, name) for limit, name in BACKEND_SIZE_CLASSES] + [(BAND_MIN_PIXELS, 'huge')]
+        return ", ".join(f"{name}: {self.candidates(pixels)[0].name}" for pixels, name in classes if self.candidates(pixels))
+
+def resolve_backends(png_files=None, manifest=None, use_gpu=False, preset=None, choice=None, log=_cli_log):
+    """
+    BackendChoice for a run. choice defaults to ENCODER_BACKEND: 'auto' uses the cached benchmark,
+    benchmarking first when there is none, png_files are given and more than one encoder could
+    run; 'texconv' keeps texconv only; any other name is tried first for every texture.
+    """
+    choice = choice or ENCODER_BACKEND
+    if choice == 'texconv':
+        return BackendChoice(use_gpu)
+    if choice != 'auto':
+        if choice not in {backend.name for backend in runnable_backends(use_gpu)}:
+            log(f"Encoder backend '{choice}' cannot run here; using texconv", "warning")
+            return BackendChoice(use_gpu)
+        return BackendChoice(use_gpu, preferred=choice)
+    
+    benchmark = cached_backend_benchmark(use_gpu, preset)
+    if benchmark is None and png_files and len(runnable_backends(use_gpu, ranked_only=True)) > 1:
+        benchmark = benchmark_backends(png_files, manifest, use_gpu, preset, log=log)
+    backend_choice = BackendChoice(use_gpu, benchmark)
+    if benchmark:
+        log(f"Encoders by texture size: {backend_choice.describe()}", "info")
+    return backend_choice
+
+# ============================================================================
+# DRY-RUN PLANNER
+# ============================================================================
+
+# Bytes per 4x4 block of the block-compressed formats we write
+DDS_BLOCK_BYTES = {'BC7_UNORM': 16, 'BC3_UNORM': 16, 'BC1_UNORM': 8}
+
+def dds_size(width, height, compression_format=None, mipmaps=None):
+    """
+    Size in bytes of the DDS texconv writes for a width x height texture (header included).
+    
+    mipmaps is a flag (full chain or none) or a texconv level count (0 = full chain).
+    """
+    compression_format = compression_format or DEFAULT_COMPRESSION_FORMAT
+    mipmaps = GENERATE_MIPMAPS if mipmaps is None else mipmaps
+    levels = 0 if mipmaps is True else 1 if mipmaps is False else mipmaps
+    block_bytes = DDS_BLOCK_BYTES.get(compression_format, 16)
+    size = 128 + (20 if compression_format.startswith('BC7') else 0)  # DDS header (+ DX10 header)
+    level = 1
+    while True:
+        size += max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * block_bytes
+        if level == levels or (width == 1 and height == 1):
+            return size
+        width, height = max(1, width // 2), max(1, height // 2)
+        level += 1
+
+def rgba_texture_size(width, height):
+    """GPU memory of a PNG loaded by the game: uncompressed RGBA32 with a full mip chain."""
+    size = 0
+    while True:
+        size += width * height * 4
+        if width == 1 and height == 1:
+            return size
+        width, height = max(1, width // 2), max(1, height // 2)
+
+def format_bytes(nbytes):
+    """Format a byte count as '512 KB', '3.4 MB' or '1.25 GB'."""
+    if nbytes >= 1 << 30:
+        return f"{nbytes / (1 << 30):.2f} GB"
+    if nbytes >= 1 << 20:
+        return f"{nbytes / (1 << 20):.1f} MB"
+    return f"{nbytes / (1 << 10):.0f} KB"
+
+def planned_lane_cost(use_gpu=False, preset=None, texconv_path=None):
+    """
+    (overhead seconds per file, seconds per megapixel) for predicting run time, or None.
+    
+    Uses the lane costs fitted during the last conversion with this preset on this machine.
+    Without one, a run with another preset is scaled by the two presets' speeds in the
+    encoder calibration, and without any run the calibration alone is used.
+    """
+    preset = preset or ENCODER_PRESET
+    lanes = ('gpu', 'cpu') if use_gpu else ('cpu',)
+    by_preset = load_cache().get('throughput_presets') or {}
+    for lane in lanes:
+        if lane in by_preset.get(preset, {}):
+            return tuple(by_preset[preset][lane])
+    calibration = cached_calibration(texconv_path, use_gpu)
+    speeds = {name: result['seconds_per_mpx'] for name, result in (calibration or {}).get('presets', {}).items()
+              if result.get('seconds_per_mpx')}
+    if preset not in speeds:
+        return None
+    for measured, saved in by_preset.items():
+        for lane in lanes:
+            if lane in saved and measured in speeds:
+                overhead, seconds_per_mpx = saved[lane]
+                return overhead, seconds_per_mpx * speeds[preset] / speeds[measured]
+    return 0.0, speeds[preset]
+
+def plan_conversion(png_files, manifest, enable_upscaling=None, workers=1, lane_cost=None, rules=None):
+    """
+    Predict the work of a conversion without converting anything.
+    
+    Applies the same upscale decisions, VRAM budget sizes, path rules and skip rule (DDS newer
+    than PNG) as a real run.
+    Returns {'mods': {mod name: row}, 'total': row, 'formats': {format: DDS bytes}}; a row
+    holds file counts, PNG/DDS bytes, GPU memory before/after, source and to-convert Mpx
+    and predicted seconds (None without a lane cost).
+    """
+    enable_upscaling = ENABLE_UPSCALING if enable_upscaling is None else enable_upscaling
+    rules = PATH_RULES if rules is None else rules
+    mods_path = manifest['mods_path']
+    
+    def new_row():
+        return {'files': 0, 'convert': 0, 'skip': 0, 'upscale': 0, 'reduce': 0, 'unreadable': 0, 'png_bytes': 0,
+                'dds_bytes': 0, 'vram_before': 0, 'vram_after': 0, 'source_mpx': 0.0, 'mpx': 0.0, 'seconds': None}
+    
+    mods = {}
+    formats = {compression_format: 0 for compression_format in DDS_BLOCK_BYTES}
+    total = new_row()
+    for png_file in png_files:
+        rel_path = os.path.relpath(png_file, mods_path)
+        row = mods.setdefault(rel_path.split(os.sep)[0], new_row())
+        entry = manifest['files'].get(rel_path)
+        info = manifest_texture_info(manifest, png_file)
+        for target in (row, total):
+            target['files'] += 1
+            target['png_bytes'] += entry[0] if entry else 0
+        if not info:
+            for target in (row, total):
+                target['unreadable'] += 1
+            continue
+        
+        rule = rule_for_path(png_file, mods_path, rules)
+        width, height = output_size(info, enable_upscaling, rule)
+        dds_path = os.path.splitext(png_file)[0] + '.dds'
+        up_to_date = (os.path.exists(dds_path) and entry
+                      and os.path.getmtime(dds_path) > entry[1]
+                      and not (manifest.get('budget_sizes') is not None and dds_outdated_by_budget(dds_path, info, enable_upscaling, rule)))
+        for compression_format in formats:
+            formats[compression_format] += dds_size(width, height, compression_format, rule.get('mipmaps'))
+        nbytes = dds_size(width, height, rule.get('format'), rule.get('mipmaps'))
+        for target in (row, total):
+            target['dds_bytes'] += nbytes
+            target['vram_before'] += rgba_texture_size(info['width'], info['height'])
+            target['source_mpx'] += info['width'] * info['height'] / 1e6
+            target['vram_after'] += nbytes
+            if up_to_date:
+                target['skip'] += 1
+            else:
+                target['convert'] += 1
+                target['mpx'] += width * height / 1e6
+                if width * height > info['width'] * info['height']:
+                    target['upscale'] += 1
+                elif width * height < info['width'] * info['height']:
+                    target['reduce'] += 1
+    
+    if lane_cost:
+        overhead, seconds_per_mpx = lane_cost
+        for row in list(mods.values()) + [total]:
+            row['seconds'] = (overhead * row['convert'] + seconds_per_mpx * row['mpx']) / max(1, workers)
+    return {'mods': mods, 'total': total, 'formats': formats}
+
+def format_plan(plan):
+    """Lines of a per-mod table for a plan (mods with the most predicted work first)."""
+    def sort_key(item):
+        row = item[1]
+        return (row['seconds'] or 0, row['mpx'])
+    
+    def line(name, row):
+        seconds = format_duration(row['seconds']) if row['seconds'] is not None else "?"
+        return (f"{name[:32]:<32} {row['files']:>6} {row['convert']:>6} {row['skip']:>6} {row['upscale']:>5} {row['reduce']:>5} "
+                f"{format_bytes(row['png_bytes']):>10} {format_bytes(row['dds_bytes']):>10} "
+                f"{format_bytes(row['vram_before']):>10} {format_bytes(row['vram_after']):>10} {seconds:>8}")
+    
+    lines = [f"{'Mod':<32} {'PNGs':>6} {'Conv':>6} {'Skip':>6} {'Up':>5} {'Down':>5} "
+             f"{'PNG size':>10} {'DDS size':>10} {'VRAM PNG':>10} {'VRAM DDS':>10} {'Time':>8}"]
+    lines.extend(line(name, row) for name, row in sorted(plan['mods'].items(), key=sort_key, reverse=True))
+    lines.append("-" * len(lines[0]))
+    lines.append(line("Total", plan['total']))
+    lines.append("DDS size by format: " + ", ".join(f"{compression_format} {format_bytes(nbytes)}"
+                                                   for compression_format, nbytes in plan['formats'].items()))
+    if plan['total']['seconds'] is None:
+        lines.append("Time unknown: run 'calibrate' or one conversion on this machine to enable predictions.")
+    if plan['total']['unreadable']:
+        lines.append(f"{plan['total']['unreadable']} PNGs have unreadable headers and are not counted in sizes.")
+    return lines
+
+def scan_mods(mods_path, mode=None, game_version=None, enable_upscaling=None, lane_cost=None, workers=1, rules=None,
+              mods=None, on_mod=None, should_stop=None, log=_cli_log):
+    """
+    Per-mod overview for choosing what to convert (the GUI mod list).
+    
+    Each mod folder is discovered, probed (reusing unchanged manifest entries) and planned on
+    its own, and reported through on_mod(folder, name, row, done, count) as soon as it is
+    done; row is a plan_conversion row. Returns {folder: row}. The probed headers are saved
+    to the manifest (keeping the entries of mods not scanned), so the next run starts from them.
+    """
+    mods_path = os.path.abspath(mods_path)
+    quiet = lambda message, level="info": None if level == "info" else log(message, level)
+    previous_files = load_manifest(mods_path).get('files', {})
+    files = {}
+    rows = {}
+    folders = list_mod_folders(mods_path, mods, log)
+    for mod_folder, mod_path in folders:
+        if should_stop and should_stop():
+            break
+        png_files = list(iter_mod_textures(mod_path, mode, game_version, quiet, rules))
+        manifest = build_manifest(mods_path, png_files, quiet, previous_files)
+        files.update(manifest['files'])
+        plan = plan_conversion(png_files, manifest, enable_upscaling, workers, lane_cost, rules)
+        row = plan['mods'].get(mod_folder) or plan['total']
+        rows[mod_folder] = row
+        if on_mod:
+            on_mod(mod_folder, mod_display_name(mod_path), row, len(rows), len(folders))
+    
+    dimensions = {(entry[2], entry[3]) for entry in files.values() if entry[2] and entry[3]}
+    save_manifest({'mods_path': mods_path, 'created': datetime.now().isoformat(timespec='seconds'),
+                   'upscale_policy': upscale_policy_key(), 'files': files,
+                   'upscale_decisions': build_upscale_decision_table(dimensions)},
+                  log, keep_other_files=True)
+    return rows
+
+# ============================================================================
+# VRAM BUDGET (--vram-budget)
+# ============================================================================
+
+def budget_reductions(width, height):
+    """Smaller sizes a texture can be written at for the VRAM budget: halved step by step (its next
+    mip levels) while the short side stays at least BUDGET_MIN_SIDE."""
+    sizes = []
+    while min(width, height) // 2 >= BUDGET_MIN_SIDE:
+        width, height = width // 2, height // 2
+        sizes.append((width, height))
+    return sizes
+
+def _budget_step(size, source):
+    """Next smaller size of a texture now planned at size, or None when it cannot be reduced."""
+    if size[0] * size[1] > source[0] * source[1]:
+        return source  # Drop the upscale first
+    smaller = budget_reductions(*size)
+    return smaller[0] if smaller else None
+
+def fit_vram_budget(manifest, budget_bytes, enable_upscaling=None, rules=None, log=_cli_log):
+    """
+    Output sizes that make the manifest's planned DDS files fit in budget_bytes of GPU memory.
+    
+    A texture's footprint is its DDS size with the mip chain. Until the total fits, the
+    texture with the largest weighted footprint is reduced one step: an upscaled texture
+    is written at its own size, any other is halved, so it starts at its next mip level.
+    UI textures weigh less, dropping an upscale weighs more, and path rules with
+    "downscale": false are left alone. Returns {mods-relative path: [width, height]} of the
+    reduced textures, to be kept as manifest['budget_sizes'].
+    """
+    import heapq
+    enable_upscaling = ENABLE_UPSCALING if enable_upscaling is None else enable_upscaling
+    rules = PATH_RULES if rules is None else rules
+    decisions = manifest.get('upscale_decisions', {})
+    textures = {}  # rel path -> [planned size, source size, rule, weight]
+    heap = []
+    
+    def push(rel_path, size, source, rule, weight):
+        if _budget_step(size, source) is not None:
+            weight *= BUDGET_UPSCALE_WEIGHT if size[0] * size[1] > source[0] * source[1] else 1.0
+            heapq.heappush(heap, (-dds_size(*size, rule.get('format'), rule.get('mipmaps')) * weight, rel_path))
+    
+    planned = 0
+    for rel_path, entry in manifest.get('files', {}).items():
+        source = (entry[2], entry[3])
+        if not entry[2] or not entry[3]:
+            continue
+        mod_path = rel_path.replace(os.sep, '/').split('/', 1)[-1]
+        rule = rules.settings_for(mod_path) if rules else {}
+        target = decisions.get(f"{entry[2]}x{entry[3]}") if enable_upscaling else None
+        size = tuple(target) if target and rule.get('upscale') is not False else source
+        planned += dds_size(*size, rule.get('format'), rule.get('mipmaps'))
+        if rule.get('downscale') is not False:
+            weight = BUDGET_UI_WEIGHT if 'ui' in mod_path.lower().split('/')[:-1] else 1.0
+            textures[rel_path] = [size, source, rule, weight]
+            push(rel_path, size, source, rule, weight)
+    
+    total = planned
+    budget_sizes = {}
+    while total > budget_bytes and heap:
+        _, rel_path = heapq.heappop(heap)
+        texture = textures[rel_path]
+        size, source, rule, weight = texture
+        smaller = _budget_step(size, source)
+        total -= (dds_size(*size, rule.get('format'), rule.get('mipmaps'))
+                  - dds_size(*smaller, rule.get('format'), rule.get('mipmaps')))
+        texture[0] = budget_sizes[rel_path] = smaller
+        push(rel_path, smaller, source, rule, weight)
+    
+    if not budget_sizes:
+        log(f"VRAM budget {format_bytes(budget_bytes)}: the planned DDS files need {format_bytes(planned)}, "
+            f"nothing is reduced", "info")
+        return {}
+    log(f"VRAM budget {format_bytes(budget_bytes)}: {len(budget_sizes)} textures written smaller, "
+        f"DDS memory {format_bytes(planned)} -> {format_bytes(total)}", "info")
+    if total > budget_bytes:
+        log(f"The budget cannot be met without going below {BUDGET_MIN_SIDE} px; "
+            f"reduced as far as the limits allow", "warning")
+    return {rel_path: list(size) for rel_path, size in budget_sizes.items()}
+
+def dds_outdated_by_budget(dds_path, texture_info, enable_upscaling=None, rule=None):
+    """
+    In VRAM budget mode: whether an existing DDS has another size than the budget plans for
+    its texture, so it is converted again (reduced, or back to full size) even though it is
+    newer than the PNG. Only the DDS header is read.
+    """
+    enable_upscaling = ENABLE_UPSCALING if enable_upscaling is None else enable_upscaling
+    try:
+        with open(dds_path, 'rb') as f:
+            header = parse_dds_header(f.read(DDS_HEADER_SIZE + DDS_DX10_HEADER_SIZE))
+    except OSError:
+        return True
+    return header is None or (header['width'], header['height']) != output_size(texture_info, enable_upscaling, rule)
+
+# ============================================================================
+# LOAD-TIME COST MODEL (--min-benefit)
+# ============================================================================
+
+def texture_load_seconds(png_bytes, width, height, dds_bytes):
+    """Estimated (PNG load seconds, DDS load seconds) for one texture at game start."""
+    pixels = width * height
+    png_seconds = (png_bytes / (LOAD_DISK_MB_PER_SEC * 1e6)
+                   + pixels * (PNG_DECODE_NS_PER_PIXEL + PNG_MIPMAP_NS_PER_PIXEL) / 1e9
+                   + rgba_texture_size(width, height) / (UPLOAD_MB_PER_SEC * 1e6))
+    dds_seconds = dds_bytes / (LOAD_DISK_MB_PER_SEC * 1e6) + dds_bytes / (UPLOAD_MB_PER_SEC * 1e6)
+    return png_seconds, dds_seconds
+
+def conversion_benefit_ms(texture_info, png_bytes, enable_upscaling, rule=None, lane_cost=None):
+    """
+    Net load time saved per game start by converting a texture, in milliseconds.
+    
+    The load-time saving (PNG decode, mip build and upload against reading the DDS) is
+    reduced by the encode time (from lane_cost, see planned_lane_cost) spread over
+    BENEFIT_LOADS game starts. Upscaled or budget-reduced textures are costed at their output size.
+    """
+    rule = rule or {}
+    width, height = texture_info['width'], texture_info['height']
+    out_width, out_height = output_size(texture_info, enable_upscaling, rule)
+    dds_bytes = dds_size(out_width, out_height, rule.get('format'), rule.get('mipmaps'))
+    png_seconds, dds_seconds = texture_load_seconds(png_bytes, width, height, dds_bytes)
+    encode_seconds = 0.0
+    if lane_cost:
+        overhead, seconds_per_mpx = lane_cost
+        encode_seconds = overhead + seconds_per_mpx * out_width * out_height / 1e6
+    return (png_seconds - dds_seconds - encode_seconds / BENEFIT_LOADS) * 1000
+
+def filter_by_benefit(png_files, manifest, min_benefit_ms, enable_upscaling=None, lane_cost=None, rules=None):
+    """
+    Split png_files into (files worth converting, [(png_path, benefit ms), ...] left as PNG).
+    
+    Textures whose header could not be read are always kept.
+    """
+    enable_upscaling = ENABLE_UPSCALING if enable_upscaling is None else enable_upscaling
+    mods_path = manifest['mods_path']
+    keep, low_benefit = [], []
+    for png_file in png_files:
+        info = manifest_texture_info(manifest, png_file)
+        if not info:
+            keep.append(png_file)
+            continue
+        png_bytes = manifest['files'][os.path.relpath(png_file, mods_path)][0]
+        benefit = conversion_benefit_ms(info, png_bytes, enable_upscaling,
+                                        rule_for_path(png_file, mods_path, rules), lane_cost)
+        if benefit < min_benefit_ms:
+            low_benefit.append((png_file, benefit))
+        else:
+            keep.append(png_file)
+    return keep, low_benefit
+
+def write_benefit_report(low_benefit, min_benefit_ms, path=BENEFIT_REPORT_FILE, log=_cli_log):
+    """List the textures left as PNG by the cost/benefit filter (lowest benefit first)."""
+    if not low_benefit:
+        return
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# {len(low_benefit)} textures left as PNG: estimated benefit below {min_benefit_ms} ms "
+                    f"per game start (encode cost spread over {BENEFIT_LOADS} starts)\n")
+            for png_file, benefit in sorted(low_benefit, key=lambda item: item[1]):
+                f.write(f"{benefit:9.3f} ms  {png_file}\n")
+        log(f"Skipping {len(low_benefit)} textures where DDS gives no load-time win (listed in {path})", "info")
+    except OSError as e:
+        log(f"Could not write {path}: {e}", "warning")
+
+# ============================================================================
+# DDS FILES
+# ============================================================================
+
+DDS_MAGIC = b'DDS '
+DDS_HEADER_SIZE = 128  # Magic + DDS_HEADER
+DDS_DX10_HEADER_SIZE = 20
+DDPF_FOURCC = 0x4
+
+# DXGI formats in DX10 headers (texconv writes BC7 this way) and legacy FourCC codes
+DXGI_FORMATS = {28: 'R8G8B8A8_UNORM', 71: 'BC1_UNORM', 72: 'BC1_UNORM_SRGB', 77: 'BC3_UNORM',
+                78: 'BC3_UNORM_SRGB', 87: 'B8G8R8A8_UNORM', 98: 'BC7_UNORM', 99: 'BC7_UNORM_SRGB'}
+FOURCC_FORMATS = {b'DXT1': 'BC1_UNORM', b'DXT3': 'BC2_UNORM', b'DXT5': 'BC3_UNORM'}
+
+# Channel masks (R, G, B, A) of the uncompressed 32-bit layouts
+RGBA_MASK_FORMATS = {(0xFF, 0xFF00, 0xFF0000, 0xFF000000): 'R8G8B8A8_UNORM',
+                     (0xFF0000, 0xFF00, 0xFF, 0xFF000000): 'B8G8R8A8_UNORM',
+                     (0xFF0000, 0xFF00, 0xFF, 0): 'B8G8R8X8_UNORM'}
+
+def parse_dds_header(data):
+    """
+    Parse the header at the start of a DDS file (bytes, mmap or memoryview).
+    
+    Returns {'width', 'height', 'mipmaps', 'format', 'bits', 'data_offset'}, or None if data
+    is not a DDS. bits is the pixel size of uncompressed formats (0 for block formats), which
+    are reported as 'UNCOMPRESSED_<bits>BPP' unless they are a known 32-bit layout.
+    """
+    if len(data) < DDS_HEADER_SIZE or bytes(data[:4]) != DDS_MAGIC:
+        return None
+    height, width, _pitch, _depth, mipmaps = struct.unpack_from('<5I', data, 12)
+    pixel_flags, fourcc, bit_count = struct.unpack_from('<I4sI', data, 80)
+    data_offset = DDS_HEADER_SIZE
+    bits = 0
+    if not pixel_flags & DDPF_FOURCC:
+        bits = bit_count
+        masks = struct.unpack_from('<4I', data, 92)
+        compression_format = RGBA_MASK_FORMATS.get(masks, f"UNCOMPRESSED_{bit_count}BPP") if bits == 32 \
+            else f"UNCOMPRESSED_{bit_count}BPP"
+    elif fourcc == b'DX10':
+        if len(data) < DDS_HEADER_SIZE + DDS_DX10_HEADER_SIZE:
+            return None
+        dxgi_format = struct.unpack_from('<I', data, DDS_HEADER_SIZE)[0]
+        compression_format = DXGI_FORMATS.get(dxgi_format, f"DXGI_{dxgi_format}")
+        if compression_format.endswith('8A8_UNORM'):
+            bits = 32
+        data_offset += DDS_DX10_HEADER_SIZE
+    else:
+        compression_format = FOURCC_FORMATS.get(fourcc, fourcc.decode('ascii', 'replace'))
+    return {'width': width, 'height': height, 'mipmaps': max(1, mipmaps),
+            'format': compression_format, 'bits': bits, 'data_offset': data_offset}
+
+def dds_level_size(header, level):
+    """Bytes of one mip level of a parsed DDS (None for formats we cannot size)."""
+    width, height = max(1, header['width'] >> level), max(1, header['height'] >> level)
+    block_bytes = DDS_BLOCK_BYTES.get(header['format'].replace('_SRGB', ''))
+    if block_bytes:
+        return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * block_bytes
+    if header['bits']:
+        return width * height * header['bits'] // 8
+    return None
+
+def full_mip_count(width, height):
+    """Levels in a full mip chain down to 1x1."""
+    return max(width, height, 1).bit_length()
+
+def mip_level_count(width, height, mipmaps=None):
+    """Levels written for mipmaps: a flag, a texconv level count (0 = full chain) or None (GENERATE_MIPMAPS)."""
+    mipmaps = GENERATE_MIPMAPS if mipmaps is None else mipmaps
+    full = full_mip_count(width, height)
+    return full if mipmaps is True or mipmaps == 0 else 1 if mipmaps is False else min(mipmaps, full)
+
+# ============================================================================
+# DDS VERIFICATION (VECTORIZED BC1/BC3/BC7 DECODER)
+# ============================================================================
+
+# BC7 modes: (subsets, partition bits, rotation bits, index selection bits, color bits,
+#             alpha bits, endpoint p-bits, shared p-bits, index bits, secondary index bits)
+BC7_MODES = {
+    0: (3, 4, 0, 0, 4, 0, 1, 0, 3, 0),
+    1: (2, 6, 0, 0, 6, 0, 0, 1, 3, 0),
+    2: (3, 6, 0, 0, 5, 0, 0, 0, 2, 0),
+    3: (2, 6, 0, 0, 7, 0, 1, 0, 2, 0),
+    4: (1, 0, 2, 1, 5, 6, 0, 0, 2, 3),
+    5: (1, 0, 2, 0, 7, 8, 0, 0, 2, 2),
+    6: (1, 0, 0, 0, 7, 7, 1, 0, 4, 0),
+    7: (2, 6, 0, 0, 5, 5, 1, 0, 2, 0),
+}
+BC7_WEIGHTS = {
+    2: (0, 21, 43, 64),
+    3: (0, 9, 18, 27, 37, 46, 55, 64),
+    4: (0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64),
+}
+
+# Two-subset partitions: bit i is the subset of pixel i
+BC7_PARTITIONS_2 = (
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C,
+    0xAAAA, 0xF0F0, 0x5A5A, 0x33CC, 0x3C3C, 0x55AA, 0x9696, 0xA55A,
+    0x73CE, 0x13C8, 0x324C, 0x3BDC, 0x6996, 0xC33C, 0x9966, 0x0660,
+    0x0272, 0x04E4, 0x4E40, 0x2720, 0xC936, 0x936C, 0x39C6, 0x639C,
+    0x9336, 0x9CC6, 0x817E, 0xE718, 0xCCF0, 0x0FCC, 0x7744, 0xEE22,
+)
+# Three-subset partitions: subset of pixels 0-15
+BC7_PARTITIONS_3 = (
+    "0011001102212222", "0001001122112221", "0000200122112211", "0222002200110111",
+    "0000000011221122", "0011001100220022", "0022002211111111", "0011001122112211",
+    "0000000011112222", "0000111111112222", "0000111122222222", "0012001200120012",
+    "0112011201120112", "0122012201220122", "0011011211221222", "0011200122002220",
+    "0001001101121122", "0111001120012200", "0000112211221122", "0022002200221111",
+    "0111011102220222", "0001000122212221", "0000001101220122", "0000110022102210",
+    "0122012200110000", "0012001211222222", "0110122112210110", "0000011012211221",
+    "0022110211020022", "0110011020022222", "0011012201220011", "0000200022112221",
+    "0000000211221222", "0222002200120011", "0011001200220222", "0120012001200120",
+    "0000111122220000", "0120120120120120", "0120201212010120", "0011220011220011",
+    "0011112222000011", "0101010122222222", "0000000021212121", "0022112200221122",
+    "0022001100220011", "0220122102201221", "0101222222220101", "0000212121212121",
+    "0101010101012222", "0222011102220111", "0002111200021112", "0000211221122112",
+    "0222011101110222", "0002111211120002", "0110011001102222", "0000000021122112",
+    "0110011022222222", "0022001100110022", "0022112211220022", "0000000000002112",
+    "0002000100020001", "0222122202221222", "0101222222222222", "0111201122012220",
+)
+# Anchor (fix-up) pixel of subset 1 for two subsets, and of subsets 1 and 2 for three
+BC7_ANCHORS_2 = (
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2,
+    15, 15, 6, 8, 2, 8, 15, 15, 2, 8, 2, 2, 2, 15, 15, 6,
+    6, 2, 6, 8, 15, 15, 2, 2, 15, 15, 15, 15, 15, 2, 2, 15,
+)
+BC7_ANCHORS_3A = (
+    3, 3, 15, 15, 8, 3, 15, 15, 8, 8, 6, 6, 6, 5, 3, 3,
+    3, 3, 8, 15, 3, 3, 6, 10, 5, 8, 8, 6, 8, 5, 15, 15,
+    8, 15, 3, 5, 6, 10, 8, 15, 15, 3, 15, 5, 15, 15, 15, 15,
+    3, 15, 5, 5, 5, 8, 5, 10, 5, 10, 8, 13, 15, 12, 3, 3,
+)
+BC7_ANCHORS_3B = (
+    15, 8, 8, 3, 15, 15, 3, 8, 15, 15, 15, 15, 15, 15, 15, 8,
+    15, 8, 15, 3, 15, 8, 15, 8, 3, 15, 6, 10, 15, 15, 10, 8,
+    15, 3, 15, 10, 10, 8, 9, 10, 6, 15, 8, 15, 3, 6, 6, 8,
+    15, 3, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 3, 15, 15, 8,
+)
+
+_bc7_tables = None  # NumPy versions of the tables above, built by _bc7_partition_tables()
+
+def _bc7_partition_tables():
+    """
+    {subsets: (subset of each pixel [64, 16], anchor pixel mask [64, 16])}, plus 'mode':
+    the BC7 mode of each first byte (its lowest set bit, 8 = reserved).
+    """
+    global _bc7_tables
+    if _bc7_tables is None:
+        pixels = np.arange(16)
+        two = (np.array(BC7_PARTITIONS_2)[:, None] >> pixels) & 1
+        three = np.array([[int(c) for c in row] for row in BC7_PARTITIONS_3])
+        anchors = {1: np.zeros((64, 1), dtype=np.int64),
+                   2: np.stack([np.zeros(64, dtype=np.int64), BC7_ANCHORS_2], axis=1),
+                   3: np.stack([np.zeros(64, dtype=np.int64), BC7_ANCHORS_3A, BC7_ANCHORS_3B], axis=1)}
+        _bc7_tables = {subsets: (partitions, (pixels == anchors[subsets][:, :, None]).any(axis=1))
+                       for subsets, partitions in ((1, np.zeros((64, 16), dtype=np.int64)), (2, two), (3, three))}
+        _bc7_tables['mode'] = np.array([(byte & -byte).bit_length() - 1 if byte else 8 for byte in range(256)])
+    return _bc7_tables
+
+def _expand_bits(values, bits):
+    """Scale bits-wide values to 8 bits by bit replication."""
+    return (values << (8 - bits)) | (values >> (2 * bits - 8)) if bits < 8 else values
+
+def _decode_bc1_blocks(blocks, four_color=False):
+    """Decode 8-byte BC1 color blocks to [n, 16, 4] RGBA (four_color: the BC3 color block rules)."""
+    blocks = blocks.astype(np.int64)
+    c0 = blocks[:, 0] | blocks[:, 1] << 8
+    c1 = blocks[:, 2] | blocks[:, 3] << 8
+    
+    def rgb565(c):
+        r, g, b = c >> 11, (c >> 5) & 63, c & 31
+        return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=1)
+    
+    p0, p1 = rgb565(c0), rgb565(c1)
+    opaque = ((c0 > c1) | four_color)[:, None]
+    palette = np.empty((len(blocks), 4, 4), dtype=np.int64)
+    palette[:, 0, :3], palette[:, 1, :3] = p0, p1
+    palette[:, 2, :3] = np.where(opaque, (2 * p0 + p1) // 3, (p0 + p1) // 2)
+    palette[:, 3, :3] = np.where(opaque, (p0 + 2 * p1) // 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(opaque[:, 0], 255, 0)
+    codes = blocks[:, 4] | blocks[:, 5] << 8 | blocks[:, 6] << 16 | blocks[:, 7] << 24
+    indices = (codes[:, None] >> (2 * np.arange(16))) & 3
+    return palette[np.arange(len(blocks))[:, None], indices]
+
+def _decode_bc3_blocks(blocks):
+    """Decode 16-byte BC3 blocks (interpolated alpha + BC1 color) to [n, 16, 4] RGBA."""
+    pixels = _decode_bc1_blocks(blocks[:, 8:], four_color=True)
+    alpha = blocks[:, :8].astype(np.int64)
+    a0, a1 = alpha[:, 0:1], alpha[:, 1:2]
+    steps = np.arange(1, 7)
+    eight = ((7 - steps) * a0 + steps * a1) // 7
+    steps = np.arange(1, 5)
+    six = np.concatenate([((5 - steps) * a0 + steps * a1) // 5,
+                          np.zeros_like(a0), np.full_like(a0, 255)], axis=1)
+    palette = np.concatenate([a0, a1, np.where(a0 > a1, eight, six)], axis=1)
+    codes = np.zeros(len(blocks), dtype=np.int64)
+    for byte in range(6):
+        codes |= alpha[:, 2 + byte] << (8 * byte)
+    indices = (codes[:, None] >> (3 * np.arange(16))) & 7
+    pixels[:, :, 3] = palette[np.arange(len(blocks))[:, None], indices]
+    return pixels
+
+def _bit_field(low, high, offset, count):
+    """count bits at offset (int or per-pixel array) of 128-bit blocks split into two uint64 words."""
+    mask = np.uint64((1 << count) - 1)
+    first, last = np.min(offset), np.max(offset) + count
+    if first >= 64:  # Indices of most modes live in the high word
+        value = high >> (np.asarray(offset, dtype=np.uint64) - np.uint64(64))
+    elif last <= 64:
+        value = low >> np.asarray(offset, dtype=np.uint64)
+    else:
+        offset = np.asarray(offset, dtype=np.uint64)
+        in_low = offset < 64
+        low_shift = np.where(in_low, offset, 0)
+        high_shift = np.where(in_low, (64 - low_shift) & 63, offset - 64)
+        from_low = (low >> low_shift) | np.where(low_shift > 0, high << high_shift, 0)
+        value = np.where(in_low, from_low, high >> high_shift)
+    return (value & mask).astype(np.int32)
+
+def _decode_bc7_blocks(blocks):
+    """Decode 16-byte BC7 blocks to [n, 16, 4] RGBA, one vectorized pass per mode."""
+    words = np.ascontiguousarray(blocks).view('<u8')
+    low, high = words[:, 0], words[:, 1]
+    tables = _bc7_partition_tables()
+    modes = tables['mode'][blocks[:, 0]]
+    pixels = np.zeros((len(blocks), 16, 4), dtype=np.uint8)  # Reserved mode 8 decodes to zeros
+    for mode, (subsets, partition_bits, rotation_bits, selection_bits, color_bits, alpha_bits,
+               endpoint_pbits, shared_pbits, index_bits, index2_bits) in BC7_MODES.items():
+        selected = np.nonzero(modes == mode)[0]
+        if not len(selected):
+            continue
+        mode_low, mode_high = low[selected], high[selected]
+        position = mode + 1
+        
+        def take(count):
+            nonlocal position
+            value = _bit_field(mode_low, mode_high, position, count)
+            position += count
+            return value
+        
+        partition = take(partition_bits)
+        rotation = take(rotation_bits)
+        index_selection = take(selection_bits)
+        endpoints = np.full((len(selected), 2 * subsets, 4), 255, dtype=np.int32)
+        for channel in range(4 if alpha_bits else 3):
+            for endpoint in range(2 * subsets):
+                endpoints[:, endpoint, channel] = take(alpha_bits if channel == 3 else color_bits)
+        channels = 4 if alpha_bits else 3
+        if endpoint_pbits or shared_pbits:
+            if endpoint_pbits:
+                pbits = np.stack([take(1) for _ in range(2 * subsets)], axis=1)
+            else:
+                pbits = np.repeat(np.stack([take(1) for _ in range(subsets)], axis=1), 2, axis=1)
+            endpoints[:, :, :channels] = endpoints[:, :, :channels] << 1 | pbits[:, :, None]
+        extra = 1 if endpoint_pbits or shared_pbits else 0
+        endpoints[:, :, :3] = _expand_bits(endpoints[:, :, :3], color_bits + extra)
+        if alpha_bits:
+            endpoints[:, :, 3] = _expand_bits(endpoints[:, :, 3], alpha_bits + extra)
+        
+        pixel_subsets, is_anchor = tables[subsets][0][partition], tables[subsets][1][partition]
+        
+        def take_indices(width_bits):
+            nonlocal position
+            # Anchor pixels store one bit less; offsets follow from the running widths
+            widths = width_bits - is_anchor
+            offsets = position + np.cumsum(widths, axis=1) - widths
+            value = _bit_field(mode_low[:, None], mode_high[:, None], offsets, width_bits)
+            position += 16 * width_bits - subsets
+            return value & ((1 << widths) - 1)
+        
+        weights = np.array(BC7_WEIGHTS[index_bits], dtype=np.int32)[take_indices(index_bits)]
+        if index2_bits:
+            weights2 = np.array(BC7_WEIGHTS[index2_bits], dtype=np.int32)[take_indices(index2_bits)]
+            swap = (index_selection == 1)[:, None]
+            weights, alpha_weights = np.where(swap, weights2, weights), np.where(swap, weights, weights2)
+        
+        # Fits int16: at most 64 * 255 + 32
+        endpoint_rows = endpoints.astype(np.int16).reshape(-1, 4)
+        first = np.arange(len(selected))[:, None] * (2 * subsets) + 2 * pixel_subsets
+        e0, e1 = endpoint_rows.take(first, axis=0), endpoint_rows.take(first + 1, axis=0)
+        weights = weights.astype(np.int16)[:, :, None]
+        decoded = ((64 - weights) * e0 + weights * e1 + 32) >> 6
+        if index2_bits:
+            alpha_weights = alpha_weights.astype(np.int16)
+            decoded[:, :, 3] = ((64 - alpha_weights) * e0[:, :, 3] + alpha_weights * e1[:, :, 3] + 32) >> 6
+        for channel in (0, 1, 2):
+            swapped = rotation == channel + 1
+            if swapped.any():
+                decoded[swapped, :, channel], decoded[swapped, :, 3] = \
+                    decoded[swapped, :, 3].copy(), decoded[swapped, :, channel].copy()
+        pixels[selected] = decoded
+    return pixels
+
+BLOCK_DECODERS = {'BC1_UNORM': (8, _decode_bc1_blocks), 'BC3_UNORM': (16, _decode_bc3_blocks),
+                  'BC7_UNORM': (16, _decode_bc7_blocks)}
+
+def decode_dds_level(data, header, level, offset):
+    """
+    Decode one mip level starting at offset of a parsed DDS into a [height, width, 4] uint8
+    RGBA array (rows as stored, i.e. flipped), or None for formats we cannot decode.
+    """
+    width, height = max(1, header['width'] >> level), max(1, header['height'] >> level)
+    size = dds_level_size(header, level)
+    payload = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset)
+    compression_format = header['format'].replace('_SRGB', '')
+    if compression_format in BLOCK_DECODERS:
+        block_bytes, decode = BLOCK_DECODERS[compression_format]
+        blocks = payload.reshape(-1, block_bytes)
+        pixels = np.concatenate([decode(blocks[start:start + VERIFY_CHUNK_BLOCKS]).astype(np.uint8)
+                                 for start in range(0, len(blocks), VERIFY_CHUNK_BLOCKS)])
+        blocks_x, blocks_y = max(1, (width + 3) // 4), max(1, (height + 3) // 4)
+        image = pixels.reshape(blocks_y, blocks_x, 4, 4, 4).transpose(0, 2, 1, 3, 4)
+        return image.reshape(blocks_y * 4, blocks_x * 4, 4)[:height, :width]
+    if compression_format in ('R8G8B8A8_UNORM', 'B8G8R8A8_UNORM', 'B8G8R8X8_UNORM'):
+        image = payload.reshape(height, width, 4).copy()
+        if compression_format != 'R8G8B8A8_UNORM':
+            image = image[:, :, [2, 1, 0, 3]]
+        if compression_format == 'B8G8R8X8_UNORM':
+            image[:, :, 3] = 255
+        return image
+    return None
+
+def psnr_array(reference, decoded):
+    """PSNR in dB between two same-shaped uint8 arrays."""
+    mse = np.mean((reference.astype(np.float32) - decoded.astype(np.float32)) ** 2)
+    return 99.0 if mse == 0 else float(10 * math.log10(255 * 255 / mse))
+
+def expected_dds_layout(texture_info, enable_upscaling=None, rule=None, compression_format=None):
+    """
+    {'layouts': [(width, height, mip levels), ...], 'format'} a conversion may write for a texture.
+    
+    With enable_upscaling None the source size, the upscale target and the VRAM budget
+    reductions are all accepted (for checking files converted with unknown settings).
+    """
+    rule = rule or {}
+    sizes = [(texture_info['width'], texture_info['height'])]
+    if texture_info.get('upscale_to') and rule.get('upscale') is not False and enable_upscaling is not False:
+        sizes = [tuple(texture_info['upscale_to'])] + (sizes if enable_upscaling is None else [])
+    if texture_info.get('budget_size'):
+        sizes = [tuple(texture_info['budget_size'])]
+    elif enable_upscaling is None:
+        sizes += budget_reductions(texture_info['width'], texture_info['height'])
+    layouts = [(width, height, mip_level_count(width, height, rule.get('mipmaps'))) for width, height in sizes]
+    return {'layouts': layouts, 'format': rule.get('format') or compression_format or DEFAULT_COMPRESSION_FORMAT}
+
+def verify_dds(dds_path, png_path=None, expected=None, has_alpha=False, sampled_mips=VERIFY_SAMPLED_MIPS):
+    """
+    Check a converted DDS. Returns {'problems': [...], 'psnr': {level: dB}}.
+    
+    The header, mip count and payload size are always checked (against expected, from
+    expected_dds_layout, when given). With NumPy and png_path, sampled mips are decoded
+    and compared with the source as texconv saw it: flipped, resized and, for textures with
+    alpha, premultiplied.
+    """
+    problems = []
+    psnr = {}
+    try:
+        with open(dds_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return {'problems': [f"cannot read: {e}"], 'psnr': psnr}
+    header = parse_dds_header(data)
+    if header is None:
+        return {'problems': ["not a DDS file"], 'psnr': psnr}
+    
+    if expected:
+        layout = next((layout for layout in expected['layouts']
+                       if layout[:2] == (header['width'], header['height'])), None)
+        if layout is None:
+            width, height, _ = expected['layouts'][0]
+            problems.append(f"size {header['width']}x{header['height']}, expected {width}x{height}")
+        elif header['mipmaps'] != layout[2]:
+            problems.append(f"{header['mipmaps']} mip levels, expected {layout[2]}")
+        if header['format'].replace('_SRGB', '') != expected['format']:
+            problems.append(f"format {header['format']}, expected {expected['format']}")
+    if header['mipmaps'] > full_mip_count(header['width'], header['height']):
+        problems.append(f"{header['mipmaps']} mip levels for a {header['width']}x{header['height']} texture")
+        return {'problems': problems, 'psnr': psnr}
+    level_sizes = [dds_level_size(header, level) for level in range(header['mipmaps'])]
+    if None in level_sizes:
+        problems.append(f"unsupported format {header['format']}")
+        return {'problems': problems, 'psnr': psnr}
+    payload = header['data_offset'] + sum(level_sizes)
+    if len(data) != payload:
+        problems.append(f"{len(data)} bytes, expected {payload} for the header and {len(level_sizes)} mip levels")
+        return {'problems': problems, 'psnr': psnr}
+    
+    if not png_path or _load_numpy() is None or _load_pillow() is None:
+        return {'problems': problems, 'psnr': psnr}
+    try:
+        with PILImage.open(png_path) as img:
+            reference = img.convert('RGBA').transpose(PILImage.Transpose.FLIP_TOP_BOTTOM)
+    except Exception as e:
+        problems.append(f"cannot read source PNG: {e}")
+        return {'problems': problems, 'psnr': psnr}
+    if reference.size != (header['width'], header['height']):
+        reference = reference.resize((header['width'], header['height']), PILImage.Resampling.LANCZOS)
+    if has_alpha:
+        reference = PILImage.frombytes('RGBA', reference.size, reference.convert('RGBa').tobytes())
+    
+    offsets = [header['data_offset']]
+    for size in level_sizes:
+        offsets.append(offsets[-1] + size)
+    for level in range(0, min(header['mipmaps'], 2 * sampled_mips), 2):
+        decoded = decode_dds_level(data, header, level, offsets[level])
+        if decoded is None:
+            break
+        level_reference = reference if level == 0 else reference.resize(
+            (decoded.shape[1], decoded.shape[0]), PILImage.Resampling.BOX)
+        psnr[level] = psnr_array(np.asarray(level_reference), decoded)
+        floor = VERIFY_MIN_PSNR if level == 0 else VERIFY_MIN_MIP_PSNR
+        if psnr[level] < floor:
+            problems.append(f"mip {level} PSNR {psnr[level]:.1f} dB is below {floor:.0f} dB")
+    return {'problems': problems, 'psnr': psnr}
+
+def verify_converted_texture(png_path, dds_path, texture_info, enable_upscaling, rule=None, compression_format=None,
+                             log=_cli_log):
+    """
+    Post-encode check of a freshly written DDS (convert --verify). A DDS that fails is
+    removed so the game keeps loading the PNG. Returns True if it passed.
+    """
+    expected = expected_dds_layout(texture_info, enable_upscaling, rule, compression_format)
+    result = verify_dds(dds_path, png_path, expected, texture_info.get('has_alpha', False))
+    if not result['problems']:
+        return True
+    log(f"Verification failed for {os.path.basename(dds_path)}: {'; '.join(result['problems'])}. "
+        f"Removed it, the game uses the PNG.", "error")
+    try:
+        os.remove(dds_path)
+    except OSError:
+        pass
+    return False
+
+def verify_outputs(png_files, manifest, enable_upscaling=None, rules=None, workers=None, delete_bad=False,
+                   should_stop=None, log=_cli_log):
+    """
+    Verify the DDS next to every PNG that has one, in parallel ('verify' command).
+    
+    Returns (number checked, [(png_file, problems), ...]). With delete_bad, failing DDS
+    files are removed.
+    """
+    import concurrent.futures
+    if _load_numpy() is None:
+        log("NumPy is not installed; only checking DDS headers and sizes (pip install numpy to decode).", "warning")
+    pairs = [(png_file, os.path.splitext(png_file)[0] + '.dds') for png_file in png_files]
+    pairs = [(png_file, dds_file) for png_file, dds_file in pairs if os.path.exists(dds_file)]
+    rules = PATH_RULES if rules is None else rules
+    failures = []
+    
+    def check(png_file, dds_file):
+        info = manifest_texture_info(manifest, png_file) or probe_png_header(png_file) or {}
+        if not info:
+            return ["cannot read source PNG header"]
+        expected = expected_dds_layout(info, enable_upscaling, rule_for_path(png_file, manifest['mods_path'], rules))
+        return verify_dds(dds_file, png_file, expected, info.get('has_alpha', False))['problems']
+    
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit(index):
+            return executor.submit(check, *pairs[index])
+        
+        def on_done(index, future):
+            try:
+                problems = future.result()
+            except Exception as e:
+                problems = [f"unexpected error: {e}"]
+            if problems:
+                failures.append((pairs[index][0], problems))
+                if delete_bad:
+                    try:
+                        os.remove(pairs[index][1])
+                    except OSError as e:
+                        log(f"Could not remove {pairs[index][1]}: {e}", "warning")
+        
+        checked = run_task_window(executor, len(pairs), submit, on_done, workers * TASK_WINDOW_PER_WORKER, should_stop)
+    return checked, sorted(failures)
+
+# ============================================================================
+# LOAD-TIME BENCHMARK
+# ============================================================================
+
+def time_png_load(png_path):
+    """Seconds for the game's work on a PNG: read, decode to RGBA, build the mip chain and copy it out."""
+    import io
+    start = time.perf_counter()
+    with open(png_path, 'rb') as f:
+        data = f.read()
+    with PILImage.open(io.BytesIO(data)) as img:
+        level = img.convert('RGBA')
+    level.tobytes()
+    while level.width > 1 or level.height > 1:
+        level = level.resize((max(1, level.width // 2), max(1, level.height // 2)), PILImage.Resampling.BOX)
+        level.tobytes()
+    return time.perf_counter() - start
+
+def time_file_read(path):
+    """(seconds, parsed DDS header or None, bytes) to memory-map a file, parse a DDS header and copy the payload."""
+    import mmap
+    start = time.perf_counter()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        header = parse_dds_header(mapped)
+        payload = mapped[header['data_offset'] if header else 0:]  # Copy, as for the GPU upload
+    return time.perf_counter() - start, header, len(payload)
+
+def benchmark_texture(png_path, texture_info, enable_upscaling, rule=None, repeats=BENCHMARK_REPEATS):
+    """
+    Time loading one texture as PNG and as DDS, in seconds: {'png', 'dds', 'measured'}.
+    
+    Uses the existing DDS next to the PNG. Without one, a temporary file of the size the
+    conversion would produce is read instead ('measured' is False then).
+    """
+    rule = rule or {}
+    png_seconds = min(time_png_load(png_path) for _ in range(repeats))
+    dds_path = os.path.splitext(png_path)[0] + '.dds'
+    if os.path.exists(dds_path) and os.path.getsize(dds_path) > 0:
+        dds_seconds = min(time_file_read(dds_path)[0] for _ in range(repeats))
+        return {'png': png_seconds, 'dds': dds_seconds, 'measured': True}
+    
+    width, height = output_size(texture_info, enable_upscaling, rule)
+    dds_bytes = dds_size(width, height, rule.get('format'), rule.get('mipmaps'))
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix="rimconvert_bench_") as temp_dir:
+        stand_in = os.path.join(temp_dir, 'stand_in.dds')
+        with open(stand_in, 'wb') as f:
+            f.write(os.urandom(dds_bytes))
+        dds_seconds = min(time_file_read(stand_in)[0] for _ in range(repeats))
+    return {'png': png_seconds, 'dds': dds_seconds, 'measured': False}
+
+def benchmark_load_times(png_files, manifest, sample_per_mod=BENCHMARK_SAMPLE_PER_MOD, enable_upscaling=None,
+                         rules=None, log=_cli_log):
+    """
+    Sample textures from every mod and estimate the load time DDS saves per mod.
+    
+    Per-texture savings are scaled to the whole mod by pixel count. Returns
+    {mod name: row} where a row holds 'textures', 'sampled', 'measured' (sampled
+    textures with a DDS on disk), 'png' and 'dds' (sampled seconds) and 'png_total',
+    'dds_total' (estimated seconds for all of the mod's textures).
+    """
+    if _load_pillow() is None:
+        log("Pillow is required for the benchmark.", "error")
+        return None
+    enable_upscaling = ENABLE_UPSCALING if enable_upscaling is None else enable_upscaling
+    mods_path = manifest['mods_path']
+    by_mod = {}
+    for png_file in png_files:
+        by_mod.setdefault(os.path.relpath(png_file, mods_path).split(os.sep)[0], []).append(png_file)
+    
+    results = {}
+    for mod_name, mod_files in sorted(by_mod.items()):
+        row = {'textures': len(mod_files), 'sampled': 0, 'measured': 0, 'png': 0.0, 'dds': 0.0,
+               'png_total': 0.0, 'dds_total': 0.0}
+        mod_pixels = sum(info['width'] * info['height'] for info in
+                         (manifest_texture_info(manifest, png_file) for png_file in mod_files) if info)
+        sample_pixels = 0
+        sample = stratified_sample(mod_files, manifest, sample_per_mod)
+        for png_file in sample:
+            info = manifest_texture_info(manifest, png_file)
+            try:
+                timing = benchmark_texture(png_file, info, enable_upscaling,
+                                           rule_for_path(png_file, mods_path, rules))
+            except Exception as e:
+                log(f"Could not benchmark {os.path.basename(png_file)}: {e}", "warning")
+                continue
+            row['sampled'] += 1
+            row['measured'] += timing['measured']
+            row['png'] += timing['png']
+            row['dds'] += timing['dds']
+            sample_pixels += info['width'] * info['height']
+        if sample_pixels:
+            scale = mod_pixels / sample_pixels
+            row['png_total'], row['dds_total'] = row['png'] * scale, row['dds'] * scale
+        results[mod_name] = row
+        log(f"Benchmarked {row['sampled']} textures in {mod_name}", "info")
+    return results
+
+def format_benchmark(results):
+    """Lines of a per-mod table of estimated load-time savings (largest saving first)."""
+    def seconds(value):
+        return format_duration(value) if abs(value) >= 60 else f"{value:.2f}s"
+    
+    def line(name, row):
+        per_png = row['png'] / row['sampled'] * 1000 if row['sampled'] else 0.0
+        per_dds = row['dds'] / row['sampled'] * 1000 if row['sampled'] else 0.0
+        speedup = f"{row['png'] / row['dds']:.1f}x" if row['dds'] > 0 else "-"
+        saved = row['png_total'] - row['dds_total']
+        return (f"{name[:32]:<32} {row['textures']:>6} {row['sampled']:>7} {row['measured']:>5} "
+                f"{per_png:>9.2f} {per_dds:>9.2f} {speedup:>8} {seconds(row['png_total']):>9} "
+                f"{seconds(row['dds_total']):>9} {('+' if saved >= 0 else '') + seconds(saved):>10}")
+    
+    total = {key: sum(row[key] for row in results.values())
+             for key in ('textures', 'sampled', 'measured', 'png', 'dds', 'png_total', 'dds_total')}
+    lines = [f"{'Mod':<32} {'PNGs':>6} {'Sampled':>7} {'DDS':>5} {'PNG ms':>9} {'DDS ms':>9} {'Speedup':>8} "
+             f"{'PNG load':>9} {'DDS load':>9} {'Saved':>10}"]
+    lines.extend(line(name, row) for name, row in
+                 sorted(results.items(), key=lambda item: item[1]['png_total'] - item[1]['dds_total'], reverse=True))
+    lines.append("-" * len(lines[0]))
+    lines.append(line("Total", total))
+    lines.append("PNG/DDS ms are per sampled texture with warm file caches; PNG/DDS load are estimates for all of a mod's textures.")
+    if total['measured'] < total['sampled']:
+        lines.append(f"{total['sampled'] - total['measured']} sampled textures have no DDS yet; "
+                     f"their DDS read time is measured on a stand-in file of the expected size.")
+    return lines
+
+# ============================================================================
+# PROFILING (--profile)
+# ============================================================================
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes (None where it cannot be read)."""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class RunProfiler:
+    """
+    cProfile and tracemalloc for one conversion run.
+    
+    The main thread (discovery, scheduling, result handling, logging) and the worker threads
+    get separate cProfile profiles so Python overhead can be told apart from encoder time,
+    which shows up in the worker profile as time waiting in subprocess. tracemalloc
+    snapshots are taken at stage boundaries and every `every` files; each one lists the top
+    allocation sites and the growth since the previous snapshot.
+    """
+    
+    def __init__(self, every=PROFILE_SNAPSHOT_EVERY, base_dir=PROFILE_DIR):
+        import threading
+        self.every = max(1, int(every))
+        self.out_dir = os.path.join(base_dir, datetime.now().strftime('%Y%m%d_%H%M%S'))
+        self.main_profile = None
+        self.worker_profiles = []
+        self.worker_profiling = True
+        self.timeline = []  # (label, seconds since start, traced bytes, peak traced bytes)
+        self.previous = None
+        self.start_time = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def start(self, log=_cli_log):
+        import cProfile
+        import tracemalloc
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.start_time = time.perf_counter()
+        tracemalloc.start()
+        self.main_profile = cProfile.Profile()
+        self.main_profile.enable()
+        log(f"Profiling this run; reports go to {self.out_dir}", "info")
+    
+    def wrap(self, func):
+        """Wrap a worker task so its calls are profiled into a per-thread profile."""
+        import cProfile
+        
+        def profiled(*args, **kwargs):
+            profile = getattr(self._local, 'profile', None)
+            if profile is None and self.worker_profiling:
+                profile = self._local.profile = cProfile.Profile()
+                with self._lock:
+                    self.worker_profiles.append(profile)
+            if profile is None:
+                return func(*args, **kwargs)
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; it sees every thread,
+                # so worker calls end up in the main profile instead
+                self.worker_profiling = False
+                self._local.profile = None
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+        return profiled
+    
+    def maybe_snapshot(self, done_files, log=_cli_log):
+        """Take the periodic snapshot when done_files reaches a multiple of `every`."""
+        if done_files and done_files % self.every == 0:
+            self.snapshot(f"{done_files}_files", log)
+    
+    def snapshot(self, label, log=_cli_log):
+        """Write the top allocation sites (and growth since the last snapshot) to a report."""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return
+        if self.main_profile is not None:
+            self.main_profile.disable()  # Keep the snapshot work out of the profile
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        elapsed = time.perf_counter() - self.start_time
+        self.timeline.append((label, elapsed, current, peak))
+        
+        rss = _peak_rss()
+        lines = [f"Snapshot '{label}' at {elapsed:.1f}s",
+                 f"Traced Python memory: {format_bytes(current)} (peak {format_bytes(peak)})"]
+        if rss:
+            lines.append(f"Peak RSS: {format_bytes(rss)}")
+        lines += ["", "Top allocation sites:"]
+        lines += [f"  {stat}" for stat in snapshot.statistics('lineno')[:PROFILE_TOP_ENTRIES]]
+        if self.previous is not None:
+            lines += ["", "Growth since previous snapshot:"]
+            lines += [f"  {stat}" for stat in snapshot.compare_to(self.previous, 'lineno')[:PROFILE_TOP_ENTRIES]]
+        self.previous = snapshot
+        
+        report_path = os.path.join(self.out_dir, f"{len(self.timeline):02d}_{label}_memory.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        log(f"Profile snapshot '{label}': {format_bytes(current)} traced (peak {format_bytes(peak)})", "info")
+        if self.main_profile is not None:
+            self.main_profile.enable()
+    
+    def finish(self, log=_cli_log):
+        """Take the final snapshot, stop profiling and write the pstats files and summary."""
+        import io
+        import pstats
+        import tracemalloc
+        if self.main_profile is None:
+            return
+        self.snapshot("end", log)
+        self.main_profile.disable()
+        tracemalloc.stop()
+        
+        sections = []
+        profiles = [("main thread", "main.pstats", [self.main_profile])]
+        if self.worker_profiles:
+            profiles.append(("worker threads", "workers.pstats", self.worker_profiles))
+        encoder_seconds = None
+        for title, filename, group in profiles:
+            stats = pstats.Stats(*group)
+            stats.dump_stats(os.path.join(self.out_dir, filename))
+            if title == "worker threads" or not self.worker_profiling:
+                encoder_seconds = sum(entry[3] for func, entry in stats.stats.items()
+                                      if func[0].endswith('subprocess.py') and func[2] == 'run')
+            for sort_key in ('cumulative', 'tottime'):
+                out = io.StringIO()
+                stats.stream = out
+                stats.sort_stats(sort_key).print_stats(PROFILE_TOP_ENTRIES)
+                sections.append(f"===== {title}, sorted by {sort_key} =====\n{out.getvalue()}")
+        
+        lines = [f"Profile of run started {self.out_dir[-15:]}", "", "Stages (seconds, traced memory, peak):"]
+        lines += [f"  {label:<20} {elapsed:>9.1f}s {format_bytes(current):>10} {format_bytes(peak):>10}"
+                  for label, elapsed, current, peak in self.timeline]
+        if encoder_seconds is not None:
+            lines += ["", f"Time waiting for texconv (subprocess.run, summed over workers): {encoder_seconds:.1f}s"]
+        if not self.worker_profiling:
+            lines.append("Worker threads are included in the main thread profile (one profiler per process).")
+        with open(os.path.join(self.out_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n\n" + "\n".join(sections))
+        self.main_profile = None
+        log(f"Profile reports written to {self.out_dir}", "success")
+
+# ============================================================================
+# TASK TABLE (COMPACT PER-FILE RECORDS)
+# ============================================================================
+
+# Task status codes (TaskTable.status); the names match the run journal statuses
+TASK_PENDING, TASK_CONVERTED, TASK_SKIPPED, TASK_ERROR, TASK_CANCELLED = range(5)
+TASK_STATUS_NAMES = ('pending', 'converted', 'skipped', 'error', 'cancelled')
+
+TASK_FLAG_ALPHA = 1
+TASK_FLAG_PROBED = 2  # Header was read; width/height/alpha are valid
+TASK_FLAG_BUDGET = 4  # Target is the VRAM budget size, not an upscale
+
+class TaskTable:
+    """
+    Per-file records of a conversion run, stored as typed array columns.
+    
+    Directories are interned once, file names are packed into one string, and size,
+    dimensions, upscale target (or VRAM budget size), flags and status live in arrays indexed by task number.
+    A task costs about 35 bytes plus its file name instead of a dict of texture info,
+    a Future and a result dict per file, so 500k files fit as easily as 10k. Path-rule
+    settings are stored as a PathRules profile number.
+    """
+    __slots__ = ('dirs', 'dir_index', 'names', 'name_ends', 'sizes', 'widths', 'heights',
+                 'target_widths', 'target_heights', 'flags', 'rule_profiles', 'rules', 'status', 'counts')
+    
+    def __init__(self, png_files, manifest, rules=None):
+        self.rules = PATH_RULES if rules is None else rules
+        mods_path = manifest.get('mods_path', '')
+        files = manifest.get('files', {})
+        decisions = manifest.get('upscale_decisions', {})
+        budget_sizes = manifest.get('budget_sizes', {})
+        dir_ids = {}
+        self.dirs = []
+        self.dir_index = array('I')
+        self.name_ends = array('I')
+        self.sizes = array('Q')
+        self.widths, self.heights = array('I'), array('I')
+        self.target_widths, self.target_heights = array('I'), array('I')
+        self.flags = array('B')
+        self.rule_profiles = array('H')
+        names = []
+        name_length = 0
+        for png_path in png_files:
+            directory, name = os.path.split(png_path)
+            dir_id = dir_ids.get(directory)
+            if dir_id is None:
+                dir_id = dir_ids[directory] = len(self.dirs)
+                self.dirs.append(directory)
+            self.dir_index.append(dir_id)
+            names.append(name)
+            name_length += len(name)
+            self.name_ends.append(name_length)
+            
+            rel_path = os.path.relpath(png_path, mods_path)
+            entry = files.get(rel_path)
+            width, height = (entry[2], entry[3]) if entry else (0, 0)
+            target = decisions.get(f"{width}x{height}") if width and height else None
+            profile = self.rules.profile_id(rel_path.replace(os.sep, '/').split('/', 1)[-1]) if self.rules else 0
+            self.rule_profiles.append(profile)
+            if profile and self.rules.profiles[profile].get('upscale') is False:
+                target = None
+            budget_size = budget_sizes.get(rel_path)
+            if budget_size:
+                target = budget_size
+            self.sizes.append(entry[0] if entry else 0)
+            self.widths.append(width)
+            self.heights.append(height)
+            self.target_widths.append(target[0] if target else 0)
+            self.target_heights.append(target[1] if target else 0)
+            self.flags.append((TASK_FLAG_PROBED if width and height else 0) |
+                              (TASK_FLAG_ALPHA if entry and entry[4] else 0) |
+                              (TASK_FLAG_BUDGET if budget_size else 0))
+        self.names = ''.join(names)
+        self.status = array('B', bytes(len(self.dir_index)))
+        self.counts = [0] * len(TASK_STATUS_NAMES)
+        self.counts[TASK_PENDING] = len(self.dir_index)
+    
+    def __len__(self):
+        return len(self.dir_index)
+    
+    def path(self, index):
+        start = self.name_ends[index - 1] if index else 0
+        return os.path.join(self.dirs[self.dir_index[index]], self.names[start:self.name_ends[index]])
+    
+    def texture_info(self, index):
+        """Same dict as manifest_texture_info, built on demand (None if the header was not read)."""
+        if not self.flags[index] & TASK_FLAG_PROBED:
+            return None
+        target = (self.target_widths[index], self.target_heights[index]) if self.target_widths[index] else None
+        budget = bool(self.flags[index] & TASK_FLAG_BUDGET)
+        return {
+            'width': self.widths[index],
+            'height': self.heights[index],
+            'has_alpha': bool(self.flags[index] & TASK_FLAG_ALPHA),
+            'upscale_to': None if budget else target,
+            'budget_size': target if budget else None,
+        }
+    
+    def rule(self, index):
+        """Path-rule settings of a task ({} when no rule applies)."""
+        profile = self.rule_profiles[index]
+        return self.rules.profiles[profile] if profile else {}
+    
+    def planned_pixels(self, index, enable_upscaling):
+        if self.target_widths[index] and (enable_upscaling or self.flags[index] & TASK_FLAG_BUDGET):
+            return self.target_widths[index] * self.target_heights[index]
+        return self.widths[index] * self.heights[index]
+    
+    def total_bytes(self):
+        return sum(self.sizes)
+    
+    def mark(self, index, status):
+        """Set a task's final status and update the per-status counters."""
+        self.counts[self.status[index]] -= 1
+        self.counts[status] += 1
+        self.status[index] = status
+
+def run_task_window(executor, count, submit, on_done, window, should_stop=None):
+    """
+    Run tasks 0..count-1 with at most `window` of them submitted at a time.
+    
+    submit(index) returns a Future and on_done(index, future) is called in completion
+    order. Only the futures in the window exist at any moment. Once should_stop()
+    returns True no more tasks are submitted and the ones in flight are drained.
+    Returns the number of tasks that finished.
+    """
+    import concurrent.futures
+    
+    in_flight = {}
+    next_index = finished = 0
+    while True:
+        while next_index < count and len(in_flight) < window and not (should_stop and should_stop()):
+            in_flight[submit(next_index)] = next_index
+            next_index += 1
+        if not in_flight:
+            return finished
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            on_done(in_flight.pop(future), future)
+            finished += 1
+
+# ============================================================================
+# READ-AHEAD
+# ============================================================================
+
+def locality_order(png_files):
+    """
+    png_files in disk order as far as the file system tells: folder by folder, each folder
+    sorted by file number (inode, or the NTFS file index), and the folders by their lowest
+    file number. Files are mostly laid out in the order they were written, so on a hard disk
+    this turns scattered seeks into short forward reads.
+    """
+    by_dir = {}
+    for png_path in png_files:
+        by_dir.setdefault(os.path.dirname(png_path), []).append(png_path)
+    folders = []
+    for directory, paths in by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                numbers = {entry.name: entry.inode() for entry in entries}
+        except OSError:
+            numbers = {}
+        keyed = sorted((numbers.get(os.path.basename(path), sys.maxsize), path) for path in paths)
+        folders.append((keyed[0][0], directory, [path for _, path in keyed]))
+    return [path for _, _, paths in sorted(folders) for path in paths]
+
+def dds_is_current(png_path):
+    """Whether the PNG's DDS exists and is newer (the file will be skipped)."""
+    try:
+        return os.path.getmtime(os.path.splitext(png_path)[0] + '.dds') > os.path.getmtime(png_path)
+    except OSError:
+        return False
+
+class ReadAhead:
+    """
+    Reads the source PNGs of a run into memory ahead of the workers.
+    
+    One background thread reads the files in task order (one file at a time, so a hard disk
+    reads sequentially instead of seeking between workers) and keeps at most budget bytes
+    that no worker has taken yet. take() hands a file's bytes to its worker, waiting if the
+    file is being read; a file the reader has not reached yet is left to the worker. Files
+    whose DDS is up to date are not read.
+    """
+    
+    def __init__(self, paths, budget):
+        self.paths = paths
+        self.budget = budget
+        self._cond = threading.Condition()
+        self._ready = {}  # path -> bytes not taken yet
+        self._ready_bytes = 0
+        self._reading = None
+        self._claimed = set()  # Taken or released before the reader got there
+        self._stopped = False
+        self._thread = None
+        self.hits = self.misses = 0
+        self.read_bytes = 0
+        self.read_seconds = 0.0
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="read-ahead", daemon=True)
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        for path in self.paths:
+            if dds_is_current(path):
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            with self._cond:
+                while not self._stopped and self._ready and self._ready_bytes + size > self.budget:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                if path in self._claimed:
+                    self._claimed.discard(path)
+                    continue
+                self._reading = path
+            start = time.perf_counter()
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None  # The worker reads it and reports the error
+            with self._cond:
+                self.read_seconds += time.perf_counter() - start
+                self._reading = None
+                if data is not None and path not in self._claimed:
+                    self._ready[path] = data
+                    self._ready_bytes += len(data)
+                    self.read_bytes += len(data)
+                self._claimed.discard(path)
+                self._cond.notify_all()
+    
+    def take(self, path):
+        """The bytes of path if they were read ahead (waiting for a read in progress), else None."""
+        with self._cond:
+            while self._reading == path:
+                self._cond.wait()
+            data = self._ready.pop(path, None)
+            if data is None:
+                self._claimed.add(path)
+                self.misses += 1
+                return None
+            self._ready_bytes -= len(data)
+            self.hits += 1
+            self._cond.notify_all()
+            return data
+    
+    def release(self, path):
+        """A file failed before its worker took it: drop it (or never read it) so it does not hold the budget."""
+        with self._cond:
+            data = self._ready.pop(path, None)
+            if data is None:
+                self._claimed.add(path)
+            else:
+                self._ready_bytes -= len(data)
+                self._cond.notify_all()
+    
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._ready.clear()
+            self._ready_bytes = 0
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def summary(self):
+        """One line for the run report."""
+        return (f"{self.hits} files ({format_bytes(self.read_bytes)}) read ahead, {self.misses} read by the workers, "
+                f"read thread busy {self.read_seconds:.1f}s")
+
+READ_AHEAD = None  # ReadAhead of the running conversion (set by convert and the GUI worker)
+
+def start_read_ahead(paths):
+    """Start reading paths ahead of the workers (PREFETCH_MB budget); returns the ReadAhead or None."""
+    global READ_AHEAD
+    READ_AHEAD = ReadAhead(paths, PREFETCH_MB * 1024 * 1024).start() if PREFETCH_MB else None
+    return READ_AHEAD
+
+def stop_read_ahead():
+    global READ_AHEAD
+    if READ_AHEAD is not None:
+        READ_AHEAD.close()
+    READ_AHEAD = None
+
+def read_source(png_path):
+    """The bytes of a source PNG, from the read-ahead when it has them."""
+    data = READ_AHEAD.take(png_path) if READ_AHEAD is not None else None
+    if data is None:
+        with open(png_path, 'rb') as f:
+            data = f.read()
+    return data
+
+def io_cpu_line(stage_seconds):
+    """'workers waited X s on reads, used Y s of CPU' for the run report, or None."""
+    if 'read wait' not in stage_seconds:
+        return None
+    return (f"workers waited {stage_seconds['read wait']:.2f}s on reads and used {stage_seconds.get('cpu', 0.0):.2f}s "
+            f"of CPU themselves (encoders run as separate programs)")
+
+# ============================================================================
+# WORKER FUNCTION FOR PARALLEL PROCESSING
+# ============================================================================
+
+def _process_file_task(png_path, enable_gpu_cli_arg, texture_info=None, rule=None):
+    """Processes a single PNG file: upscale, convert to DDS (GPU/CPU), skip logic.
+    
+    texture_info is the file's manifest entry (see manifest_texture_info); without it
+    the header is probed and the upscaling policy evaluated here. rule is the file's
+    path-rule settings (looked up here when None).
+    """
+    file_stats = {
+        'converted': 0, 'upscaled': 0, 'skipped': 0, 'errors': 0,
+        'gpu_conversions': 0, 'cpu_conversions': 0, 'verify_failed': 0,
+        'seconds': 0.0, 'stage_seconds': {}
+    }
+    texture = None  # Decoded, upscaled and flipped pixels shared by the encoders
+    source_read = False
+    task_start = time.perf_counter()
+    cpu_start = time.thread_time()
+
+    try:
+        # Generate DDS path (same location, different extension)
         dds_path = os.path.splitext(png_path)[0] + '.dds'
         
         # Skip if DDS already exists and is newer than PNG
@@ -355,7 +3865,8 @@ def _process_file_task(png_path, enable_gpu_cli_arg):
             try:
                 png_mtime = os.path.getmtime(png_path)
                 dds_mtime = os.path.getmtime(dds_path)
-                if dds_mtime > png_mtime:
+                resized = VRAM_BUDGET_MB and texture_info and dds_outdated_by_budget(dds_path, texture_info, ENABLE_UPSCALING, rule)
+                if dds_mtime > png_mtime and not resized:
                     print_info(f"Skipping (DDS newer): {os.path.basename(png_path)}")
                     file_stats['skipped'] = 1
                     return file_stats
@@ -366,82 +3877,820 @@ def _process_file_task(png_path, enable_gpu_cli_arg):
                 print_warning(f"Error checking mtime for {png_path} or {dds_path}: {e}. Will attempt processing.")
 
         # Get image information
-        img_info = get_image_info(png_path)
+        img_info = texture_info or probe_png_header(png_path) or get_image_info(png_path)
         if not img_info:
             file_stats['errors'] = 1
             return file_stats
         
-        current_path = png_path
+        if 'upscale_to' in img_info:
+            upscale_to = img_info['upscale_to']
+        else:
+            upscale_to = choose_upscale_target(img_info['width'], img_info['height'])
+        rule = rule_for_path(png_path) if rule is None else rule
         
-        if ENABLE_UPSCALING and needs_upscaling(img_info['width'], img_info['height']):
-            # Calculate new dimensions (2x original size)
-            new_width = img_info['width'] * 2
-            new_height = img_info['height'] * 2
-            
-            # Ensure dimensions are at least 1 (though 2x should prevent this unless original was 0)
-            new_width = max(1, new_width)
-            new_height = max(1, new_height)
-
-            # Create temporary upscaled image path
-            # Using a more unique temp name to avoid potential collisions in rapid parallel processing
-            temp_filename = f"temp_upscaled_{os.path.splitext(os.path.basename(png_path))[0]}_{int(time.time()*1000)}_{os.urandom(4).hex()}.png"
-            temp_path = os.path.join(os.path.dirname(png_path), temp_filename)
-            
-            print_info(f"Upscaling {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to {new_width}x{new_height}")
-            
-            if upscale_image(png_path, temp_path, new_width, new_height):
-                current_path = temp_path
-                file_stats['upscaled'] = 1
-            else:
-                # Upscaling failed, error already printed by upscale_image
+        budget_size = img_info.get('budget_size')
+        upscale = not budget_size and ENABLE_UPSCALING and upscale_to and rule.get('upscale') is not False
+        resize_to = tuple(budget_size or upscale_to) if budget_size or upscale else None
+        if resize_to == (img_info['width'], img_info['height']):
+            resize_to = None  # The VRAM budget only dropped the upscale
+        if upscale:
+            print_info(f"Upscaling {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to {upscale_to[0]}x{upscale_to[1]}")
+        elif resize_to:
+            print_info(f"Reducing {os.path.basename(png_path)} from {img_info['width']}x{img_info['height']} to "
+                       f"{resize_to[0]}x{resize_to[1]} for the VRAM budget")
+        
+        # Decode once; the upscale and the pre-flip happen in memory and every encoder gets these pixels
+        if _load_pillow() is not None:
+            stage_start = time.perf_counter()
+            try:
+                data = read_source(png_path)
+                source_read = True
+                file_stats['stage_seconds']['read wait'] = time.perf_counter() - stage_start
+                stage_start = time.perf_counter()
+                texture = prepare_encoder_input(png_path, resize_to, data)
+                del data
+            except Exception as e:
+                print_error(f"Failed to {'resize' if resize_to else 'read'} image {png_path}: {e}")
                 file_stats['errors'] = 1
-                return file_stats # Don't proceed if upscaling failed
+                return file_stats
+            file_stats['stage_seconds']['prepare'] = time.perf_counter() - stage_start
+            file_stats['upscaled'] = 1 if upscale else 0
+        elif resize_to:
+            print_error(f"Pillow not available, cannot resize {png_path}")
+            file_stats['errors'] = 1
+            return file_stats # Don't proceed if upscaling failed
         
-        # Convert to DDS
+        # Convert to DDS, trying the run's encoders in order until one succeeds
         conversion_successful = False
+        stage_start = time.perf_counter()
         
-        if enable_gpu_cli_arg:
-            # Try GPU conversion
-            if convert_png_to_dds(current_path, dds_path, img_info['has_alpha'], use_gpu=True):
+        width, height = resize_to or (img_info['width'], img_info['height'])
+        candidates = (BACKEND_CHOICE or BackendChoice(enable_gpu_cli_arg)).candidates(width * height, rule.get('format'))
+        for index, backend in enumerate(candidates):
+            if convert_png_to_dds(png_path, dds_path, img_info['has_alpha'], compression_format=rule.get('format'),
+                                  mipmaps=rule.get('mipmaps'), backend=backend, texture=texture):
                 conversion_successful = True
-                file_stats['gpu_conversions'] = 1
-            else:
-                # GPU conversion failed, texconv.exe already printed error
-                print_warning(f"GPU conversion failed for {os.path.basename(current_path)}. Trying CPU.")
+                file_stats[f"{backend.lane}_conversions"] = 1
+                break
+            if index + 1 < len(candidates):
+                print_warning(f"{backend.name} failed for {os.path.basename(png_path)}. Trying {candidates[index + 1].name}.")
         
         if not conversion_successful:
-            # Try CPU conversion (either GPU not enabled, or GPU failed)
-            if convert_png_to_dds(current_path, dds_path, img_info['has_alpha'], use_gpu=False):
-                conversion_successful = True
-                file_stats['cpu_conversions'] = 1
-            else:
-                # CPU conversion also failed, error already printed by convert_png_to_dds
-                print_error(f"CPU conversion also failed for {os.path.basename(current_path)}. Skipping this file.")
+            # Error already printed by convert_png_to_dds
+            print_error(f"No encoder could convert {os.path.basename(png_path)}. Skipping this file.")
+            file_stats['errors'] = 1
+        
+        file_stats['stage_seconds']['encode'] = time.perf_counter() - stage_start
+        if conversion_successful and VERIFY_OUTPUT:
+            # Post-encode check (convert --verify); a bad DDS is removed so the PNG stays in use
+            stage_start = time.perf_counter()
+            conversion_successful = verify_converted_texture(png_path, dds_path, {**img_info, 'upscale_to': upscale_to},
+                                                             ENABLE_UPSCALING, rule)
+            file_stats['stage_seconds']['verify'] = time.perf_counter() - stage_start
+            if not conversion_successful:
+                file_stats['verify_failed'] = 1
                 file_stats['errors'] = 1
+        if conversion_successful:
+            file_stats['converted'] = 1
+            
+        return file_stats
+
+    except Exception as e:
+        print_error(f"Unexpected error processing {os.path.basename(png_path)}: {e}")
+        file_stats['errors'] = 1
+        return file_stats
+    finally:
+        if texture is not None:
+            try:
+                texture.close()
+            except Exception as e_remove:
+                print_warning(f"Could not remove temporary file of {png_path}: {e_remove}")
+        if READ_AHEAD is not None and not source_read and not file_stats['skipped']:
+            READ_AHEAD.release(png_path)  # Skipped files are not read ahead in the first place
+        file_stats['stage_seconds']['cpu'] = time.thread_time() - cpu_start
+        file_stats['seconds'] = time.perf_counter() - task_start
+
+# ============================================================================
+# MAIN CONVERSION LOGIC
+# ============================================================================
+
+# ============================================================================
+# DISCOVERY (LOADFOLDERS.XML AND VERSION FOLDERS)
+# ============================================================================
+
+VERSION_FOLDER_RE = re.compile(r'^v?(\d+)\.(\d+)$', re.IGNORECASE)
+
+def _parse_version(name):
+    """(major, minor) for '1.5' or 'v1.5', else None."""
+    match = VERSION_FOLDER_RE.match(name.strip())
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def _find_child_dir(parent, name):
+    """Path of parent/name, matching the folder name case-insensitively (None if missing)."""
+    exact = os.path.join(parent, name)
+    if os.path.isdir(exact):
+        return exact
+    try:
+        for entry in os.scandir(parent):
+            if entry.is_dir() and entry.name.lower() == name.lower():
+                return entry.path
+    except OSError:
+        pass
+    return None
+
+def _find_child_file(parent, name):
+    """Path of parent/name, matching the file name case-insensitively (None if missing)."""
+    exact = os.path.join(parent, name)
+    if os.path.isfile(exact):
+        return exact
+    try:
+        for entry in os.scandir(parent):
+            if entry.is_file() and entry.name.lower() == name.lower():
+                return entry.path
+    except OSError:
+        pass
+    return None
+
+def parse_load_folders(xml_path, game_version):
+    """
+    Folders listed in a mod's LoadFolders.xml for game_version.
+    
+    Uses the entry for the exact version, or else the newest listed version below it,
+    or else the <default> entry, as RimWorld does. Returns None if none of these exists
+    (the default rules apply).
+    Entries with IfModActive/IfModNotActive conditions are kept, since the active mod
+    list is not known here.
+    """
+    import xml.etree.ElementTree as ET
+    root = ET.parse(xml_path).getroot()
+    target = _parse_version(game_version)
+    best_version, best_element = None, None
+    for element in root:
+        version = _parse_version(element.tag)
+        if version is None or (target and version > target):
+            continue
+        if best_version is None or version > best_version:
+            best_version, best_element = version, element
+    if best_element is None:
+        best_element = root.find('default')
+    if best_element is None:
+        return None
+    return [(li.text or '').strip().strip('/\\') for li in best_element.findall('li')]
+
+def default_load_folders(mod_path, game_version):
+    """Folders RimWorld loads without LoadFolders.xml: the version folder (exact or newest older), Common, root."""
+    target = _parse_version(game_version)
+    best_version, best_folder = None, None
+    try:
+        for entry in os.scandir(mod_path):
+            version = _parse_version(entry.name) if entry.is_dir() else None
+            if version is None or (target and version > target):
+                continue
+            if best_version is None or version > best_version:
+                best_version, best_folder = version, entry.name
+    except OSError:
+        pass
+    return ([best_folder] if best_folder else []) + ['Common', '']
+
+def mod_load_folders(mod_path, game_version, log=_cli_log):
+    """Absolute folders RimWorld loads for a mod and game_version (existing ones only, no duplicates)."""
+    folders = None
+    xml_path = _find_child_file(mod_path, 'LoadFolders.xml')
+    if xml_path:
+        try:
+            folders = parse_load_folders(xml_path, game_version)
+        except Exception as e:
+            log(f"Could not parse {xml_path}: {e}. Using default load folders.", "warning")
+    if folders is None:
+        folders = default_load_folders(mod_path, game_version)
+    
+    resolved = []
+    for folder in folders:
+        path = os.path.normpath(os.path.join(mod_path, folder)) if folder else mod_path
+        if os.path.isdir(path) and path not in resolved:
+            resolved.append(path)
+    return resolved
+
+def iter_mod_textures(mod_path, mode=None, game_version=None, log=_cli_log, rules=None):
+    """Yield the PNG files to process in one mod folder, according to the discovery mode and path rules."""
+    mode = mode or DISCOVERY_MODE
+    rules = PATH_RULES if rules is None else rules
+    if mode == 'loadfolders':
+        roots = []
+        for folder in mod_load_folders(mod_path, game_version or GAME_VERSION, log):
+            textures = _find_child_dir(folder, 'Textures')
+            if textures and textures not in roots:
+                roots.append(textures)
+    else:
+        roots = [mod_path]
+    
+    for top in roots:
+        for root, dirs, files in os.walk(top):
+            # Skip certain directories
+            if mode != 'loadfolders':
+                dirs[:] = [d for d in dirs if not should_skip_folder(os.path.join(root, d))]
+            
+            for file in files:
+                if file.lower().endswith('.png'):
+                    file_path = os.path.join(root, file)
+                    if should_skip_file(file_path):
+                        continue
+                    if rules and rules.excluded(os.path.relpath(file_path, mod_path).replace(os.sep, '/')):
+                        continue
+                    yield file_path
+
+def list_mod_folders(mods_path, mods=None, log=_cli_log):
+    """[(folder name, path)] of the mod folders to process, sorted; only the names in mods when given."""
+    wanted = None if mods is None else set(mods)
+    folders = []
+    for mod_folder in sorted(os.listdir(mods_path)):
+        if wanted is not None and mod_folder not in wanted:
+            continue
+        mod_path = os.path.join(mods_path, mod_folder)
+        if os.path.isdir(mod_path) and not should_skip_folder(mod_path):
+            folders.append((mod_folder, mod_path))
+    for missing in sorted((wanted or set()) - {name for name, _ in folders}):
+        log(f"Mod folder not found: {missing}", "warning")
+    return folders
+
+def iter_restorable_dds(mod_path):
+    """
+    (DDS path, has a PNG companion) for every DDS anywhere in a mod. No folder is skipped:
+    conversion also writes into Common/ and the version folders the game loads.
+    """
+    for root, _dirs, files in os.walk(mod_path):
+        names = {name.lower() for name in files}
+        for file in files:
+            stem, ext = os.path.splitext(file)
+            if ext.lower() == '.dds':
+                yield os.path.join(root, file), (stem + '.png').lower() in names
+
+def mod_display_name(mod_path):
+    """The mod's name from About/About.xml (the folder name if there is none)."""
+    about = _find_child_dir(mod_path, 'About')
+    xml_path = about and os.path.join(about, 'About.xml')
+    if xml_path and os.path.exists(xml_path):
+        import xml.etree.ElementTree as ET
+        try:
+            name = ET.parse(xml_path).getroot().findtext('name')
+        except (ET.ParseError, OSError):
+            name = None
+        if name and name.strip():
+            return name.strip()
+    return os.path.basename(mod_path)
+
+def discover_png_files(mods_path, mode=None, game_version=None, log=_cli_log, rules=None, mods=None):
+    """
+    Find all PNG files to process in each mod folder (only the folders named in mods when
+    given; the other mods are not walked). Returns (png_files, mod_count).
+    """
+    mode = mode or DISCOVERY_MODE
+    game_version = game_version or GAME_VERSION
+    if mode == 'loadfolders':
+        log(f"Discovering textures RimWorld {game_version} loads (LoadFolders.xml / version folders)", "info")
+    png_files = []
+    mod_count = 0
+    for mod_folder, mod_path in list_mod_folders(mods_path, mods, log):
+        mod_count += 1
+        
+        num_files_before = len(png_files)
+        png_files.extend(iter_mod_textures(mod_path, mode, game_version, log, rules))
+        
+        num_files_in_mod = len(png_files) - num_files_before
+        if num_files_in_mod:
+            log(f"Found {num_files_in_mod} PNGs in {mod_folder}", "info")
+        else:
+            log(f"No PNG files to process in mod: {mod_folder}", "info")
+    return png_files, mod_count
+
+def select_png_files(paths, mods_path, log=_cli_log):
+    """
+    PNG files of an explicit file list (e.g. the textures a mod update touched) instead of a
+    discovery walk; files outside the mods folder are left out. Returns (png_files, mod_count).
+    """
+    mods_path = os.path.abspath(mods_path)
+    png_files = []
+    mods = set()
+    for path in paths:
+        path = os.path.abspath(path)
+        parts = os.path.relpath(path, mods_path).split(os.sep)
+        if len(parts) < 2 or parts[0] == '..':
+            log(f"Not inside the mods folder, skipped: {path}", "warning")
+        elif not path.lower().endswith('.png') or is_temp_file(path) or not os.path.isfile(path):
+            log(f"Not a PNG texture, skipped: {path}", "warning")
+        else:
+            png_files.append(path)
+            mods.add(parts[0])
+    log(f"Converting {len(png_files)} listed PNGs in {len(mods)} mods", "info")
+    return png_files, len(mods)
+
+# ============================================================================
+# WATCH MODE
+# ============================================================================
+
+class TextureFilter:
+    """Decides whether a PNG path is one discovery would pick, without rescanning the tree."""
+    
+    def __init__(self, mods_path, mode=None, game_version=None, log=_cli_log, rules=None):
+        self.mods_path = os.path.abspath(mods_path)
+        self.mode = mode or DISCOVERY_MODE
+        self.game_version = game_version or GAME_VERSION
+        self.rules = PATH_RULES if rules is None else rules
+        self.log = log
+        self._texture_roots = {}  # mod path -> Textures folders the game loads
+    
+    def mod_path_of(self, path):
+        """Mod folder containing path (None if path is not inside a mod)."""
+        parts = os.path.relpath(path, self.mods_path).split(os.sep)
+        if len(parts) < 2 or parts[0] == '..':
+            return None
+        return os.path.join(self.mods_path, parts[0])
+    
+    def invalidate(self, mod_path):
+        """Forget cached load folders of a mod (its LoadFolders.xml or version folders changed)."""
+        self._texture_roots.pop(mod_path, None)
+    
+    def accepts(self, png_path):
+        mod_path = self.mod_path_of(png_path)
+        if mod_path is None or should_skip_folder(mod_path) or should_skip_file(png_path):
+            return False
+        if self.rules and self.rules.excluded(mod_relative_path(png_path, self.mods_path)):
+            return False
+        if self.mode != 'loadfolders':
+            parts = os.path.relpath(png_path, mod_path).split(os.sep)[:-1]
+            return not any(part in SKIP_FOLDERS for part in parts)
+        
+        roots = self._texture_roots.get(mod_path)
+        if roots is None:
+            roots = []
+            for folder in mod_load_folders(mod_path, self.game_version, self.log):
+                textures = _find_child_dir(folder, 'Textures')
+                if textures:
+                    roots.append(textures)
+            self._texture_roots[mod_path] = roots
+        return any(png_path.startswith(root + os.sep) for root in roots)
+
+class PollingWatcher:
+    """Detects PNG and LoadFolders.xml changes by comparing (size, mtime) snapshots of the tree."""
+    
+    def __init__(self, root, interval=WATCH_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.time() + interval
+    
+    def _scan(self):
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(('.png', 'loadfolders.xml')):
+                        st = entry.stat()
+                        snapshot[entry.path] = (st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+        return snapshot
+    
+    def read_events(self, timeout):
+        """List of (path, kind) with kind 'changed' or 'deleted'; waits up to timeout."""
+        wait = self.next_scan - time.time()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            if time.time() < self.next_scan:
+                return []
+        current = self._scan()
+        self.next_scan = time.time() + self.interval
+        events = [(path, 'changed') for path, meta in current.items() if self.snapshot.get(path) != meta]
+        events.extend((path, 'deleted') for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return events
+    
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher over the whole tree (ctypes, no extra dependency).
+    
+    The PNGs of every watched folder are remembered, so a folder that is deleted or moved
+    out reports each of its PNGs as deleted (a move sends a single event for the folder).
+    """
+    
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    
+    def __init__(self, root):
+        import ctypes
+        import ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.ctypes = ctypes
+        self.dirs = {}  # watch descriptor -> directory
+        self.pngs = {}  # directory -> names of the PNGs in it
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+    
+    def _add_tree(self, top):
+        """Watch top and every directory below it; returns PNG files already inside (created before the watch)."""
+        existing = []
+        for root, dirs, files in os.walk(top):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), self.WATCH_MASK)
+            if wd < 0:
+                errno = self.ctypes.get_errno()
+                raise OSError(errno, f"inotify_add_watch failed for {root} (watch limit reached?)")
+            self.dirs[wd] = root
+            self.pngs[root] = {f for f in files if f.lower().endswith('.png')}
+            existing.extend(os.path.join(root, f) for f in self.pngs[root])
+        return existing
+    
+    def _drop_tree(self, top):
+        """Stop watching top and the directories below it; returns the PNGs they held."""
+        removed = []
+        for wd, directory in list(self.dirs.items()):
+            if directory == top or directory.startswith(top + os.sep):
+                self.libc.inotify_rm_watch(self.fd, wd)  # Fails harmlessly if the kernel already dropped it
+                del self.dirs[wd]
+        for directory in [d for d in self.pngs if d == top or d.startswith(top + os.sep)]:
+            removed.extend(os.path.join(directory, name) for name in self.pngs.pop(directory))
+        return removed
+    
+    def read_events(self, timeout):
+        """List of (path, kind) with kind 'changed' or 'deleted', or None if the queue overflowed."""
+        import select
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _cookie, name_len = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + name_len].split(b'\0', 1)[0]
+            offset += 16 + name_len
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_IGNORED):
+                # The folder is gone (or its watch was removed): its PNGs went with it
+                events.extend((png, 'deleted') for png in self._drop_tree(directory))
+                continue
+            if not name:
+                continue
+            name = os.fsdecode(name)
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        events.extend((png, 'changed') for png in self._add_tree(path))
+                    except OSError:
+                        return None
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    # A folder moved out keeps its watches (under a path we no longer know); drop them
+                    events.extend((png, 'deleted') for png in self._drop_tree(path))
+                    events.append((path, 'deleted_dir'))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                if name.lower().endswith('.png'):
+                    self.pngs.setdefault(directory, set()).add(name)
+                events.append((path, 'changed'))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                self.pngs.get(directory, set()).discard(name)
+                events.append((path, 'deleted'))
+        return events
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def create_watcher(root, poll_interval=WATCH_POLL_INTERVAL, log=_cli_log):
+    """inotify watcher on Linux, polling watcher elsewhere or when inotify is unavailable."""
+    if sys.platform.startswith('linux'):
+        try:
+            watcher = InotifyWatcher(root)
+            log(f"Watching {len(watcher.dirs)} folders with inotify", "info")
+            return watcher
+        except (OSError, AttributeError) as e:
+            log(f"inotify unavailable ({e}); falling back to polling every {poll_interval:.0f}s", "warning")
+    else:
+        log(f"Watching by polling every {poll_interval:.0f}s", "info")
+    return PollingWatcher(root, poll_interval)
+
+def remove_orphaned_dds(png_path, written, log=_cli_log):
+    """
+    Delete the DDS next to a PNG that no longer exists, if this tool wrote it (see WrittenDds).
+    Returns True if one was removed.
+    """
+    dds_path = os.path.splitext(png_path)[0] + '.dds'
+    if os.path.exists(png_path) or not os.path.exists(dds_path):
+        return False
+    if not written.owns(dds_path):
+        log(f"Kept {os.path.basename(dds_path)}: its PNG is gone, but the DDS was not written by this tool", "info")
+        return False
+    try:
+        os.remove(dds_path)
+        written.forget(dds_path)
+        log(f"Removed orphaned DDS: {os.path.basename(dds_path)}", "info")
+        return True
+    except OSError as e:
+        log(f"Could not remove orphaned DDS {dds_path}: {e}", "warning")
+        return False
+
+def watch_mods(mods_path, process_file, mode=None, game_version=None, debounce=WATCH_DEBOUNCE_SECONDS,
+               poll_interval=WATCH_POLL_INTERVAL, workers=None, initial_sync=True, should_stop=None, log=_cli_log,
+               rules=None):
+    """
+    Keep the DDS tree current: convert new or changed PNGs and remove the DDS files this tool
+    wrote for PNGs that were deleted.
+    
+    process_file(png_path) converts one PNG and returns 'converted', 'skipped' or 'error'.
+    Changes are collected until the tree has been quiet for `debounce` seconds (at most
+    WATCH_MAX_BATCH_DELAY), then converted as one batch on a pool that stays warm for the
+    whole session. Only PNGs that discovery would pick (including path rules) are converted. Runs until
+    should_stop() returns True (or KeyboardInterrupt).
+    """
+    import concurrent.futures
+    
+    mods_path = os.path.abspath(mods_path)
+    texture_filter = TextureFilter(mods_path, mode, game_version, log, rules)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    written = WrittenDds(mods_path)
+    watcher = None
+    
+    def run_batch(png_paths):
+        counts = {'converted': 0, 'skipped': 0, 'error': 0, 'orphans_removed': 0}
+        to_convert = []
+        for png_path in sorted(png_paths):
+            if os.path.exists(png_path):
+                if texture_filter.accepts(png_path):
+                    to_convert.append(png_path)
+            elif remove_orphaned_dds(png_path, written, log):
+                counts['orphans_removed'] += 1
+        for png_path, status in zip(to_convert, executor.map(process_file, to_convert)):
+            counts[status] = counts.get(status, 0) + 1
+            if status == 'converted':
+                written.add(png_path)
+        written.save(log)
+        if to_convert or counts['orphans_removed']:
+            log(f"Watch batch done: {counts['converted']} converted, {counts['skipped']} up to date, "
+                f"{counts['error']} errors, {counts['orphans_removed']} orphaned DDS removed", "success")
+    
+    try:
+        watcher = create_watcher(mods_path, poll_interval, log)
+        if initial_sync:
+            log("Initial sync: converting textures that are missing or out of date...", "info")
+            png_files, _ = discover_png_files(mods_path, texture_filter.mode, texture_filter.game_version, log,
+                                              texture_filter.rules)
+            run_batch(png_files)
+        log("Watching for texture changes. Stop to end watch mode.", "info")
         
-        if conversion_successful:
-            file_stats['converted'] = 1
+        pending = set()
+        first_event = last_event = 0.0
+        while not (should_stop and should_stop()):
+            events = watcher.read_events(0.5)
+            now = time.time()
+            if events is None:
+                # Event queue overflowed: fall back to one full pass for consistency
+                log("Too many changes at once; rescanning the mods folder", "warning")
+                png_files, _ = discover_png_files(mods_path, texture_filter.mode, texture_filter.game_version, log,
+                                                  texture_filter.rules)
+                pending.update(png_files)
+                events = []
+                last_event = now
+            for path, kind in events:
+                lower = path.lower()
+                mod_path = texture_filter.mod_path_of(path)
+                if lower.endswith('loadfolders.xml') or kind == 'deleted_dir':
+                    if mod_path:
+                        texture_filter.invalidate(mod_path)
+                    if mod_path and lower.endswith('loadfolders.xml') and os.path.isdir(mod_path):
+                        # The mod may load other folders now: check all of its textures again
+                        png_files, _ = discover_png_files(mods_path, texture_filter.mode, texture_filter.game_version,
+                                                          log, texture_filter.rules,
+                                                          mods=[os.path.basename(mod_path)])
+                        if png_files and not pending:
+                            first_event = now
+                        pending.update(png_files)
+                        last_event = now
+                elif lower.endswith('.png') and not is_temp_file(path):
+                    if not pending:
+                        first_event = now
+                    pending.add(path)
+                    last_event = now
             
-        return file_stats
-
-    except Exception as e:
-        print_error(f"Unexpected error processing {os.path.basename(png_path)}: {e}")
-        file_stats['errors'] = 1
-        return file_stats
+            if pending and (now - last_event >= debounce or now - first_event >= WATCH_MAX_BATCH_DELAY):
+                batch, pending = pending, set()
+                log(f"Detected {len(batch)} changed textures", "info")
+                run_batch(batch)
     finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                # print_info(f"Cleaned up temporary upscaled file: {os.path.basename(temp_path)}") # Too verbose
-            except Exception as e_remove:
-                print_warning(f"Could not remove temporary file {temp_path}: {e_remove}")
+        if watcher:
+            watcher.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+    save_gpu_adapter_rates()
+    log("Watch mode stopped.", "info")
 
-# ============================================================================
-# MAIN CONVERSION LOGIC
-# ============================================================================
+def watch_textures(args):
+    """CLI watch mode: convert textures continuously as mods are updated."""
+    if not os.path.exists(RIMWORLD_MODS_PATH):
+        print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+        return False
+    
+    global ENCODER_PRESET, BACKEND_CHOICE
+    ENCODER_PRESET = resolve_preset(ENCODER_PRESET, texconv_path=TEXCONV_PATH, use_gpu=args.enable_gpu)
+    BACKEND_CHOICE = resolve_backends(use_gpu=args.enable_gpu, preset=ENCODER_PRESET)
+    
+    def process_file(png_path):
+        return journal_status(_process_file_task(png_path, args.enable_gpu))
+    
+    print_info(f"Watch mode on: {RIMWORLD_MODS_PATH} (Ctrl+C to stop)")
+    watch_mods(RIMWORLD_MODS_PATH, process_file, args.discovery_mode, args.game_version,
+               debounce=args.debounce, poll_interval=args.poll_interval,
+               initial_sync=args.initial_sync)
+
+def calibrate_encoder(args):
+    """Measure encode time and quality of each preset on a sample and recommend one."""
+    if not os.path.exists(RIMWORLD_MODS_PATH):
+        print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+        return False
+    
+    png_files, _ = discover_png_files(RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version)
+    if not png_files:
+        print_info("No PNG files found.")
+        return False
+    manifest = build_manifest(RIMWORLD_MODS_PATH, png_files)
+    save_manifest(manifest)
+    
+    calibration = calibrate_presets(png_files, manifest, TEXCONV_PATH, args.enable_gpu, args.sample)
+    if calibration is None:
+        return False
+    
+    workers = os.cpu_count() or 1
+    print()
+    print_info(f"Predicted run time for {len(png_files)} textures with {workers} workers:")
+    for preset in PRESET_QUALITY_ORDER:
+        per_file = calibration['presets'][preset]['seconds_per_file']
+        print(f"  {preset:<9} ~{format_duration(per_file * len(png_files) / workers)}")
+    target_seconds = args.target_minutes * 60 if args.target_minutes else None
+    preset, reason = recommend_preset(calibration, len(png_files), workers, target_seconds, args.min_psnr)
+    print_success(f"Recommended preset: {preset} ({reason})")
+    print_info("Use it with 'convert --preset auto' or 'convert --preset " + preset + "'")
+
+def rank_encoder_backends(args):
+    """Show the encoder backends and their ranking per texture size, benchmarking them if needed."""
+    preset = resolve_preset(args.preset, texconv_path=TEXCONV_PATH, use_gpu=args.enable_gpu)
+    print_info("Encoder backends:")
+    for backend in ENCODER_BACKENDS.values():
+        state = "available" if backend.available() else "not found"
+        if backend.lane == 'gpu' and not args.enable_gpu:
+            state += ", GPU disabled"
+        print(f"  {backend.name:<12} {backend.lane.upper()}  {state}")
+    if args.enable_gpu and ENCODER_BACKENDS['texconv-gpu'].available():
+        scheduler = gpu_scheduler()
+        print_info(f"GPU adapters ({'all hardware adapters' if GPU_ADAPTERS is None else 'gpu_adapters from the config'}):")
+        for index, name in scheduler.adapters.items():
+            rate = scheduler.stats[index]['seconds_per_mpx']
+            print(f"  GPU {index} {name}: {f'{1 / rate:.2f} Mpx/s in earlier runs' if rate else 'not measured yet'}")
+    
+    benchmark = None if args.rerun else cached_backend_benchmark(args.enable_gpu, preset)
+    if benchmark is None:
+        if len(runnable_backends(args.enable_gpu, ranked_only=True)) < 2:
+            print_info("Only one encoder can run here; nothing to compare.")
+            return
+        if not os.path.exists(RIMWORLD_MODS_PATH):
+            print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+            return False
+        png_files, _ = discover_png_files(RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version)
+        if not png_files:
+            print_info("No PNG files found.")
+            return False
+        manifest = build_manifest(RIMWORLD_MODS_PATH, png_files)
+        save_manifest(manifest)
+        benchmark = benchmark_backends(png_files, manifest, args.enable_gpu, preset, args.sample)
+        if benchmark is None:
+            return False
+    else:
+        print()
+        print_info(f"Cached benchmark ({benchmark['files']} textures, preset {preset}):")
+        for name, result in benchmark['results'].items():
+            print(f"  {name:<12} {format_backend_result(result)}")
+    
+    choice = BackendChoice(args.enable_gpu, benchmark)
+    print()
+    print_info(f"Encoder order per texture size (quality floor {PRESET_MIN_PSNR:.0f} dB):")
+    for limit, name in BACKEND_SIZE_CLASSES:
+        bound = f"up to {int(limit ** 0.5)}x{int(limit ** 0.5)}" if limit else "larger"
+        print(f"  {name:<7} ({bound}): {', '.join(backend.name for backend in choice.candidates(limit or 1024 * 1024))}")
+    bound = f"{int(BAND_MIN_PIXELS ** 0.5)}x{int(BAND_MIN_PIXELS ** 0.5)} and up, in bands on {BAND_WORKERS or os.cpu_count()} cores"
+    print(f"  {'huge':<7} ({bound}): {', '.join(backend.name for backend in choice.candidates(BAND_MIN_PIXELS))}")
+    print_info("'convert' uses this order with the default \"encoder_backend\": \"auto\"")
+
+def benchmark_textures(args):
+    """Measure PNG decode against DDS read on a sample of every mod and report the load time saved."""
+    if not os.path.exists(RIMWORLD_MODS_PATH):
+        print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+        return False
+    
+    png_files, _ = discover_png_files(RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version)
+    if not png_files:
+        print_info("No PNG files found.")
+        return False
+    manifest = build_manifest(RIMWORLD_MODS_PATH, png_files)
+    save_manifest(manifest)
+    
+    results = benchmark_load_times(png_files, manifest, args.sample)
+    if results is None:
+        return False
+    print()
+    print_info(f"Load-time benchmark ({args.sample} textures per mod, best of {BENCHMARK_REPEATS} runs):")
+    print()
+    for line in format_benchmark(results):
+        print(line)
+
+def verify_textures(args):
+    """Check the DDS files next to the mods' PNGs: structure, mip chain and decoded quality."""
+    if not os.path.exists(RIMWORLD_MODS_PATH):
+        print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+        return False
+    
+    png_files, _ = discover_png_files(RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version)
+    if not png_files:
+        print_info("No PNG files found.")
+        return False
+    manifest = build_manifest(RIMWORLD_MODS_PATH, png_files)
+    
+    start = time.perf_counter()
+    checked, failures = verify_outputs(png_files, manifest, delete_bad=args.delete_bad)
+    print()
+    for png_file, problems in failures:
+        print(f"  {os.path.relpath(os.path.splitext(png_file)[0] + '.dds', RIMWORLD_MODS_PATH)}: {'; '.join(problems)}")
+    if failures:
+        action = "removed, the game uses the PNGs" if args.delete_bad else "run with --delete-bad to remove them"
+        print_warning(f"{len(failures)} of {checked} DDS files failed verification ({action})")
+        return False
+    print_success(f"All {checked} DDS files passed verification ({time.perf_counter() - start:.1f}s)")
+
+def plan_textures(args):
+    """Dry run: predict run time, disk and GPU memory per mod without converting anything."""
+    if not os.path.exists(RIMWORLD_MODS_PATH):
+        print_error(f"RimWorld mods path not found: {RIMWORLD_MODS_PATH}")
+        return False
+    
+    png_files, _ = discover_png_files(RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version, mods=args.mods)
+    if not png_files:
+        print_info("No PNG files found.")
+        return
+    manifest = build_manifest(RIMWORLD_MODS_PATH, png_files)
+    save_manifest(manifest, keep_other_files=args.mods is not None)
+    if args.vram_budget:
+        manifest['budget_sizes'] = fit_vram_budget(manifest, args.vram_budget * 1024 * 1024)
+    
+    preset = resolve_preset(args.preset, texconv_path=TEXCONV_PATH, use_gpu=args.enable_gpu)
+    workers = os.cpu_count() or 1
+    lane_cost = planned_lane_cost(args.enable_gpu, preset, TEXCONV_PATH)
+    low_benefit = []
+    if args.min_benefit is not None:
+        png_files, low_benefit = filter_by_benefit(png_files, manifest, args.min_benefit, ENABLE_UPSCALING, lane_cost)
+    plan = plan_conversion(png_files, manifest, ENABLE_UPSCALING, workers, lane_cost)
+    
+    print()
+    print_info(f"Plan for {len(png_files)} textures ({'GPU' if args.enable_gpu else 'CPU'}, preset {preset}, "
+               f"{workers} workers, upscaling {'on' if ENABLE_UPSCALING else 'off'}):")
+    print()
+    for line in format_plan(plan):
+        print(line)
+    if low_benefit:
+        print(f"{len(low_benefit)} textures below {args.min_benefit} ms load-time benefit would stay PNG "
+              f"(not counted above).")
 
 def convert_textures(args):
     """Main texture conversion function."""
+    global ENABLE_UPSCALING, ENCODER_PRESET, VERIFY_OUTPUT, BACKEND_CHOICE, VRAM_BUDGET_MB
+    
     print("🚨 CRITICAL WARNING 🚨")
     print("=" * 50)
     print("This will process textures DIRECTLY in your original mod folders!")
@@ -459,8 +4708,18 @@ def convert_textures(args):
         print("Please update RIMWORLD_MODS_PATH in the script configuration.")
         return
     
+    if args.daemon or (args.daemon is None and USE_DAEMON):
+        client = DaemonClient()
+        if client.status() is not None:
+            return convert_on_daemon(args, client)
+        if args.daemon:
+            print_error(f"No conversion daemon is running on port {DAEMON_PORT} (start one with the daemon command)")
+            return False
+    
     print_info(f"Scanning mods in: {RIMWORLD_MODS_PATH}")
     
+    import concurrent.futures
+    
     # Statistics
     stats = {
         'mods_processed': 0,
@@ -469,70 +4728,164 @@ def convert_textures(args):
         'files_skipped': 0,
         'errors': 0,
         'gpu_conversions': 0, 
-        'cpu_conversions': 0 
+        'cpu_conversions': 0,
+        'files_low_benefit': 0,
+        'verify_failed': 0
     }
+    VERIFY_OUTPUT = args.verify
+    if VERIFY_OUTPUT and _load_numpy() is None:
+        print_warning("NumPy is not installed; --verify only checks DDS headers and sizes (pip install numpy to decode).")
     
     start_time = time.time()
+    journal = RunJournal()
+    written = WrittenDds(RIMWORLD_MODS_PATH)
+    profiler = RunProfiler(args.profile_every) if args.profile else None
+    if profiler:
+        profiler.start()
     
-    # Process each mod folder
-    for mod_folder in os.listdir(RIMWORLD_MODS_PATH):
-        mod_path = os.path.join(RIMWORLD_MODS_PATH, mod_folder)
-        
-        if not os.path.isdir(mod_path) or should_skip_folder(mod_path):
-            continue
-        
-        print_info(f"Processing mod: {mod_folder}")
-        stats['mods_processed'] += 1
-        
-        # Find all PNG files in the mod
-        png_files_to_process = []
-        for root, dirs, files in os.walk(mod_path):
-            # Skip certain directories
-            dirs[:] = [d for d in dirs if not should_skip_folder(os.path.join(root, d))]
-            
-            for file in files:
-                if file.lower().endswith('.png'):
-                    file_path = os.path.join(root, file)
-                    if not should_skip_file(file_path):
-                        png_files_to_process.append(file_path)
+    resumed = prepare_resume(RIMWORLD_MODS_PATH) if args.resume else None
+    if resumed:
+        png_files_to_process, manifest, settings = resumed
+        ENABLE_UPSCALING = settings.get('enable_upscaling', ENABLE_UPSCALING)
+        args.enable_gpu = settings.get('enable_gpu', args.enable_gpu)
+        ENCODER_PRESET = settings.get('preset', ENCODER_PRESET)
+        VRAM_BUDGET_MB = settings.get('vram_budget_mb')
+        stats['mods_processed'] = settings.get('mods', 0)
+        total_files = len(png_files_to_process)
+        journal.reopen(RIMWORLD_MODS_PATH)
+    else:
+        # Phase 1: find all PNG files in each mod folder (or only the mods given with --mods / the --files)
+        if args.files:
+            png_files_to_process, stats['mods_processed'] = select_png_files(args.files, RIMWORLD_MODS_PATH)
+        else:
+            png_files_to_process, stats['mods_processed'] = discover_png_files(
+                RIMWORLD_MODS_PATH, args.discovery_mode, args.game_version, mods=args.mods)
+        total_files = len(png_files_to_process)
+        if not total_files:
+            print_info("No PNG files found.")
+            if profiler:
+                profiler.finish()
+            return
         
-        if not png_files_to_process:
-            print_info(f"No PNG files to process in mod: {mod_folder}")
-            continue
-
-        num_files_in_mod = len(png_files_to_process)
-        print_info(f"Found {num_files_in_mod} PNGs in {mod_folder}. Processing in parallel...")
-
-        # Determine number of workers
-        num_workers = os.cpu_count() or 1 # Default to 1 if os.cpu_count() is None
+        # Phase 2: probe headers and precompute upscaling decisions for the whole corpus
+        manifest = build_manifest(RIMWORLD_MODS_PATH, png_files_to_process)
+        VRAM_BUDGET_MB = args.vram_budget
+        if VRAM_BUDGET_MB:
+            manifest['budget_sizes'] = fit_vram_budget(manifest, VRAM_BUDGET_MB * 1024 * 1024)
+        save_manifest(manifest, keep_other_files=bool(args.mods or args.files))
+        ENCODER_PRESET = resolve_preset(args.preset, png_files_to_process, manifest, TEXCONV_PATH, args.enable_gpu,
+                                        os.cpu_count() or 1, args.target_minutes, args.min_psnr)
+        if args.min_benefit is not None:
+            # Leave textures as PNG where the DDS would not make the game load faster
+            lane_cost = planned_lane_cost(args.enable_gpu, ENCODER_PRESET, TEXCONV_PATH)
+            png_files_to_process, low_benefit = filter_by_benefit(png_files_to_process, manifest, args.min_benefit,
+                                                                  ENABLE_UPSCALING, lane_cost)
+            write_benefit_report(low_benefit, args.min_benefit)
+            for png_file, _ in low_benefit:
+                manifest['files'].pop(os.path.relpath(png_file, manifest['mods_path']), None)
+            stats['files_low_benefit'] = len(low_benefit)
+            total_files = len(png_files_to_process)
+        settings = {'enable_upscaling': ENABLE_UPSCALING, 'enable_gpu': args.enable_gpu,
+                    'preset': ENCODER_PRESET, 'mods': stats['mods_processed'],
+                    'vram_budget_mb': VRAM_BUDGET_MB, 'budget_sizes': manifest.get('budget_sizes')}
+        journal.start(RIMWORLD_MODS_PATH, settings, png_files_to_process, manifest['upscale_decisions'])
+    
+    BACKEND_CHOICE = resolve_backends(None if resumed else png_files_to_process, manifest, args.enable_gpu,
+                                      ENCODER_PRESET, args.backend)
+    if profiler:
+        profiler.snapshot("discovery")
+    
+    planned = summarize_manifest(manifest, ENABLE_UPSCALING)
+    print_info(f"Encoder preset: {ENCODER_PRESET}")
+    print_info(f"Planned pixel work: {planned['planned_pixels'] / 1e6:.1f} Mpx "
+               f"(source {planned['source_pixels'] / 1e6:.1f} Mpx, {planned['upscaled']} textures upscaled)")
+    
+    # Phase 3: convert in parallel
+    print_info(f"Processing {total_files} PNGs in parallel...")
+    
+    # Determine number of workers
+    num_workers = os.cpu_count() or 1 # Default to 1 if os.cpu_count() is None
+    
+    if LOCALITY_ORDER:
+        png_files_to_process = locality_order(png_files_to_process)
+    # Compact per-file records; the file list and manifest are not needed past this point
+    tasks = TaskTable(png_files_to_process, manifest)
+    del png_files_to_process, manifest
+    throughput = ThroughputModel(total_files, planned['planned_pixels'], tasks.total_bytes(),
+                                 num_workers, saved=saved_throughput(ENCODER_PRESET))
+    
+    task = profiler.wrap(_process_file_task) if profiler else _process_file_task
+    if args.background:
+        task = start_background_mode(num_workers).wrap(task)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+    processed_count = 0
+    
+    def submit(index):
+        return executor.submit(task, tasks.path(index), args.enable_gpu, tasks.texture_info(index), tasks.rule(index))
+    
+    def on_done(index, future):
+        nonlocal processed_count
+        png_file = tasks.path(index)
+        pixels = tasks.planned_pixels(index, ENABLE_UPSCALING)
+        nbytes = tasks.sizes[index]
+        try:
+            result_stats = future.result()
+            # Aggregate stats
+            stats['files_converted'] += result_stats['converted']
+            stats['files_upscaled'] += result_stats['upscaled']
+            stats['files_skipped'] += result_stats['skipped']
+            stats['errors'] += result_stats['errors']
+            stats['gpu_conversions'] += result_stats['gpu_conversions']
+            stats['cpu_conversions'] += result_stats['cpu_conversions']
+            stats['verify_failed'] += result_stats['verify_failed']
+            if result_stats['converted']:
+                lane = 'gpu' if result_stats['gpu_conversions'] else 'cpu'
+                throughput.record(lane, pixels, nbytes, result_stats['seconds'], result_stats['stage_seconds'])
+            else:
+                throughput.skip(pixels, nbytes)
+            status = journal_status(result_stats)
+        except Exception as exc:
+            print_error(f'{os.path.basename(png_file)} generated an unexpected exception in thread: {exc}')
+            stats['errors'] += 1
+            throughput.skip(pixels, nbytes)
+            status = 'error'
+        tasks.mark(index, TASK_STATUS_NAMES.index(status))
+        journal.record_done(png_file, status)
+        if status == 'converted':
+            written.add(png_file)
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            future_to_png = {
-                executor.submit(_process_file_task, png_file, args.enable_gpu): png_file 
-                for png_file in png_files_to_process
-            }
-            
-            processed_count_in_mod = 0
-            for future in concurrent.futures.as_completed(future_to_png):
-                png_filename_for_log = os.path.basename(future_to_png[future])
-                try:
-                    result_stats = future.result()
-                    # Aggregate stats
-                    stats['files_converted'] += result_stats['converted']
-                    stats['files_upscaled'] += result_stats['upscaled']
-                    stats['files_skipped'] += result_stats['skipped']
-                    stats['errors'] += result_stats['errors']
-                    stats['gpu_conversions'] += result_stats['gpu_conversions']
-                    stats['cpu_conversions'] += result_stats['cpu_conversions']
-                except Exception as exc:
-                    print_error(f'{png_filename_for_log} generated an unexpected exception in thread: {exc}')
-                    stats['errors'] += 1
-                
-                processed_count_in_mod +=1
-                # Simple progress, can be made more sophisticated if needed
-                if processed_count_in_mod % 10 == 0 or processed_count_in_mod == num_files_in_mod :
-                     print_info(f"Progress for {mod_folder}: {processed_count_in_mod}/{num_files_in_mod} files handled.")
-
+        processed_count += 1
+        if profiler:
+            profiler.maybe_snapshot(processed_count)
+        # Simple progress, can be made more sophisticated if needed
+        if processed_count % 10 == 0 or processed_count == total_files:
+             print_info(f"Progress: {processed_count}/{total_files} files handled. {throughput.status_line()}")
+    
+    read_ahead = start_read_ahead(tasks.path(index) for index in range(total_files))
+    try:
+        run_task_window(executor, total_files, submit, on_done, num_workers * TASK_WINDOW_PER_WORKER)
+    except KeyboardInterrupt:
+        # Keep finished files in the journal; 'convert --resume' picks up from here
+        stop_read_ahead()
+        stop_background_mode()
+        executor.shutdown(wait=False, cancel_futures=True)
+        journal.close()
+        written.save()
+        print()
+        print_warning("Run interrupted. Use 'convert --resume' to continue where it stopped.")
+        if profiler:
+            profiler.finish()
+        raise
+    executor.shutdown(wait=True)
+    stop_read_ahead()
+    stop_background_mode()
+    journal.finish()
+    written.save()
+    if profiler:
+        profiler.finish()
+    
+    save_throughput(throughput, ENCODER_PRESET)
+    save_gpu_adapter_rates()
 
     # Final summary
     end_time = time.time()
@@ -544,10 +4897,25 @@ def convert_textures(args):
     print(f"Files converted:        {stats['files_converted']}")
     print(f"  - GPU conversions:    {stats['gpu_conversions']}")
     print(f"  - CPU conversions:    {stats['cpu_conversions']}")
+    if GPU_SCHEDULER is not None and len(GPU_SCHEDULER.adapters) > 1:
+        for line in GPU_SCHEDULER.summary():
+            print(f"    - {line}")
     print(f"Files upscaled:         {stats['files_upscaled']}")
     print(f"Files skipped (DDS newer): {stats['files_skipped']}")
+    if stats['files_low_benefit']:
+        print(f"Files left as PNG (low benefit): {stats['files_low_benefit']} (see {BENEFIT_REPORT_FILE})")
     print(f"Errors encountered:     {stats['errors']}")
+    if VERIFY_OUTPUT:
+        print(f"  - Failed verification (DDS removed): {stats['verify_failed']}")
     print(f"Total processing time:  {total_time:.2f} seconds")
+    mb_per_sec, mpx_per_sec = throughput.rates()
+    print(f"Throughput:             {mb_per_sec:.1f} MB/s, {mpx_per_sec:.1f} Mpx/s")
+    for stage, stage_time in sorted(throughput.stage_seconds.items()):
+        print(f"  - {stage + ' time:':<20} {stage_time:.2f} seconds (summed over workers)")
+    if io_cpu_line(throughput.stage_seconds):
+        print(f"I/O wait vs CPU:        {io_cpu_line(throughput.stage_seconds)}")
+    if read_ahead is not None:
+        print(f"Read-ahead:             {read_ahead.summary()}")
     print("=" * 70)
 
 def restore_pngs(args):
@@ -570,40 +4938,36 @@ def restore_pngs(args):
     print_info(f"Scanning for DDS files in: {RIMWORLD_MODS_PATH}")
     
     deleted_count = 0
+    skipped_count = 0
     
-    # Process each mod folder
-    for mod_folder in os.listdir(RIMWORLD_MODS_PATH):
-        mod_path = os.path.join(RIMWORLD_MODS_PATH, mod_folder)
-        
-        if not os.path.isdir(mod_path) or should_skip_folder(mod_path):
-            continue
-        
+    # Process each mod folder (or only the mods given with --mods)
+    for mod_folder, mod_path in list_mod_folders(RIMWORLD_MODS_PATH, args.mods):
         print_info(f"Processing mod: {mod_folder}")
         
-        # Find all DDS files in the mod
-        for root, dirs, files in os.walk(mod_path):
-            # Skip certain directories
-            dirs[:] = [d for d in dirs if not should_skip_folder(os.path.join(root, d))]
-            
-            for file in files:
-                if file.lower().endswith('.dds'):
-                    dds_path = os.path.join(root, file)
-                    try:
-                        os.remove(dds_path)
-                        deleted_count += 1
-                        print_success(f"Deleted: {os.path.relpath(dds_path, RIMWORLD_MODS_PATH)}")
-                    except Exception as e:
-                        print_error(f"Could not delete {dds_path}: {e}")
+        # Every DDS with a PNG next to it, in all folders; a DDS the mod ships on its own stays
+        for dds_path, has_png in iter_restorable_dds(mod_path):
+            if not has_png:
+                skipped_count += 1
+                continue
+            try:
+                os.remove(dds_path)
+                deleted_count += 1
+                print_success(f"Deleted: {os.path.relpath(dds_path, RIMWORLD_MODS_PATH)}")
+            except Exception as e:
+                print_error(f"Could not delete {dds_path}: {e}")
     
     print()
     print("🎉 RESTORATION COMPLETE!")
     print(f"Deleted {deleted_count} DDS files.")
+    if skipped_count:
+        print(f"Kept {skipped_count} DDS files without a PNG (shipped by their mods).")
     print("Game will now use original PNG files.")
 
-def build_exe():
+def build_exe(args=None):
     """Build standalone executable using PyInstaller."""
     print_info("Building standalone executable...")
     
+    import subprocess
     try:
         # Check if PyInstaller is available
         import PyInstaller
@@ -612,10 +4976,10 @@ def build_exe():
         print("pip install PyInstaller")
         return
     
-    # Build command
+    # Build command (one-folder build: a one-file exe unpacks itself on every launch)
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",
+        "--onedir",
         "--console",
         "--name", "RimConvert",
         "--distpath", "./dist",
@@ -632,7 +4996,63 @@ def build_exe():
     except subprocess.CalledProcessError as e:
         print_error(f"Build failed: {e}")
 
-def configure_paths():
+def measure_startup_time(runs):
+    """
+    Import the entry-point modules in `runs` fresh interpreters. Returns the sorted import
+    times in seconds and the DEFERRED_MODULES that were loaded eagerly; raises RuntimeError
+    when an import fails.
+    """
+    import subprocess
+    
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        "import rimworld_texture_optimizer, rimworld_gui\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    
+    timings = []
+    loaded_modules = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                                cwd=script_dir, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(f"Import probe failed: {result.stderr.strip()}")
+        elapsed, _, loaded = result.stdout.strip().partition(' ')
+        timings.append(float(elapsed))
+        loaded_modules.update(m for m in loaded.split(',') if m)
+    return sorted(timings), loaded_modules
+
+def check_startup_time(args):
+    """Measure how long the entry-point modules take to import and compare to STARTUP_TIME_TARGET."""
+    if getattr(sys, 'frozen', False):
+        print_warning("Startup check needs the Python sources; it is not available in the built executable.")
+        return True
+    
+    try:
+        timings, loaded_modules = measure_startup_time(args.runs)
+    except RuntimeError as e:
+        print_error(str(e))
+        return False
+    median = timings[len(timings) // 2]
+    print_info(f"Entry-point import time over {args.runs} runs: median {median * 1000:.1f} ms, "
+               f"best {timings[0] * 1000:.1f} ms (target {STARTUP_TIME_TARGET * 1000:.0f} ms)")
+    
+    ok = True
+    if loaded_modules:
+        print_error(f"Modules loaded eagerly at startup: {', '.join(sorted(loaded_modules))}")
+        ok = False
+    if median > STARTUP_TIME_TARGET:
+        print_error("Startup time target missed")
+        ok = False
+    if ok:
+        print_success("Startup time within target")
+    return ok
+
+def configure_paths(args=None):
     """Interactive configuration of paths."""
     global RIMWORLD_MODS_PATH, TEXCONV_PATH
     
@@ -660,22 +5080,474 @@ def configure_paths():
     save_config(config)
     print_success("Configuration saved!")
 
+# ============================================================================
+# DAEMON (WARM ENGINE FOR THE CLI AND GUI)
+# ============================================================================
+
+DAEMON_JOBS = ('conversion_worker', 'plan_worker', 'scan_worker', 'restore_worker', 'watch_worker')
+DAEMON_KEEP_FINISHED = 20  # Finished jobs whose events can still be read
+DAEMON_HEARTBEAT = 5.0  # Seconds between keep-alive lines of a quiet event stream
+DAEMON_OWN_SETTINGS = ('texconv_path', 'encoder_backends')  # Tools the daemon runs: its own config, never the request's
+# Engine globals a job may change (ConversionWorker sets them from its settings); reset before every job
+DAEMON_JOB_GLOBALS = ('TEXCONV_PATH', 'GPU_ADAPTERS', 'PREFETCH_MB', 'BACKGROUND_CPU_SHARE', 'BACKGROUND_GPU_LANES',
+                      'BACKGROUND_PROCESSES', 'BACKGROUND_GAME_WORKERS')
+
+def daemon_token_path(port):
+    return os.path.join(DAEMON_TOKEN_DIR, f"daemon_{port}.token")
+
+def write_daemon_token(port):
+    """New secret for the daemon on port, written to a file only this user can read; returns it."""
+    import secrets
+    token = secrets.token_hex(32)
+    os.makedirs(DAEMON_TOKEN_DIR, mode=0o700, exist_ok=True)
+    if os.name != 'nt':
+        os.chmod(DAEMON_TOKEN_DIR, 0o700)
+    path = daemon_token_path(port)
+    if os.path.exists(path):
+        os.remove(path) # Created fresh below, so nobody else can hold the file open
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as f:
+        f.write(token)
+    return token
+
+def read_daemon_token(port):
+    """Secret of the daemon on port, None when no daemon wrote one (or it is not ours to read)."""
+    try:
+        with open(daemon_token_path(port)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+class DaemonJob:
+    """
+    A job submitted to the daemon. Its events are kept so clients can read them from any
+    offset (and reconnect); put() is the queue interface the GUI's EventBatcher sends to.
+    """
+    
+    def __init__(self, job_id, job, settings, kwargs):
+        self.id = job_id
+        self.job = job
+        self.settings = settings
+        self.kwargs = kwargs
+        self.state = 'queued'  # -> 'running' -> 'done'
+        self.events = []
+        self.cancel_event = threading.Event()
+        self.changed = threading.Condition()
+        self.seconds = None
+    
+    def put(self, batch):
+        with self.changed:
+            self.events.extend(batch)
+            self.changed.notify_all()
+    
+    def set_state(self, state):
+        with self.changed:
+            self.state = state
+            self.changed.notify_all()
+    
+    def events_from(self, start, timeout):
+        """(events after the first start ones, finished), waiting up to timeout seconds for new ones."""
+        with self.changed:
+            if len(self.events) <= start and self.state != 'done':
+                self.changed.wait(timeout)
+            return self.events[start:], self.state == 'done'
+    
+    def summary(self):
+        return {'id': self.id, 'job': self.job, 'state': self.state, 'events': len(self.events),
+                'cancelled': self.cancel_event.is_set(), 'seconds': self.seconds}
+
+class ConversionDaemon:
+    """
+    Long-lived local process that owns the conversion engine for the CLI and GUI.
+    
+    Jobs are the GUI's ConversionWorker jobs, run one at a time, each on a thread of its own (a
+    background job lowers the priority of its thread only), so Pillow, the GPU scheduler, the encoder benchmark and the band pool stay warm from one
+    job to the next. Clients talk JSON over HTTP on DAEMON_HOST (see DaemonClient) and must send
+    the secret from the daemon's token file. The encoders a job runs come from the daemon's own
+    config (DAEMON_OWN_SETTINGS), and the engine globals a job sets are reset before the next one.
+    """
+    
+    def __init__(self, port=None, log=_cli_log):
+        import queue
+        self.port = port or DAEMON_PORT
+        self.log = log
+        self.jobs = {}  # id -> DaemonJob, queued, running and the last finished ones
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.started = time.time()
+        self.server = None
+        self.token = None # Written by serve()
+        self.engine_defaults = {name: globals()[name] for name in DAEMON_JOB_GLOBALS}
+        self.engine_backends = dict(ENCODER_BACKENDS) # Built-in ones and those of the daemon's config
+    
+    def submit(self, job, settings, kwargs=None):
+        if job not in DAEMON_JOBS:
+            raise ValueError(f"Unknown job: {job}")
+        if not isinstance(settings, dict) or not settings.get('mods_path'):
+            raise ValueError("settings with a mods_path are required")
+        settings = {key: value for key, value in settings.items() if key not in DAEMON_OWN_SETTINGS}
+        settings['texconv_path'] = os.path.abspath(TEXCONV_PATH)
+        with self.lock:
+            daemon_job = DaemonJob(self.next_id, job, settings, dict(kwargs or {}))
+            self.next_id += 1
+            self.jobs[daemon_job.id] = daemon_job
+            finished = [j for j in self.jobs.values() if j.state == 'done']
+            for old in finished[:-DAEMON_KEEP_FINISHED]:
+                del self.jobs[old.id]
+        self.pending.put(daemon_job)
+        return daemon_job
+    
+    def job(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def status(self):
+        with self.lock:
+            jobs = [job.summary() for job in self.jobs.values()]
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started, 'jobs': jobs}
+    
+    def warm_up(self):
+        """Load what every job needs before the first one arrives."""
+        _load_pillow()
+        import rimworld_gui # Home of ConversionWorker
+        if ENABLE_GPU and os.path.exists(TEXCONV_PATH):
+            gpu_scheduler(log=self.log)
+    
+    def _reset_engine(self):
+        """Undo what the previous job's settings changed in the engine globals."""
+        globals().update(self.engine_defaults)
+        ENCODER_BACKENDS.clear()
+        ENCODER_BACKENDS.update(self.engine_backends)
+    
+    def _run_jobs(self):
+        import rimworld_gui
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            if job.cancel_event.is_set():
+                job.put([('log', "Cancelled before it started.\n", 'warning'), ('done',)])
+                job.set_state('done')
+                continue
+            self.log(f"Job {job.id} ({job.job}) started", "info")
+            job.set_state('running')
+            self._reset_engine()
+            start = time.perf_counter()
+            worker = threading.Thread(target=rimworld_gui.run_worker_process, name=f"job-{job.id}", daemon=True,
+                                      args=(job.job, job.settings, job, job.cancel_event, job.kwargs))
+            worker.start()
+            worker.join()
+            job.seconds = time.perf_counter() - start
+            job.set_state('done')
+            self.log(f"Job {job.id} ({job.job}) {'cancelled' if job.cancel_event.is_set() else 'finished'} "
+                     f"after {job.seconds:.1f}s", "info")
+    
+    def serve(self):
+        """Serve until shutdown() (or Ctrl+C); the running job is cancelled on the way out."""
+        from http.server import ThreadingHTTPServer
+        self.server = ThreadingHTTPServer((DAEMON_HOST, self.port), _daemon_request_handler(self))
+        self.server.daemon_threads = True
+        self.token = write_daemon_token(self.port)
+        runner = threading.Thread(target=self._run_jobs, daemon=True)
+        runner.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            try:
+                os.remove(daemon_token_path(self.port))
+            except OSError:
+                pass
+            with self.lock:
+                jobs = list(self.jobs.values())
+            for job in jobs:
+                job.cancel_event.set()
+            self.pending.put(None)
+            runner.join(30)
+            save_gpu_adapter_rates()
+    
+    def shutdown(self):
+        # serve_forever() returns once the current request is answered
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+def _daemon_request_handler(daemon):
+    """Request handler class of the daemon's HTTP API, bound to daemon."""
+    import hmac
+    from http.server import BaseHTTPRequestHandler
+    
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        # GET  /status                 -> {"pid", "uptime", "jobs": [...]}
+        # POST /jobs                   {"job", "settings", "kwargs"} -> {"id"}
+        # GET  /jobs/<id>/events?from=N -> one JSON event per line until the job is done
+        # POST /jobs/<id>/cancel
+        # POST /shutdown
+        
+        def log_message(self, format, *args):
+            pass # No access log
+        
+        def _reply(self, code, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _job(self, parts):
+            job = daemon.job(int(parts[1])) if len(parts) >= 2 and parts[1].isdigit() else None
+            if job is None:
+                self._reply(404, {'error': 'no such job'})
+            return job
+        
+        def _authorized(self):
+            # A page that resolves its own host name to 127.0.0.1 (DNS rebinding) still sends that name
+            if self.headers.get('Host') != f"{DAEMON_HOST}:{daemon.port}":
+                self._reply(403, {'error': 'wrong Host'})
+                return False
+            if not hmac.compare_digest(self.headers.get('X-RimConvert-Token', ''), daemon.token):
+                self._reply(403, {'error': 'missing or wrong X-RimConvert-Token'})
+                return False
+            return True
+        
+        def do_GET(self):
+            if not self._authorized():
+                return
+            path, _, query = self.path.partition('?')
+            parts = path.strip('/').split('/')
+            if parts == ['status']:
+                self._reply(200, daemon.status())
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+                job = self._job(parts)
+                if job is not None:
+                    start = dict(p.partition('=')[::2] for p in query.split('&') if p).get('from', '0')
+                    self._stream_events(job, int(start) if start.isdigit() else 0)
+            else:
+                self._reply(404, {'error': 'not found'})
+        
+        def _stream_events(self, job, sent):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers() # No length: the stream ends when the connection closes
+            try:
+                while True:
+                    events, finished = job.events_from(sent, DAEMON_HEARTBEAT)
+                    lines = [json.dumps(event) for event in events]
+                    self.wfile.write(("\n".join(lines) + "\n").encode('utf-8')) # An empty line is a heartbeat
+                    self.wfile.flush()
+                    sent += len(events)
+                    if finished and not events:
+                        return
+            except (BrokenPipeError, ConnectionResetError):
+                pass # Client went away; the job keeps running
+        
+        def do_POST(self):
+            if not self._authorized():
+                return
+            parts = self.path.strip('/').split('/')
+            if parts == ['jobs']:
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                    job = daemon.submit(request.get('job'), request.get('settings'), request.get('kwargs'))
+                except (ValueError, AttributeError, TypeError) as e:
+                    self._reply(400, {'error': str(e)})
+                    return
+                self._reply(200, {'id': job.id})
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+                job = self._job(parts)
+                if job is not None:
+                    job.cancel_event.set()
+                    self._reply(200, job.summary())
+            elif parts == ['shutdown']:
+                self._reply(200, {'stopping': True})
+                daemon.shutdown()
+            else:
+                self._reply(404, {'error': 'not found'})
+    
+    return DaemonRequestHandler
+
+class DaemonClient:
+    """Client of a running daemon; only urllib and json, so thin clients start without the engine's imports."""
+    
+    def __init__(self, port=None):
+        self.url = f"http://{DAEMON_HOST}:{port or DAEMON_PORT}"
+        self.token = read_daemon_token(port or DAEMON_PORT) or ''
+    
+    def _request(self, method, path, body=None, timeout=10):
+        import urllib.request
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json', 'X-RimConvert-Token': self.token})
+        return urllib.request.urlopen(request, timeout=timeout)
+    
+    def _call(self, method, path, body=None, timeout=10):
+        with self._request(method, path, body, timeout) as response:
+            return json.load(response)
+    
+    def status(self, timeout=0.5):
+        """The daemon's status, None when no daemon answers."""
+        try:
+            return self._call('GET', '/status', timeout=timeout)
+        except (OSError, ValueError):
+            return None
+    
+    def submit(self, job, settings, kwargs=None):
+        """Queue a ConversionWorker job; returns its id."""
+        return self._call('POST', '/jobs', {'job': job, 'settings': settings, 'kwargs': kwargs or {}})['id']
+    
+    def events(self, job_id, start=0):
+        """Yield the job's events from offset start until its 'done' event."""
+        with self._request('GET', f"/jobs/{job_id}/events?from={start}", timeout=DAEMON_HEARTBEAT * 6) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def cancel(self, job_id):
+        return self._call('POST', f"/jobs/{job_id}/cancel", {})
+    
+    def shutdown(self):
+        return self._call('POST', '/shutdown', {})
+
+def run_daemon(args):
+    """The daemon command: serve jobs, or report on / stop a running daemon."""
+    client = DaemonClient(args.port)
+    status = client.status()
+    if args.status or args.stop:
+        if status is None:
+            print_info(f"No daemon is running on port {args.port}")
+            return not args.status
+        print_info(f"Daemon running (pid {status['pid']}, up {status['uptime'] / 60:.0f} min)")
+        for job in status['jobs']:
+            print(f"  job {job['id']}: {job['job']} {job['state']}"
+                  + (f" ({job['seconds']:.1f}s)" if job['seconds'] is not None else ""))
+        if args.stop:
+            client.shutdown()
+            print_success("Daemon stopping")
+        return True
+    
+    if status is not None:
+        print_error(f"A daemon is already running on port {args.port} (pid {status['pid']})")
+        return False
+    # rimworld_gui's jobs must see this module (and the config loaded into it), not a second copy
+    sys.modules.setdefault('rimworld_texture_optimizer', sys.modules[__name__])
+    daemon = ConversionDaemon(args.port)
+    daemon.warm_up()
+    print_success(f"Conversion daemon listening on {DAEMON_HOST}:{args.port} (Ctrl+C or 'daemon --stop' to stop)")
+    try:
+        daemon.serve()
+    except OSError as e:
+        print_error(f"Cannot listen on {DAEMON_HOST}:{args.port}: {e}")
+        return False
+    print_info("Daemon stopped")
+    return True
+
+def convert_on_daemon(args, client):
+    """convert as a thin client: the daemon runs the job, its log and progress are printed here."""
+    config = load_config()
+    settings = {
+        'mods_path': os.path.abspath(RIMWORLD_MODS_PATH), # texconv and the encoder backends: the daemon's config
+        'enable_upscaling': ENABLE_UPSCALING,
+        'enable_gpu': args.enable_gpu,
+        'loaded_textures_only': args.discovery_mode == 'loadfolders',
+        'game_version': args.game_version,
+        'encoder_preset': args.preset,
+        'preset_target_minutes': args.target_minutes,
+        'preset_min_psnr': args.min_psnr,
+        'min_load_benefit_ms': args.min_benefit,
+        'vram_budget_mb': args.vram_budget,
+        'verify_output': args.verify,
+        'encoder_backend': args.backend,
+        'gpu_adapters': GPU_ADAPTERS,
+        'prefetch_mb': PREFETCH_MB,
+        'background_mode': args.background,
+        'background_cpu_share': BACKGROUND_CPU_SHARE,
+        'background_gpu_lanes': BACKGROUND_GPU_LANES,
+        'background_processes': BACKGROUND_PROCESSES,
+        'background_game_workers': BACKGROUND_GAME_WORKERS,
+        'profile': args.profile,
+        'profile_every': args.profile_every,
+    }
+    if 'path_rules' in config:
+        settings['path_rules'] = config['path_rules']
+    kwargs = {'resume': args.resume}
+    if args.mods:
+        kwargs['mods'] = args.mods
+    if args.files:
+        kwargs['files'] = [os.path.abspath(path) for path in args.files]
+    
+    job_id = client.submit('conversion_worker', settings, kwargs)
+    print_info(f"Running on the conversion daemon as job {job_id} (Ctrl+C cancels the job)")
+    received = 0
+    shown_percent = -1
+    cancelled = False
+    while True:
+        try:
+            for event in client.events(job_id, received): # Picks up where an interrupted stream stopped
+                received += 1
+                if event[0] == 'log':
+                    _cli_log(event[1].rstrip(), event[2])
+                elif event[0] == 'progress' and int(event[1]) // 5 != shown_percent // 5:
+                    shown_percent = int(event[1])
+                    print_info(f"{event[1]:.0f}% {event[2]} {event[3]}".rstrip())
+                elif event[0] == 'done':
+                    return True
+            print_error("The daemon ended the event stream before the job finished")
+            return False
+        except KeyboardInterrupt:
+            if cancelled:
+                raise # Second Ctrl+C: stop waiting, the daemon finishes cancelling on its own
+            cancelled = True
+            print()
+            print_warning("Cancelling the daemon job (Ctrl+C again to stop waiting)...")
+            client.cancel(job_id)
+
 # ============================================================================
 # MAIN FUNCTION AND CLI
 # ============================================================================
 
+def positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
 def main():
     # Load existing config if any
     config = load_config()
     
     # Update global config from loaded file if values exist
     global RIMWORLD_MODS_PATH, TEXCONV_PATH, ENABLE_UPSCALING, GENERATE_MIPMAPS, DEFAULT_COMPRESSION_FORMAT, ENABLE_GPU
+    global DISCOVERY_MODE, GAME_VERSION, ENCODER_PRESET, PRESET_MIN_PSNR, PRESET_TARGET_MINUTES, PATH_RULES
+    global MIN_LOAD_BENEFIT_MS, VERIFY_OUTPUT, ENCODER_BACKEND, GPU_ADAPTERS, PREFETCH_MB, DAEMON_PORT, USE_DAEMON
+    global VRAM_BUDGET_MB, BACKGROUND_MODE, BACKGROUND_CPU_SHARE, BACKGROUND_GPU_LANES, BACKGROUND_PROCESSES
+    global BACKGROUND_GAME_WORKERS
     RIMWORLD_MODS_PATH = config.get('rimworld_mods_path', RIMWORLD_MODS_PATH)
     TEXCONV_PATH = config.get('texconv_path', TEXCONV_PATH)
     ENABLE_UPSCALING = config.get('enable_upscaling', ENABLE_UPSCALING)
     GENERATE_MIPMAPS = config.get('generate_mipmaps', GENERATE_MIPMAPS)
     DEFAULT_COMPRESSION_FORMAT = config.get('compression_format', DEFAULT_COMPRESSION_FORMAT)
     ENABLE_GPU = config.get('enable_gpu', ENABLE_GPU) # Load global GPU default
+    DISCOVERY_MODE = config.get('discovery_mode', DISCOVERY_MODE)
+    GAME_VERSION = config.get('game_version', GAME_VERSION)
+    ENCODER_PRESET = config.get('encoder_preset', ENCODER_PRESET)
+    PRESET_MIN_PSNR = config.get('preset_min_psnr', PRESET_MIN_PSNR)
+    PRESET_TARGET_MINUTES = config.get('preset_target_minutes', PRESET_TARGET_MINUTES)
+    PATH_RULES = PathRules(config.get('path_rules'))
+    MIN_LOAD_BENEFIT_MS = config.get('min_load_benefit_ms', MIN_LOAD_BENEFIT_MS)
+    VERIFY_OUTPUT = config.get('verify_output', VERIFY_OUTPUT)
+    ENCODER_BACKEND = config.get('encoder_backend', ENCODER_BACKEND)
+    GPU_ADAPTERS = config.get('gpu_adapters', GPU_ADAPTERS)
+    PREFETCH_MB = config.get('prefetch_mb', PREFETCH_MB)
+    DAEMON_PORT = config.get('daemon_port', DAEMON_PORT)
+    USE_DAEMON = config.get('use_daemon', USE_DAEMON)
+    VRAM_BUDGET_MB = config.get('vram_budget_mb', VRAM_BUDGET_MB)
+    BACKGROUND_MODE = config.get('background_mode', BACKGROUND_MODE)
+    BACKGROUND_CPU_SHARE = config.get('background_cpu_share', BACKGROUND_CPU_SHARE)
+    BACKGROUND_GPU_LANES = config.get('background_gpu_lanes', BACKGROUND_GPU_LANES)
+    BACKGROUND_PROCESSES = config.get('background_processes', BACKGROUND_PROCESSES)
+    BACKGROUND_GAME_WORKERS = config.get('background_game_workers', BACKGROUND_GAME_WORKERS)
+    register_config_backends(config.get('encoder_backends'))
 
     print_banner()
     
@@ -690,9 +5562,23 @@ def main():
         epilog="""
 Examples:
   python rimworld_texture_optimizer.py --convert        # Convert textures
+  python rimworld_texture_optimizer.py convert --resume # Continue an interrupted run
+  python rimworld_texture_optimizer.py convert --mods MyMod OtherMod  # Only these mod folders
+  python rimworld_texture_optimizer.py watch            # Convert changed textures continuously
+  python rimworld_texture_optimizer.py daemon           # Keep the engine warm for the CLI and GUI
+  python rimworld_texture_optimizer.py convert --daemon --files Mods/MyMod/Textures/a.png
+  python rimworld_texture_optimizer.py plan             # Predict time, disk and VRAM per mod
+  python rimworld_texture_optimizer.py calibrate        # Recommend an encoder preset
+  python rimworld_texture_optimizer.py backends         # Compare the encoders on this machine
+  python rimworld_texture_optimizer.py benchmark        # Measure load-time savings per mod
+  python rimworld_texture_optimizer.py verify           # Check converted DDS files
+  python rimworld_texture_optimizer.py convert --preset auto --target-minutes 30
+  python rimworld_texture_optimizer.py convert --vram-budget 2048  # Fit the DDS files in 2 GB of VRAM
+  python rimworld_texture_optimizer.py convert --background  # Leave the machine usable (and the game smooth)
   python rimworld_texture_optimizer.py --restore        # Remove DDS files
   python rimworld_texture_optimizer.py --build-exe      # Build executable
   python rimworld_texture_optimizer.py --configure      # Configure paths
+  python rimworld_texture_optimizer.py startup-check    # Measure startup time
         """
     )
     
@@ -706,10 +5592,200 @@ Examples:
         dest="enable_gpu", 
         help="Disable GPU acceleration for this run (overrides global config)"
     )
-    parser_convert.set_defaults(func=convert_textures, enable_gpu=ENABLE_GPU) # Default for this run is global
+    parser_convert.add_argument(
+        "--game-version",
+        default=GAME_VERSION,
+        help=f"RimWorld version whose load folders are converted (default: {GAME_VERSION})"
+    )
+    parser_convert.add_argument(
+        "--all-folders",
+        action="store_const",
+        const="all",
+        dest="discovery_mode",
+        help="Convert PNGs in all folders (except SKIP_FOLDERS) instead of only the ones the game loads"
+    )
+    parser_convert.add_argument(
+        "--mods",
+        nargs="+",
+        metavar="FOLDER",
+        help="Convert only these mod folders (names inside the mods folder); the others are not scanned"
+    )
+    parser_convert.add_argument(
+        "--files",
+        nargs="+",
+        metavar="PNG",
+        help="Convert only these PNG files (inside the mods folder) instead of discovering textures"
+    )
+    parser_convert.add_argument(
+        "--daemon",
+        action="store_true",
+        default=None,
+        help="Run the conversion on the running daemon (see the daemon command); "
+             "with use_daemon in the config this happens whenever one is running"
+    )
+    parser_convert.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run (skips discovery and files already done)"
+    )
+    parser_convert.add_argument(
+        "--preset",
+        choices=list(PRESET_QUALITY_ORDER) + ['auto'],
+        default=ENCODER_PRESET,
+        help=f"Encoder speed/quality preset; 'auto' picks one from calibration (default: {ENCODER_PRESET})"
+    )
+    parser_convert.add_argument(
+        "--target-minutes",
+        type=float,
+        default=PRESET_TARGET_MINUTES,
+        help="Run time target for --preset auto"
+    )
+    parser_convert.add_argument(
+        "--min-psnr",
+        type=float,
+        default=PRESET_MIN_PSNR,
+        help=f"Quality floor in dB for --preset auto (default: {PRESET_MIN_PSNR:.0f})"
+    )
+    parser_convert.add_argument(
+        "--min-benefit",
+        type=float,
+        default=MIN_LOAD_BENEFIT_MS,
+        metavar="MS",
+        help="Leave textures as PNG when converting saves less than MS milliseconds of load time per game start"
+    )
+    parser_convert.add_argument(
+        "--vram-budget",
+        type=float,
+        default=VRAM_BUDGET_MB,
+        metavar="MB",
+        help="Write the biggest textures smaller until the DDS files fit in MB of GPU memory (mip chains included)"
+    )
+    parser_convert.add_argument(
+        "--background",
+        action="store_true",
+        default=BACKGROUND_MODE,
+        help="Run at low priority on part of the CPU and slow down while RimWorld or other programs are busy"
+    )
+    parser_convert.add_argument(
+        "--verify",
+        action="store_true",
+        default=VERIFY_OUTPUT,
+        help="Decode every new DDS and compare it with its PNG; failing files are removed"
+    )
+    parser_convert.add_argument(
+        "--backend",
+        choices=['auto', 'texconv'] + list(ENCODER_BACKENDS),
+        default=ENCODER_BACKEND,
+        help=f"Encoder to use: auto picks per texture size from a benchmark (default: {ENCODER_BACKEND})"
+    )
+    parser_convert.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Profile the run with cProfile and tracemalloc (reports in {PROFILE_DIR}/)"
+    )
+    parser_convert.add_argument(
+        "--profile-every",
+        type=int,
+        default=PROFILE_SNAPSHOT_EVERY,
+        help=f"Memory snapshot interval in files with --profile (default: {PROFILE_SNAPSHOT_EVERY})"
+    )
+    parser_convert.set_defaults(func=convert_textures, enable_gpu=ENABLE_GPU, # Default for this run is global
+                                discovery_mode=DISCOVERY_MODE)
+    
+    # --- Plan command ---
+    parser_plan = subparsers.add_parser('plan', help='Predict run time, disk and VRAM per mod without converting')
+    parser_plan.add_argument("--no-gpu", action="store_false", dest="enable_gpu",
+                             help="Plan for CPU encoding (overrides global config)")
+    parser_plan.add_argument("--preset", choices=list(PRESET_QUALITY_ORDER) + ['auto'], default=ENCODER_PRESET,
+                             help=f"Encoder preset to plan for (default: {ENCODER_PRESET})")
+    parser_plan.add_argument("--game-version", default=GAME_VERSION,
+                             help=f"RimWorld version whose load folders are planned (default: {GAME_VERSION})")
+    parser_plan.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                             help="Plan PNGs in all folders (except SKIP_FOLDERS)")
+    parser_plan.add_argument("--mods", nargs="+", metavar="FOLDER", help="Plan only these mod folders")
+    parser_plan.add_argument("--min-benefit", type=float, default=MIN_LOAD_BENEFIT_MS, metavar="MS",
+                             help="Leave out textures that would save less than MS ms of load time per game start")
+    parser_plan.add_argument("--vram-budget", type=float, default=VRAM_BUDGET_MB, metavar="MB",
+                             help="Plan with the biggest textures reduced until the DDS files fit in MB of GPU memory")
+    parser_plan.set_defaults(func=plan_textures, enable_gpu=ENABLE_GPU, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Benchmark command ---
+    parser_benchmark = subparsers.add_parser('benchmark', help='Measure PNG decode against DDS read per mod')
+    parser_benchmark.add_argument("--sample", type=int, default=BENCHMARK_SAMPLE_PER_MOD,
+                                  help=f"Textures timed per mod (default: {BENCHMARK_SAMPLE_PER_MOD})")
+    parser_benchmark.add_argument("--game-version", default=GAME_VERSION,
+                                  help=f"RimWorld version whose load folders are sampled (default: {GAME_VERSION})")
+    parser_benchmark.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                                  help="Sample PNGs from all folders (except SKIP_FOLDERS)")
+    parser_benchmark.set_defaults(func=benchmark_textures, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Verify command ---
+    parser_verify = subparsers.add_parser('verify', help='Check existing DDS files against their PNGs')
+    parser_verify.add_argument("--delete-bad", action="store_true",
+                               help="Remove DDS files that fail (the game falls back to the PNG)")
+    parser_verify.add_argument("--game-version", default=GAME_VERSION,
+                               help=f"RimWorld version whose load folders are checked (default: {GAME_VERSION})")
+    parser_verify.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                               help="Check DDS files in all folders (except SKIP_FOLDERS)")
+    parser_verify.set_defaults(func=verify_textures, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Calibrate command ---
+    parser_calibrate = subparsers.add_parser('calibrate', help='Measure encoder presets on a sample and recommend one')
+    parser_calibrate.add_argument("--no-gpu", action="store_false", dest="enable_gpu",
+                                  help="Calibrate CPU encoding (overrides global config)")
+    parser_calibrate.add_argument("--sample", type=int, default=CALIBRATION_SAMPLE_SIZE,
+                                  help=f"Number of textures to encode per preset (default: {CALIBRATION_SAMPLE_SIZE})")
+    parser_calibrate.add_argument("--target-minutes", type=float, default=PRESET_TARGET_MINUTES,
+                                  help="Recommend the best quality that finishes within this time")
+    parser_calibrate.add_argument("--min-psnr", type=float, default=PRESET_MIN_PSNR,
+                                  help=f"Quality floor in dB (default: {PRESET_MIN_PSNR:.0f})")
+    parser_calibrate.add_argument("--game-version", default=GAME_VERSION,
+                                  help=f"RimWorld version whose load folders are sampled (default: {GAME_VERSION})")
+    parser_calibrate.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                                  help="Sample PNGs from all folders (except SKIP_FOLDERS)")
+    parser_calibrate.set_defaults(func=calibrate_encoder, enable_gpu=ENABLE_GPU, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Backends command ---
+    parser_backends = subparsers.add_parser('backends', help='Benchmark the encoders and show which one is used per texture size')
+    parser_backends.add_argument("--no-gpu", action="store_false", dest="enable_gpu",
+                                 help="Compare CPU encoders only (overrides global config)")
+    parser_backends.add_argument("--rerun", action="store_true", help="Benchmark again even if results are cached")
+    parser_backends.add_argument("--preset", choices=list(PRESET_QUALITY_ORDER) + ['auto'], default=ENCODER_PRESET,
+                                 help=f"Encoder preset to compare at (default: {ENCODER_PRESET})")
+    parser_backends.add_argument("--sample", type=int, default=BACKEND_BENCHMARK_SAMPLE,
+                                 help=f"Textures encoded per backend (default: {BACKEND_BENCHMARK_SAMPLE})")
+    parser_backends.add_argument("--game-version", default=GAME_VERSION,
+                                 help=f"RimWorld version whose load folders are sampled (default: {GAME_VERSION})")
+    parser_backends.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                                 help="Sample PNGs from all folders (except SKIP_FOLDERS)")
+    parser_backends.set_defaults(func=rank_encoder_backends, enable_gpu=ENABLE_GPU, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Watch command ---
+    parser_watch = subparsers.add_parser('watch', help='Keep converting new or changed textures as mods update')
+    parser_watch.add_argument("--no-gpu", action="store_false", dest="enable_gpu",
+                              help="Disable GPU acceleration for this run (overrides global config)")
+    parser_watch.add_argument("--game-version", default=GAME_VERSION,
+                              help=f"RimWorld version whose load folders are converted (default: {GAME_VERSION})")
+    parser_watch.add_argument("--all-folders", action="store_const", const="all", dest="discovery_mode",
+                              help="Convert PNGs in all folders (except SKIP_FOLDERS)")
+    parser_watch.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE_SECONDS,
+                              help="Seconds without changes before a batch is converted")
+    parser_watch.add_argument("--poll-interval", type=float, default=WATCH_POLL_INTERVAL,
+                              help="Rescan interval when inotify is not available")
+    parser_watch.add_argument("--no-initial-sync", action="store_false", dest="initial_sync",
+                              help="Do not convert out-of-date textures when watch mode starts")
+    parser_watch.set_defaults(func=watch_textures, enable_gpu=ENABLE_GPU, discovery_mode=DISCOVERY_MODE)
+    
+    # --- Daemon command ---
+    parser_daemon = subparsers.add_parser('daemon', help='Run the conversion daemon that keeps the engine warm for the CLI and GUI')
+    parser_daemon.add_argument("--port", type=int, default=DAEMON_PORT, help=f"Local port (default: {DAEMON_PORT})")
+    parser_daemon.add_argument("--status", action="store_true", help="Show the running daemon and its jobs")
+    parser_daemon.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    parser_daemon.set_defaults(func=run_daemon)
     
     # --- Restore command ---
     parser_restore = subparsers.add_parser('restore', help='Restore original PNG files')
+    parser_restore.add_argument("--mods", nargs="+", metavar="FOLDER", help="Remove DDS files only in these mod folders")
     parser_restore.set_defaults(func=restore_pngs)
     
     # --- Build EXE command ---
@@ -720,6 +5796,11 @@ Examples:
     parser_configure = subparsers.add_parser('configure', help='Configure file paths')
     parser_configure.set_defaults(func=configure_paths)
     
+    # --- Startup check command ---
+    parser_startup = subparsers.add_parser('startup-check', help='Measure startup time against the target')
+    parser_startup.add_argument("--runs", type=positive_int, default=5, help="Number of import probes to time")
+    parser_startup.set_defaults(func=check_startup_time)
+    
     args = parser.parse_args()
     
     # If no arguments provided, show help
@@ -728,14 +5809,14 @@ Examples:
         return 0
     
     # Check external tools
-    if args.command in ['convert', 'restore']:
+    if args.command in ['convert', 'restore', 'watch', 'calibrate', 'backends']:
         if not check_tools():
             return 1
     
     # Execute requested action
     try:
-        args.func(args)
-        return 0
+        result = args.func(args)
+        return 1 if result is False else 0
         
     except KeyboardInterrupt:
         print()
@@ -747,9 +5828,9 @@ Examples:
 
 if __name__ == "__main__":
     # Ensure Pillow is available before doing anything complex
-    if not PILLOW_AVAILABLE or PILImage is None: # Check both
+    if not PILLOW_AVAILABLE:
         print_error("Pillow library (PIL) is not installed. This script requires Pillow for image operations.")
         print_error("Please install it, e.g., by running: pip install Pillow")
         sys.exit(1)
         
-    main()
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rimworld_texture_optimizer as optimizer
+
+
+class StartupTimeTest(unittest.TestCase):
+    def test_entry_points_import_within_target(self):
+        timings, loaded_modules = optimizer.measure_startup_time(5)
+        median = timings[len(timings) // 2]
+        self.assertLessEqual(median, optimizer.STARTUP_TIME_TARGET,
+                             f"median import time {median * 1000:.1f} ms")
+
+    def test_heavy_modules_are_deferred(self):
+        _, loaded_modules = optimizer.measure_startup_time(1)
+        self.assertEqual(loaded_modules, set())
+
+
+if __name__ == '__main__':
+    unittest.main()